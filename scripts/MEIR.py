@@ -10,8 +10,6 @@ Usage:
                    --output <file>
 """
 
-import pandas as pd
-import numpy as np
 import os
 import sys
 import argparse
@@ -19,6 +17,25 @@ from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from pathlib import Path
 
+from finance_io import (
+    HeaderCheck,
+    begin_stage,
+    end_stage,
+    lazy_import,
+    preview_path,
+    preview_report,
+    preview_rows,
+    run_preflight,
+    set_metrics_path,
+    set_preview_rows,
+    set_progress,
+    start_profile,
+    write_metrics,
+)
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
 # Set UTF-8 encoding for stdout/stderr to handle special characters
 if sys.platform == 'win32':
     import io
@@ -26,6 +43,46 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 
+# =============================================================================
+# INPUT LAYOUT
+# =============================================================================
+
+# Columns read from each sheet (nothing else is parsed)
+PLATFORM_COLUMNS = ['Date', 'Platform', 'SKU', 'On_Hand']
+THREE_G_COLUMNS = ['SKU', '3G On Hand', 'Date', 'Box / Case']
+SHIPCUBE_COLUMNS = ['SKU', 'Shipcube-East', 'Shipcube-West']
+UPDIKE_COLUMNS = ['SKU', 'Updike On Hand', 'Date', 'Box / Case']
+AMAZON_COLUMNS = ['SKU', 'Country', 'afn-warehouse-quantity', 'Date']
+CONTAINER_COLUMNS = ['SKU', 'QTY in Box', 'Month_Year', 'Status']
+
+# input key -> [(label, sheet name(s), required columns)]
+INPUT_SHEETS = {
+    'india_platform': [
+        ('India Platform', 'Flipkart', PLATFORM_COLUMNS),
+        ('India Platform', 'Easy Ecomm', PLATFORM_COLUMNS),
+    ],
+    'usa_platform': [
+        ('USA Platform', ('Walmart_invntory', 'walmart_invntory'), PLATFORM_COLUMNS),
+    ],
+    'three_g': [('3G', '3G-Inventory', THREE_G_COLUMNS)],
+    'shipcube': [('Shipcube', 'Inventory_S-D', SHIPCUBE_COLUMNS)],
+    'updike': [('Updike', 'Updk-Inveto', UPDIKE_COLUMNS)],
+    'amazon': [('Amazon', 0, AMAZON_COLUMNS)],
+    'container': [('Container', 'Container SKU', CONTAINER_COLUMNS)],
+}
+
+
+def preflight_inputs(input_files):
+    """Check the header of every input sheet before loading; returns {path: problem}."""
+    print("\n🔎 Pre-flight header check...")
+    checks = [
+        HeaderCheck(label, input_files[key], required, sheet_name=sheet)
+        for key, sheets in INPUT_SHEETS.items()
+        for label, sheet, required in sheets
+    ]
+    return run_preflight(checks)
+
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
@@ -86,11 +143,11 @@ def load_india_others(india_platform_file):
     print("\n📥 Loading India Others data...")
     display_path(india_platform_file, "India Platform file")
     
-    flipkart = pd.read_excel(india_platform_file, sheet_name='Flipkart')
-    easyecom = pd.read_excel(india_platform_file, sheet_name='Easy Ecomm')
-    
     # Define the selected columns for each dataframe
-    cols = ['Date', 'Platform', 'SKU', 'On_Hand']
+    cols = PLATFORM_COLUMNS
+    
+    flipkart = pd.read_excel(india_platform_file, sheet_name='Flipkart', usecols=cols, nrows=preview_rows())
+    easyecom = pd.read_excel(india_platform_file, sheet_name='Easy Ecomm', usecols=cols, nrows=preview_rows())
     
     # Concatenate the dataframes
     india_others = pd.concat([flipkart[cols], easyecom[cols]])
@@ -107,10 +164,10 @@ def load_usa_others(usa_platform_file, datestr):
     
     # Try both possible sheet name variations (case-insensitive)
     try:
-        Walmart = pd.read_excel(usa_platform_file, sheet_name='Walmart_invntory')
+        Walmart = pd.read_excel(usa_platform_file, sheet_name='Walmart_invntory', usecols=PLATFORM_COLUMNS, nrows=preview_rows())
     except:
         try:
-            Walmart = pd.read_excel(usa_platform_file, sheet_name='walmart_invntory')
+            Walmart = pd.read_excel(usa_platform_file, sheet_name='walmart_invntory', usecols=PLATFORM_COLUMNS, nrows=preview_rows())
         except Exception as e:
             print(f"  ❌ Error: Could not find Walmart sheet. Available sheets:")
             xl_file = pd.ExcelFile(usa_platform_file)
@@ -119,7 +176,7 @@ def load_usa_others(usa_platform_file, datestr):
             raise Exception(f"Walmart sheet not found: {e}")
     
     # Define the selected columns
-    cols = ['Date', 'Platform', 'SKU', 'On_Hand']
+    cols = PLATFORM_COLUMNS
     
     # Return Walmart data (3G and Updike will be added separately in process_meir)
     usa_others = Walmart[cols].copy()
@@ -134,10 +191,10 @@ def load_3g(three_g_file, datestr):
     print("\n📥 Loading 3G data...")
     display_path(three_g_file, "3G file")
     
-    three_G = pd.read_excel(three_g_file, sheet_name='3G-Inventory')
+    three_G = pd.read_excel(three_g_file, sheet_name='3G-Inventory', usecols=THREE_G_COLUMNS, nrows=preview_rows())
     
     # Filter columns and rename
-    three_G = three_G.loc[:, ['SKU', '3G On Hand', 'Date', 'Box / Case']]
+    three_G = three_G.loc[:, THREE_G_COLUMNS]
     three_G['Platform'] = '3G'
     three_G.reset_index(drop=True, inplace=True)
     three_G['On_Hand'] = three_G['3G On Hand'] * three_G['Box / Case']
@@ -154,10 +211,10 @@ def load_shipcube(shipcube_file, datestr):
     print("\n📥 Loading Shipcube data...")
     display_path(shipcube_file, "Shipcube file")
     
-    shipcube = pd.read_excel(shipcube_file, sheet_name='Inventory_S-D')
+    shipcube = pd.read_excel(shipcube_file, sheet_name='Inventory_S-D', usecols=SHIPCUBE_COLUMNS, nrows=preview_rows())
     
     # Filter columns
-    shipcube = shipcube.loc[:, ['SKU', 'Shipcube-East', 'Shipcube-West']]
+    shipcube = shipcube.loc[:, SHIPCUBE_COLUMNS]
     
     # Melt the dataframe to convert wide to long format
     shipcube_melted = pd.melt(
@@ -191,10 +248,10 @@ def load_updike(updike_file, datestr):
     print("\n📥 Loading Updike data...")
     display_path(updike_file, "Updike file")
     
-    updike = pd.read_excel(updike_file, sheet_name='Updk-Inveto')
+    updike = pd.read_excel(updike_file, sheet_name='Updk-Inveto', usecols=UPDIKE_COLUMNS, nrows=preview_rows())
     
     # Filter columns and rename
-    updike = updike.loc[:, ['SKU', 'Updike On Hand', 'Date', 'Box / Case']]
+    updike = updike.loc[:, UPDIKE_COLUMNS]
     updike['Platform'] = 'Updike'
     updike['On_Hand'] = updike['Updike On Hand'] * updike['Box / Case']
     updike.reset_index(drop=True, inplace=True)
@@ -211,18 +268,18 @@ def load_amazon_data(amazon_file, datestr_T):
     print("\n📥 Loading Amazon data...")
     display_path(amazon_file, "Amazon Inventory Database file")
     
-    usa = pd.read_excel(amazon_file)
+    # Read once; the USA/Canada and other-country splits share the frame
+    amazon = pd.read_excel(amazon_file, usecols=AMAZON_COLUMNS, nrows=preview_rows())
     
     country_1 = ['USA', 'Canada']
-    usa = usa[usa['Country'].isin(country_1)]
-    usa = usa.loc[:, ['SKU', 'Country', 'afn-warehouse-quantity', 'Date']]
+    usa = amazon[amazon['Country'].isin(country_1)]
+    usa = usa.loc[:, AMAZON_COLUMNS]
     usa.rename(columns={'afn-warehouse-quantity': 'On_Hand'}, inplace=True)
     usa.reset_index(drop=True, inplace=True)
     
-    amz_other = pd.read_excel(amazon_file)
     country_2 = ['USA', 'Canada']
-    amz_other = amz_other[~amz_other['Country'].isin(country_2)]
-    amz_other = amz_other.loc[:, ['SKU', 'Country', 'afn-warehouse-quantity', 'Date']]
+    amz_other = amazon[~amazon['Country'].isin(country_2)]
+    amz_other = amz_other.loc[:, AMAZON_COLUMNS]
     amz_other.rename(columns={'afn-warehouse-quantity': 'On_Hand'}, inplace=True)
     amz_other.reset_index(drop=True, inplace=True)
     
@@ -241,11 +298,11 @@ def load_container_data(container_file, current_date):
     print("\n📥 Loading Container data...")
     display_path(container_file, "Container Data file")
     
-    columns_to_read = ['SKU', 'QTY in Box', 'Month_Year', 'Status']
     container = pd.read_excel(
         container_file, 
         sheet_name='Container SKU', 
-        usecols=columns_to_read
+        usecols=CONTAINER_COLUMNS,
+        nrows=preview_rows()
     )
     
     container['Month_Year'] = container['Month_Year'].apply(
@@ -323,13 +380,27 @@ def process_meir(input_files, output_file):
     print("  LOADING DATA")
     print("="*60)
     
+    begin_stage("load", "India Platform")
     india_others = load_india_others(input_files['india_platform'])
+    end_stage(rows_out=len(india_others))
+    begin_stage("load", "USA Platform")
     usa_others = load_usa_others(input_files['usa_platform'], datestr)
+    end_stage(rows_out=len(usa_others))
+    begin_stage("load", "3G")
     three_G = load_3g(input_files['three_g'], datestr)
+    end_stage(rows_out=len(three_G))
+    begin_stage("load", "Shipcube")
     shipcube_melted = load_shipcube(input_files['shipcube'], datestr)
+    end_stage(rows_out=len(shipcube_melted))
+    begin_stage("load", "Updike")
     updike = load_updike(input_files['updike'], datestr)
+    end_stage(rows_out=len(updike))
+    begin_stage("load", "Amazon")
     Amazon_overall = load_amazon_data(input_files['amazon'], datestr_T)
+    end_stage(rows_out=len(Amazon_overall))
+    begin_stage("load", "Container")
     container_data = load_container_data(input_files['container'], current_date)
+    end_stage(rows_out=len(container_data))
     
     # Combine all dataframes
     print("\n" + "="*60)
@@ -337,6 +408,7 @@ def process_meir(input_files, output_file):
     print("="*60)
     
     print("\n📊 Combining all data sources...")
+    begin_stage("merge", "Sources")
     # Combine USA others: Walmart + 3G + Updike
     usa_others_combined = pd.concat([
         usa_others,
@@ -359,8 +431,11 @@ def process_meir(input_files, output_file):
         MEIR_dataframe['Country']
     )
     
+    end_stage(rows_out=len(MEIR_dataframe))
+    
     # Create pivot table
     print("  Creating pivot table...")
+    begin_stage("aggregate", "SKU", rows_in=len(MEIR_dataframe))
     MEIR_dataframe = pd.pivot_table(
         MEIR_dataframe, 
         index=['Date', "SKU"], 
@@ -407,10 +482,14 @@ def process_meir(input_files, output_file):
     available_total_cols = [col for col in total_cols if col in MEIR_dataframe.columns]
     MEIR_dataframe['Total Inventory X India'] = MEIR_dataframe[available_total_cols].sum(axis=1)
     
+    end_stage(rows_out=len(MEIR_dataframe))
+    
     # Merge container data
     print("  Merging container data...")
+    begin_stage("merge", "Container", rows_in=len(MEIR_dataframe))
     MEIR_dataframe = pd.merge(MEIR_dataframe, container_data, on='SKU', how='left')
     MEIR_dataframe = MEIR_dataframe.fillna(0)
+    end_stage(rows_out=len(MEIR_dataframe))
     
     # Save to Excel
     print("\n" + "="*60)
@@ -418,7 +497,9 @@ def process_meir(input_files, output_file):
     print("="*60)
     
     print(f"\n💾 Saving to: {get_short_path(output_file)}")
+    begin_stage("write", rows_in=len(MEIR_dataframe))
     MEIR_dataframe.to_excel(output_file, index=False)
+    end_stage()
     
     print(f"\n✅ MEIR report saved successfully!")
     print(f"   Total SKUs: {len(MEIR_dataframe)}")
@@ -500,7 +581,40 @@ Example usage:
         help='Path to output Excel file'
     )
     
+    parser.add_argument(
+        '--preview',
+        type=int,
+        metavar='N',
+        help='Dry run: read only the first N rows of each input sheet'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        metavar='JSON',
+        help='Write per-stage timings and memory use to this JSON file'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the run; writes <output>.prof and a hot-function summary'
+    )
+    
+    parser.add_argument(
+        '--progress-json',
+        nargs='?',
+        const='-',
+        metavar='PATH',
+        help='Emit JSON-lines progress events on stdout (or append them to PATH)'
+    )
+    
     args = parser.parse_args()
+    set_preview_rows(args.preview)
+    output_file = preview_path(args.output)
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, output_file)
+    set_progress(args.progress_json)
     
     # Validate all input files exist
     input_files = {
@@ -518,21 +632,34 @@ Example usage:
             print(f"❌ Error: File does not exist: {file_path}")
             sys.exit(1)
     
+    if preflight_inputs(input_files):
+        print("\n❌ Error: Input files are missing required sheets or columns (see above)")
+        sys.exit(1)
+    
     # Process data
     try:
-        result_df = process_meir(input_files, args.output)
+        result_df = process_meir(input_files, output_file)
         print("\n" + "="*60)
         print("  PROCESSING COMPLETE!")
         print("="*60)
-        print(f"\n📁 Output file: {get_short_path(args.output)}")
+        print(f"\n📁 Output file: {get_short_path(output_file)}")
         print(f"📊 Total rows: {len(result_df)}")
         print(f"📊 Total columns: {len(result_df.columns)}")
+        preview_report(
+            [
+                (input_files[key], [sheet for _, sheet, _ in sheets])
+                for key, sheets in INPUT_SHEETS.items()
+            ],
+            [output_file],
+        )
         print("\n✅ All done!")
+        write_metrics()
         
     except Exception as e:
         print(f"\n❌ Error processing data: {str(e)}")
         import traceback
         traceback.print_exc()
+        write_metrics("error")
         sys.exit(1)
 
 
@@ -16,16 +16,48 @@ Usage:
     python amazon_credit_note_extractor.py
 """
 
-import pandas as pd
-import numpy as np
-import pdfplumber
 import re
 import os
 import sys
 import argparse
+import shutil
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
 
+from finance_io import (
+    CREDIT_NOTE,
+    CREDIT_NOTE_TEMPLATE,
+    RETRY_STATUS,
+    TABLE_ENGINES,
+    BatchJournal,
+    DocumentTypeMismatch,
+    InvoiceIndex,
+    IsolatedWorker,
+    RowBuffer,
+    TableReader,
+    WorkerLimitExceeded,
+    begin_stage,
+    end_stage,
+    expect_document,
+    invoice_index_path,
+    iter_pages,
+    lazy_import,
+    open_pdf,
+    set_metrics_path,
+    set_progress,
+    spool_dir,
+    start_profile,
+    stream_enabled,
+    table_engine,
+    track,
+    worker_limits,
+    write_metrics,
+)
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
 # Set UTF-8 encoding for stdout/stderr to handle special characters
 if sys.platform == 'win32':
     import io
@@ -67,7 +99,7 @@ def extract_header_info(text):
     return header_data
 
 
-def extract_first_table(pdf):
+def extract_first_table(pdf, engine='generic'):
     """
     Extract first summary table from Credit Note PDF.
     Table columns: SI No | Orig Invoice No | Orig Invoice Date | Category | Description | Tax Rate | Amount
@@ -77,16 +109,21 @@ def extract_first_table(pdf):
     - SAC code (6-digit) in category column
     - Original Invoice Number pattern (e.g., DL-2526-72113)
     - Valid description + INR amount
+    
+    engine='template' reads the rows with the fixed-layout TableReader,
+    falling back to pdfplumber's generic table finder page by page.
     """
     table_data = []
     table_ended = False
+    reader = TableReader(CREDIT_NOTE_TEMPLATE if engine == 'template' else None)
     captured_si_numbers = set()
     
-    for page in pdf.pages:
+    # One page at a time; each page's parsed objects are released after use
+    for page in iter_pages(pdf):
         if table_ended:
             break
             
-        tables = page.extract_tables()
+        tables = reader.extract_tables(page)
         if not tables:
             continue
             
@@ -199,19 +236,28 @@ def parse_service_table(table_data):
     return parsed_data
 
 
-def process_single_pdf(pdf_path):
-    """Process a single Credit Note PDF file."""
+def process_single_pdf(pdf_path, classify=True, engine='generic'):
+    """
+    Process a single Credit Note PDF file.
+    With classify, a PDF whose first page is recognisably another kind of
+    document is rejected (DocumentTypeMismatch) before the header and table
+    passes.
+    """
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with open_pdf(pdf_path) as pdf:
+            if classify:
+                expect_document(pdf.pages[0], CREDIT_NOTE)
             first_page_text = pdf.pages[0].extract_text()
             header_info = extract_header_info(first_page_text)
             header_info['Source File'] = os.path.basename(pdf_path)
             
-            raw_table = extract_first_table(pdf)
+            raw_table = extract_first_table(pdf, engine)
             parsed_table = parse_service_table(raw_table)
             
             return header_info, parsed_table
             
+    except DocumentTypeMismatch:
+        raise
     except Exception as e:
         # Return None to indicate failure, error will be logged by caller
         return None, None
@@ -241,14 +287,33 @@ def process_amounts(df):
     return df
 
 
-def process_all_pdfs(input_path):
-    """Process all PDF files from input path (file or folder)."""
-    all_headers = []
-    all_table_data = []
+def process_all_pdfs(input_path, spool=None, resume=False, timeout=None, max_rss_mb=None, classify=True,
+                     engine='generic', index=None, skip_duplicates=False):
+    """
+    Process all PDF files from input path (file or folder).
+    With spool (a folder), rows are spilled to CSV files there as they are
+    extracted instead of being kept in memory, and every finished file is
+    recorded in the folder's journal. With resume, files already committed
+    to that journal are skipped. With timeout (seconds) or max_rss_mb, each
+    PDF is parsed in a worker process and one that passes a limit is
+    excluded. With classify, PDFs of another document type are excluded
+    after reading their first page. engine picks the item table reader
+    (see extract_first_table). With index (an InvoiceIndex), numbers that
+    another file (a renamed copy included) carried in earlier runs or
+    earlier in this batch are reported in duplicates, and skipped when
+    skip_duplicates is set.
+    """
+    # Output columns, in sheet order
+    header_columns = ['Source File', 'Credit Note Number', 'Credit Note Date', 
+                      'GST Tax Registration No', 'CIN No', 'Place of Supply', 'GSTIN', 'Reason for Credit']
+    
+    table_columns = ['Credit Note Number', 'Credit Note Date', 'Original Invoice Number', 
+                     'Original Invoice Date', 'Description of Service', 'Amount']
     
     # Track processing status for each file
     processed_files = []  # Successfully processed
     excluded_files = []   # Failed or excluded
+    duplicates = []       # Numbers already indexed from another source file
     
     input_path = Path(input_path)
     
@@ -256,58 +321,119 @@ def process_all_pdfs(input_path):
     if input_path.is_file():
         if input_path.suffix.lower() != '.pdf':
             print(f"Error: {input_path} is not a PDF file")
-            return None, None, [], [(str(input_path), "Not a PDF file")]
+            return None, None, [], [(str(input_path), "Not a PDF file")], []
         pdf_files = [input_path]
     elif input_path.is_dir():
         pdf_files = list(input_path.glob("*.pdf"))
     else:
         print(f"Error: {input_path} does not exist")
-        return None, None, [], [(str(input_path), "Path does not exist")]
+        return None, None, [], [(str(input_path), "Path does not exist")], []
     
     if not pdf_files:
         print("No PDF files found to process")
-        return None, None, [], []
+        return None, None, [], [], []
     
     print(f"\n{'='*60}")
     print(f"Found {len(pdf_files)} PDF file(s) to process")
     print('='*60)
     
-    for i, pdf_path in enumerate(pdf_files, 1):
-        print(f"\n[{i}/{len(pdf_files)}] Processing: {pdf_path.name}")
-        
-        try:
-            header_info, table_data = process_single_pdf(str(pdf_path))
-        except Exception as e:
-            excluded_files.append((pdf_path.name, f"Processing error: {str(e)}"))
-            print(f"  [ERROR] Exception occurred: {str(e)}")
-            continue
-        
-        if header_info:
-            # Check if we got valid data
-            credit_note_num = header_info.get('Credit Note Number', '')
+    if spool:
+        journal = BatchJournal(spool, resume=resume)
+        all_headers = journal.spool('headers.csv', header_columns)
+        all_table_data = journal.spool('line_items.csv', table_columns)
+        print(f"Streaming extracted rows to: {spool}")
+        if journal.entries:
+            print(f"Resuming: {len(journal.entries)} file(s) already committed")
+    else:
+        journal = nullcontext()
+        all_headers = RowBuffer(header_columns)
+        all_table_data = RowBuffer(table_columns)
+    
+    extract = IsolatedWorker(process_single_pdf, timeout, max_rss_mb)
+    if extract.isolated:
+        print(f"Per-PDF limits: timeout {f'{timeout:g}s' if timeout else 'none'}, "
+              f"memory {f'{max_rss_mb:g} MB' if max_rss_mb else 'none'}")
+    
+    def exclude(pdf_path, reason, status='excluded'):
+        excluded_files.append((pdf_path.name, reason))
+        if spool:
+            journal.commit(pdf_path, status, reason=reason)
+    
+    # Rows buffered by a spool, and the journal entries for them, are
+    # committed even if the loop is interrupted
+    with extract, journal, all_headers, all_table_data:
+        for i, pdf_path in enumerate(track(pdf_files, "PDFs"), 1):
+            print(f"\n[{i}/{len(pdf_files)}] Processing: {pdf_path.name}")
             
-            if not credit_note_num:
-                excluded_files.append((pdf_path.name, "Missing Credit Note Number"))
-                print(f"  [WARNING] Excluded: Missing Credit Note Number")
+            entry = journal.done(pdf_path) if spool else None
+            if entry:
+                if entry['status'] == 'processed':
+                    processed_files.append((pdf_path.name, entry['key'], entry['items']))
+                    if index is not None:
+                        index.add(entry['key'], pdf_path, line_items=entry['items'])
+                else:
+                    excluded_files.append((pdf_path.name, entry['reason']))
+                print(f"  [SKIP] Already {entry['status']} in an earlier run")
                 continue
             
-            if not table_data:
-                excluded_files.append((pdf_path.name, "No service line items found"))
-                print(f"  [WARNING] Excluded: No service line items found")
+            try:
+                header_info, table_data = extract(str(pdf_path), classify, engine)
+            except DocumentTypeMismatch as e:
+                exclude(pdf_path, str(e))
+                print(f"  [WARNING] Excluded: {e}")
+                continue
+            except WorkerLimitExceeded as e:
+                # Transient: --resume tries the file again
+                exclude(pdf_path, str(e), RETRY_STATUS)
+                print(f"  [ERROR] {e}")
+                continue
+            except Exception as e:
+                exclude(pdf_path, f"Processing error: {str(e)}")
+                print(f"  [ERROR] Exception occurred: {str(e)}")
                 continue
             
-            all_headers.append(header_info)
-            
-            for row in table_data:
-                row['Credit Note Number'] = credit_note_num
-                row['Credit Note Date'] = header_info.get('Credit Note Date', '')
-                all_table_data.append(row)
-            
-            processed_files.append((pdf_path.name, credit_note_num, len(table_data)))
-            print(f"  [OK] Credit Note #{credit_note_num} ({len(table_data)} line items)")
-        else:
-            excluded_files.append((pdf_path.name, "Failed to extract header data"))
-            print(f"  [ERROR] Failed to extract data")
+            if header_info:
+                # Check if we got valid data
+                credit_note_num = header_info.get('Credit Note Number', '')
+                
+                if not credit_note_num:
+                    exclude(pdf_path, "Missing Credit Note Number")
+                    print(f"  [WARNING] Excluded: Missing Credit Note Number")
+                    continue
+                
+                if not table_data:
+                    exclude(pdf_path, "No service line items found")
+                    print(f"  [WARNING] Excluded: No service line items found")
+                    continue
+                
+                if index is not None:
+                    duplicate = index.check(credit_note_num, pdf_path)
+                    if duplicate:
+                        duplicates.append({'Credit Note Number': credit_note_num, **duplicate,
+                                           'Action': 'Skipped' if skip_duplicates else 'Included'})
+                        reason = f"Duplicate of Credit Note #{credit_note_num} from {duplicate['Duplicate Of']}"
+                        if skip_duplicates:
+                            exclude(pdf_path, reason)
+                            print(f"  [WARNING] Excluded: {reason}")
+                            continue
+                        print(f"  [WARNING] {reason}")
+                    index.add(credit_note_num, pdf_path, doc_date=header_info.get('Credit Note Date'), line_items=len(table_data),
+                              total=round(float(process_amounts(pd.DataFrame(table_data))['Total Amount'].sum()), 2))
+                
+                all_headers.append([header_info])
+                
+                for row in table_data:
+                    row['Credit Note Number'] = credit_note_num
+                    row['Credit Note Date'] = header_info.get('Credit Note Date', '')
+                all_table_data.append(table_data)
+                
+                processed_files.append((pdf_path.name, credit_note_num, len(table_data)))
+                if spool:
+                    journal.commit(pdf_path, 'processed', key=credit_note_num, items=len(table_data))
+                print(f"  [OK] Credit Note #{credit_note_num} ({len(table_data)} line items)")
+            else:
+                exclude(pdf_path, "Failed to extract header data")
+                print(f"  [ERROR] Failed to extract data")
     
     # Print summary
     print(f"\n{'='*60}")
@@ -327,27 +453,25 @@ def process_all_pdfs(input_path):
     
     print('='*60)
     
-    if not all_headers:
-        return None, None, processed_files, excluded_files
-    
     # Create DataFrames
-    headers_df = pd.DataFrame(all_headers)
-    table_df = pd.DataFrame(all_table_data)
-    
-    # Reorder columns
-    header_columns = ['Source File', 'Credit Note Number', 'Credit Note Date', 
-                      'GST Tax Registration No', 'CIN No', 'Place of Supply', 'GSTIN', 'Reason for Credit']
-    headers_df = headers_df[[col for col in header_columns if col in headers_df.columns]]
+    if spool:
+        headers_df = journal.read(all_headers)
+        table_df = journal.read(all_table_data)
+    else:
+        headers_df = all_headers.read()
+        table_df = all_table_data.read()
     
-    table_columns = ['Credit Note Number', 'Credit Note Date', 'Original Invoice Number', 
-                     'Original Invoice Date', 'Description of Service', 'Amount']
-    table_df = table_df[[col for col in table_columns if col in table_df.columns]]
+    if headers_df.empty:
+        return None, None, processed_files, excluded_files, duplicates
     
-    return headers_df, table_df, processed_files, excluded_files
+    return headers_df, table_df, processed_files, excluded_files, duplicates
 
 
-def export_to_excel(headers_df, table_df, output_path, processed_files, excluded_files):
-    """Export DataFrames to Excel with multiple sheets."""
+def export_to_excel(headers_df, table_df, output_path, processed_files, excluded_files, duplicates=None):
+    """
+    Export DataFrames to Excel with multiple sheets. With duplicates (a list,
+    possibly empty, when the invoice index is on) a Duplicate_QC sheet is added.
+    """
     # Process amounts
     table_df = process_amounts(table_df)
     
@@ -392,6 +516,10 @@ def export_to_excel(headers_df, table_df, output_path, processed_files, excluded
         main_filer.to_excel(writer, sheet_name='Main_Filer', index=False)
         credit_note_qc.to_excel(writer, sheet_name='Credit_Note_QC', index=False)
         summary_df.to_excel(writer, sheet_name='Processing_Summary', index=False)
+        if duplicates is not None:
+            duplicate_columns = ['Credit Note Number', 'Source File', 'Duplicate Of', 'Previous Batch',
+                                 'Previously Extracted', 'Same Content', 'Action']
+            pd.DataFrame(duplicates, columns=duplicate_columns).to_excel(writer, sheet_name='Duplicate_QC', index=False)
     
     return len(headers_df), len(table_df)
 
@@ -463,7 +591,102 @@ Examples:
         help='Output Excel file path'
     )
     
+    parser.add_argument(
+        '--no-classify',
+        action='store_true',
+        help='Skip the first-page document type check and run full extraction on every PDF'
+    )
+    
+    parser.add_argument(
+        '--table-engine',
+        choices=TABLE_ENGINES,
+        help='Item table reader: generic (pdfplumber table finder, default) or template (fixed-layout, faster)'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Spill extracted rows to <output>.spool/ in batches (flat memory; partial results survive a crash)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted --stream run, skipping PDFs already committed to <output>.spool/journal.jsonl'
+    )
+    
+    parser.add_argument(
+        '--invoice-index',
+        type=str,
+        metavar='PATH',
+        help='SQLite index of extracted numbers used for duplicate checks ("off" to disable)'
+    )
+    
+    parser.add_argument(
+        '--skip-duplicates',
+        action='store_true',
+        help='Exclude PDFs whose number is already indexed from another file (copies included)'
+    )
+    
+    parser.add_argument(
+        '--search',
+        type=str,
+        metavar='TEXT',
+        help='List indexed documents whose number or file name contains TEXT, then exit'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        metavar='SECONDS',
+        help='Exclude a PDF that takes longer than this to parse (runs parsing in a worker process)'
+    )
+    
+    parser.add_argument(
+        '--max-rss',
+        type=float,
+        metavar='MB',
+        help='Exclude a PDF whose parsing worker grows past this much memory'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        metavar='JSON',
+        help='Write per-stage timings and memory use to this JSON file'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the run; writes <output>.prof and a hot-function summary'
+    )
+    
+    parser.add_argument(
+        '--progress-json',
+        nargs='?',
+        const='-',
+        metavar='PATH',
+        help='Emit JSON-lines progress events on stdout (or append them to PATH)'
+    )
+    
     args = parser.parse_args()
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, args.output)
+    set_progress(args.progress_json)
+    index_path = invoice_index_path(args.invoice_index)
+    
+    if args.search is not None:
+        if index_path is None:
+            print("Error: The invoice index is turned off")
+            sys.exit(1)
+        with InvoiceIndex(index_path, CREDIT_NOTE) as index:
+            matches = index.search(args.search)
+        if matches:
+            print(pd.DataFrame(matches).to_string(index=False))
+        else:
+            print(f"No indexed documents match '{args.search}'")
+        return
     
     # Determine input/output paths
     if args.input and args.output:
@@ -483,18 +706,40 @@ Examples:
         output_path += '.xlsx'
     
     # Process PDFs
-    headers_df, table_df, processed_files, excluded_files = process_all_pdfs(input_path)
+    spool = spool_dir(output_path) if stream_enabled(args.stream or args.resume) else None
+    timeout, max_rss_mb = worker_limits(args.timeout, args.max_rss)
+    index = InvoiceIndex(index_path, CREDIT_NOTE, batch=Path(output_path).name) if index_path else None
+    begin_stage("extract", "PDFs")
+    headers_df, table_df, processed_files, excluded_files, duplicates = process_all_pdfs(
+        input_path, spool, args.resume, timeout, max_rss_mb, not args.no_classify,
+        table_engine(args.table_engine), index, args.skip_duplicates
+    )
+    end_stage(rows_out=0 if table_df is None else len(table_df))
     
     if headers_df is None or table_df is None:
         if excluded_files:
             print(f"\n⚠ All {len(excluded_files)} file(s) were excluded. No data to export.")
         else:
             print("\nNo data extracted. Exiting.")
+        if index:
+            index.close()
+        write_metrics("error")
         sys.exit(1)
     
     # Export to Excel
     print(f"\nExporting to: {output_path}")
-    num_notes, num_items = export_to_excel(headers_df, table_df, output_path, processed_files, excluded_files)
+    begin_stage("write", rows_in=len(table_df))
+    num_notes, num_items = export_to_excel(headers_df, table_df, output_path, processed_files, excluded_files,
+                                         duplicates if index else None)
+    end_stage()
+    if spool:
+        # The workbook now holds everything the spill files had
+        shutil.rmtree(spool, ignore_errors=True)
+    if index:
+        # Recorded only once the workbook is saved, so a failed run can be re-run cleanly
+        indexed = index.commit()
+        index.close()
+        print(f"Indexed {indexed} document(s) in {index_path}")
     
     print(f"\n{'='*60}")
     print("  EXPORT COMPLETE!")
@@ -505,13 +750,18 @@ Examples:
     print(f"   - {num_items} service line item(s) extracted")
     if excluded_files:
         print(f"   - {len(excluded_files)} file(s) excluded (see 'Processing_Summary' sheet)")
+    if duplicates:
+        print(f"   - {len(duplicates)} duplicate(s) of earlier extractions (see 'Duplicate_QC' sheet)")
     print(f"\n📑 Excel Sheets Created:")
     print(f"   - 'Credit_Note_Headers': Credit note header information")
     print(f"   - 'Service_Line_Items': Service breakdown with SGST/CGST/Total")
     print(f"   - 'Main_Filer': Complete merged data")
     print(f"   - 'Credit_Note_QC': Summary pivot table")
     print(f"   - 'Processing_Summary': File processing status & excluded files")
+    if index:
+        print(f"   - 'Duplicate_QC': Numbers already indexed from another file")
     print()
+    write_metrics()
 
 
 if __name__ == "__main__":
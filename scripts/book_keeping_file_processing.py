@@ -22,52 +22,23 @@ import traceback
 from pathlib import Path
 from typing import List, Tuple
 
-import pandas as pd
-
-
-# =============================================================================
-# CONSTANTS (from notebook logic)
-# =============================================================================
-
-USE_COLUMNS = [
-    'Bill Date',
-    'Vendor Name',
-    'Bill Number',
-    'Account',
-    'Branch Name',
-    'SubTotal',
-    'Total',
-    'Item Total',
-    'IGST',
-    'SGST',
-    'CGST',
-    'CESS',
-    'Adjustment',
-    'Tax Percentage',
-    'GST Identification Number (GSTIN)',
-    'Branch ID',
-    'Source of Supply',
-]
-
-RENAME_COLUMNS = {
-    'Bill Date': 'bill_date',
-    'Vendor Name': 'vendor_name',
-    'Bill Number': 'bill_number',
-    'Account': 'account_type',
-    'Branch Name': 'branch_name',
-    'SubTotal': 'amount_without_tax',
-    'Total': 'taxable_value',
-    'Item Total': 'item_total',
-    'IGST': 'integrated_tax',
-    'SGST': 'state_tax',
-    'CGST': 'central_tax',
-    'CESS': 'cess',
-    'Adjustment': 'adjustment',
-    'Tax Percentage': 'tax_percentage',
-    'GST Identification Number (GSTIN)': 'GSTIN_of_supplier',
-    'Branch ID': 'branch_id',
-    'Source of Supply': 'place_of_supply',
-}
+from finance_io import (
+    BOOKS_DECIMAL_COLUMNS,
+    books_check,
+    collect_files,
+    lazy_import,
+    load_books,
+    preflight_files,
+    set_metrics_path,
+    set_progress,
+    stage,
+    start_profile,
+    track,
+    write_metrics,
+    write_table,
+)
+
+pd = lazy_import("pandas")
 
 
 # =============================================================================
@@ -79,82 +50,6 @@ def _print_header(title: str):
     print(f"\n{bar}\n{title}\n{bar}")
 
 
-def _load_and_clean(path: Path) -> pd.DataFrame:
-    """
-    Load a Book Keeping CSV file, select required columns, rename, and clean data.
-    """
-    # Read CSV/Excel with bill_number as object (string) to preserve numbers as text
-    dtype_dict = {'Bill Number': str}
-    ext = path.suffix.lower()
-
-    try:
-        if ext in ['.xlsx', '.xls']:
-            df_raw = pd.read_excel(path, usecols=USE_COLUMNS, dtype=dtype_dict)
-        else:
-            df_raw = pd.read_csv(path, usecols=USE_COLUMNS, dtype=dtype_dict)
-    except KeyError as e:
-        # If some columns are missing, try to read all and check what's available
-        if ext in ['.xlsx', '.xls']:
-            df_all = pd.read_excel(path)
-        else:
-            df_all = pd.read_csv(path)
-        missing = [c for c in USE_COLUMNS if c not in df_all.columns]
-        raise ValueError(f"Missing required columns: {missing}") from e
-
-    df = df_raw.copy()
-    df = df.rename(columns=RENAME_COLUMNS)
-    
-    # Derive year-month from bill_date
-    df['bill_date'] = pd.to_datetime(df['bill_date'], errors='coerce', dayfirst=True)
-    df['year_month'] = df['bill_date'].dt.strftime("%Y-%m")
-    
-    # Convert branch_id to text (string)
-    df['branch_id'] = df['branch_id'].astype(str)
-    
-    # Fill NA with 0 for amount_without_tax and round to 2 decimal places
-    df['amount_without_tax'] = df['amount_without_tax'].fillna(0).round(2)
-    
-    # Fill NA with 0 and ensure 2 decimal places for specific tax/adjustment columns
-    decimal_cols = [
-        'integrated_tax',
-        'state_tax',
-        'central_tax',
-        'adjustment',
-        'taxable_value',
-        'cess',
-        'item_total',
-        'tax_percentage',
-        'amount_without_tax',
-        'taxable_value'
-    ]
-    for col in decimal_cols:
-        df[col] = df[col].fillna(0).round(2).astype(float)
-    
-    # Fill NA with "Not available" for GSTIN_of_supplier
-    df['GSTIN_of_supplier'] = df['GSTIN_of_supplier'].fillna('Not available')
-    
-    df["source_file"] = path.name
-    return df
-
-
-def _collect_files(input_path: Path) -> List[Path]:
-    """
-    Collect CSV or Excel files from a file or directory.
-    """
-    if input_path.is_file():
-        return [input_path]
-    
-    # Collect all supported extensions
-    supported_ext = {'.csv', '.xlsx', '.xls'}
-    found = []
-    if input_path.is_dir():
-        for p in input_path.iterdir():
-            if p.is_file() and p.suffix.lower() in supported_ext:
-                found.append(p)
-    return sorted(found)
-
-
-
 # =============================================================================
 # CORE PROCESS
 # =============================================================================
@@ -162,35 +57,9 @@ def _collect_files(input_path: Path) -> List[Path]:
 def _write_output(df: pd.DataFrame, out: Path) -> None:
     """
     Write DataFrame to CSV or Excel based on file extension.
-    For CSV, format decimal columns to show 2 decimal places (e.g., 2345.00).
+    For CSV, decimal columns are written with 2 decimal places (e.g., 2345.00).
     """
-    ext = out.suffix.lower()
-    
-    # Columns that should always display 2 decimal places
-    decimal_cols = [
-        'integrated_tax',
-        'state_tax',
-        'central_tax',
-        'adjustment',
-        'taxable_value',
-        'cess',
-        'item_total',
-        'tax_percentage',
-        'amount_without_tax',
-        'taxable_value'
-    ]
-    
-    if ext in {".xlsx", ".xls"}:
-        df.to_excel(out, index=False)
-    else:
-        # For CSV, format decimal columns to ensure 2 decimal places.
-        # Coerce to numeric first so string values from Excel don't break formatting.
-        df_output = df.copy()
-        for col in decimal_cols:
-            if col in df_output.columns:
-                s = pd.to_numeric(df_output[col], errors="coerce").fillna(0)
-                df_output[col] = s.apply(lambda x: f"{x:.2f}")
-        df_output.to_csv(out, index=False)
+    write_table(df, out, decimal_cols=BOOKS_DECIMAL_COLUMNS)
 
 
 def process_input(input_path: str, output_path: str) -> Tuple[int, int]:
@@ -203,15 +72,18 @@ def process_input(input_path: str, output_path: str) -> Tuple[int, int]:
     inp = Path(input_path).expanduser().resolve()
     out = Path(output_path).expanduser().resolve()
 
-    files = _collect_files(inp)
+    files = collect_files(inp, [".csv", ".xlsx", ".xls"])
     if not files:
         raise FileNotFoundError(f"No CSV files found at {inp}")
+    files = preflight_files(files, books_check)
 
     frames: List[pd.DataFrame] = []
-    for f in files:
+    for f in track(files, "Books files"):
         try:
             print(f"  → Processing {f.name}")
-            frames.append(_load_and_clean(f))
+            with stage("load", f.name) as record:
+                frames.append(load_books(f))
+                record["rows_out"] = len(frames[-1])
         except Exception as e:
             print(f"  ✗ Skipped {f.name}: {e}")
             continue
@@ -219,9 +91,12 @@ def process_input(input_path: str, output_path: str) -> Tuple[int, int]:
     if not frames:
         raise RuntimeError("No files processed successfully.")
 
-    combined = pd.concat(frames, ignore_index=True, sort=False)
+    with stage("merge", rows_in=sum(len(df) for df in frames)) as record:
+        combined = pd.concat(frames, ignore_index=True, sort=False)
+        record["rows_out"] = len(combined)
     out.parent.mkdir(parents=True, exist_ok=True)
-    _write_output(combined, out)
+    with stage("write", rows_in=len(combined)):
+        _write_output(combined, out)
 
     print(f"\n✅ Saved cleaned data to {out}")
     print(f"   Files processed: {len(frames)}")
@@ -257,6 +132,23 @@ Examples:
         default=None,
         help="Output CSV file path (if omitted, you will be prompted; default: <input_parent>/cleaned_book_keeping.csv)",
     )
+    parser.add_argument(
+        "--metrics",
+        metavar="JSON",
+        help="Write per-stage timings and memory use to this JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run; writes <output>.prof and a hot-function summary",
+    )
+    parser.add_argument(
+        "--progress-json",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Emit JSON-lines progress events on stdout (or append them to PATH)",
+    )
 
     return parser
 
@@ -264,6 +156,9 @@ Examples:
 def main():
     parser = build_parser()
     args = parser.parse_args()
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, args.output)
+    set_progress(args.progress_json)
 
     # Interactive prompts when paths are missing
     if not args.input:
@@ -293,7 +188,9 @@ def main():
     except Exception:
         print("❌ Error during processing:")
         print(traceback.format_exc())
+        write_metrics("error")
         sys.exit(1)
+    write_metrics()
 
 
 if __name__ == "__main__":
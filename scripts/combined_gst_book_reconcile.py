@@ -10,6 +10,9 @@ Usage (CLI):
         --gst-input "path/to/gst_file_or_folder" \
         --books-input "path/to/bookkeeping_file_or_folder" \
         --output "reconciled_output.csv"
+
+    # Also match individual invoices to bills
+    python combined_gst_book_reconcile.py ... --invoice-level
 """
 
 from __future__ import annotations
@@ -18,92 +21,34 @@ import argparse
 import sys
 import traceback
 from pathlib import Path
-from typing import Iterable, List, Tuple
-
-import numpy as np
-import pandas as pd
-
-
-# =============================================================================
-# GST PROCESSING CONSTANTS
-# =============================================================================
-
-GST_REQUIRED_COLUMNS = [
-    "GSTIN_of_supplier_Unnamed:_0_level_1",
-    "Trade/Legal name_Unnamed:_1_level_1",
-    "Invoice_Details_Invoice_number",
-    "Invoice_Details_Invoice_Date",
-    "Invoice_Details_Invoice_Value",
-    "Place_of_supply_Unnamed:_6_level_1",
-    "Supply Attract Reverse Charge_Unnamed:_7_level_1",
-    "Taxable_Value_Unnamed:_8_level_1",
-    "Tax_Amount_Integrated_Tax",
-    "Tax_Amount_Central_Tax",
-    "Tax_Amount_State/UT_Tax",
-    "Tax_Amount_Cess",
-    "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1",
-]
-
-GST_RENAME_COLUMNS = {
-    "GSTIN_of_supplier_Unnamed:_0_level_1": "GSTIN_of_supplier",
-    "Trade/Legal name_Unnamed:_1_level_1": "trade_legal_name",
-    "Invoice_Details_Invoice_number": "invoice_number",
-    "Invoice_Details_Invoice_Date": "invoice_date",
-    "Invoice_Details_Invoice_Value": "invoice_value",
-    "Place_of_supply_Unnamed:_6_level_1": "place_of_supply",
-    "Supply Attract Reverse Charge_Unnamed:_7_level_1": "supply_attract_reverse_charge",
-    "Taxable_Value_Unnamed:_8_level_1": "taxable_value",
-    "Tax_Amount_Integrated_Tax": "integrated_tax",
-    "Tax_Amount_Central_Tax": "central_tax",
-    "Tax_Amount_State/UT_Tax": "state_tax",
-    "Tax_Amount_Cess": "cess",
-    "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1": "filing_date",
-}
-
-
-# =============================================================================
-# BOOKKEEPING PROCESSING CONSTANTS
-# =============================================================================
-
-BOOKKEEPING_USE_COLUMNS = [
-    "Bill Date",
-    "Vendor Name",
-    "Bill Number",
-    "Account",
-    "Branch Name",
-    "SubTotal",
-    "Total",
-    "Item Total",
-    "IGST",
-    "SGST",
-    "CGST",
-    "CESS",
-    "Adjustment",
-    "Tax Percentage",
-    "GST Identification Number (GSTIN)",
-    "Branch ID",
-    "Source of Supply",
-]
-
-BOOKKEEPING_RENAME_COLUMNS = {
-    "Bill Date": "bill_date",
-    "Vendor Name": "vendor_name",
-    "Bill Number": "bill_number",
-    "Account": "account_type",
-    "Branch Name": "branch_name",
-    "SubTotal": "amount_without_tax",
-    "Total": "taxable_value",
-    "Item Total": "item_total",
-    "IGST": "integrated_tax",
-    "SGST": "state_tax",
-    "CGST": "central_tax",
-    "CESS": "cess",
-    "Adjustment": "adjustment",
-    "Tax Percentage": "tax_percentage",
-    "GST Identification Number (GSTIN)": "GSTIN_of_supplier",
-    "Branch ID": "branch_id",
-    "Source of Supply": "place_of_supply",
-}
+from typing import List, Optional
+
+from finance_io import (
+    books_check,
+    cleaned_books_check,
+    cleaned_gst_check,
+    collect_files,
+    gst_b2b_check,
+    lazy_import,
+    load_books,
+    load_cleaned_books,
+    load_cleaned_gst,
+    load_gst_b2b,
+    preflight_files,
+    preview_path,
+    preview_report,
+    set_metrics_path,
+    set_preview_rows,
+    set_progress,
+    stage,
+    start_profile,
+    track,
+    write_metrics,
+)
+from invoice_reconcile import match_invoices, summarize_matches
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 
 # =============================================================================
@@ -117,136 +62,32 @@ def _print_header(title: str) -> None:
     print(f"\n{bar}\n{title}\n{bar}")
 
 
-def _flatten_columns(columns: Iterable[Tuple]) -> List[str]:
-    """
-    Flatten MultiIndex columns by joining non-empty parts with "_"
-    and applying basic cleaning.
-    """
-    flattened = [
-        "_".join([str(c).strip() for c in col if pd.notna(c) and c != ""])
-        for col in columns
-    ]
-    cleaned = (
-        pd.Index(flattened)
-        .str.replace(" ", "_")
-        .str.replace("(₹)", "", regex=False)
-        .str.replace("__", "_")
-        .str.strip("_")
-        .tolist()
-    )
-    return cleaned
-
-
-def _find_column_mapping(actual_columns: List[str], expected_columns: List[str]) -> dict:
-    """
-    Map expected column names to actual column names using flexible matching.
-    Returns a dictionary mapping expected -> actual column names.
-    """
-    mapping = {}
-    actual_lower = [c.lower() for c in actual_columns]
-
-    # Define key terms for each expected column (for better matching)
-    column_keywords = {
-        "GSTIN_of_supplier_Unnamed:_0_level_1": ["gstin", "supplier"],
-        "Trade/Legal name_Unnamed:_1_level_1": ["trade", "legal", "name"],
-        "Invoice_Details_Invoice_number": ["invoice", "number"],
-        "Invoice_Details_Invoice_Date": ["invoice", "date"],
-        "Invoice_Details_Invoice_Value": ["invoice", "value"],
-        "Place_of_supply_Unnamed:_6_level_1": ["place", "supply"],
-        "Supply Attract Reverse Charge_Unnamed:_7_level_1": [
-            "supply",
-            "attract",
-            "reverse",
-            "charge",
-        ],
-        "Taxable_Value_Unnamed:_8_level_1": ["taxable", "value"],
-        "Tax_Amount_Integrated_Tax": ["integrated", "tax"],
-        "Tax_Amount_Central_Tax": ["central", "tax"],
-        "Tax_Amount_State/UT_Tax": ["state", "ut", "tax"],
-        "Tax_Amount_Cess": ["cess"],
-        "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1": [
-            "filing",
-            "date",
-            "gstr",
-        ],
-    }
-
-    for expected in expected_columns:
-        # Try exact match first
-        if expected in actual_columns:
-            mapping[expected] = expected
-            continue
-
-        # Try case-insensitive exact match
-        expected_lower = expected.lower()
-        if expected_lower in actual_lower:
-            idx = actual_lower.index(expected_lower)
-            mapping[expected] = actual_columns[idx]
-            continue
-
-        # Try partial matching using keywords
-        keywords = column_keywords.get(expected, [])
-        if not keywords:
-            # Fallback: extract key parts from expected column name
-            key_parts = expected.split("_Unnamed:")[0].lower()
-            key_parts = key_parts.replace("/", "_").replace("-", "_").split("_")
-            keywords = [
-                p
-                for p in key_parts
-                if p and p not in ["unnamed", "level", "details", "amount"]
-            ]
-
-        best_match = None
-        best_score = 0
-
-        for actual in actual_columns:
-            actual_lower_clean = actual.lower().replace("/", "_").replace("-", "_")
-
-            # Count how many keywords are found in the actual column name
-            matches = sum(1 for keyword in keywords if keyword in actual_lower_clean)
-
-            # Require at least 50% of keywords to match, or all if there are only 1–2
-            min_required = (
-                max(1, int(len(keywords) * 0.5)) if len(keywords) > 2 else len(keywords)
-            )
+# =============================================================================
+# PRE-FLIGHT
+# =============================================================================
 
-            if matches >= min_required and matches > best_score:
-                best_score = matches
-                best_match = actual
 
-        if best_match:
-            mapping[expected] = best_match
-            print(f"    ✓ Matched '{expected}' -> '{best_match}'")
-        else:
-            # If no match found, raise error with helpful message
-            preview = (
-                f"{actual_columns[:15]}..."
-                if len(actual_columns) > 15
-                else f"{actual_columns}"
-            )
-            raise ValueError(
-                f"Could not find column matching '{expected}'. "
-                f"Looking for keywords: {keywords}. "
-                f"Available columns: {preview}"
-            )
+def gst_input_files(input_path: str, sheet_name: str = "B2B", use_cleaned: bool = False) -> List[Path]:
+    """GST files under input_path whose headers pass the pre-flight check."""
+    inp = Path(input_path).expanduser().resolve()
+    extensions = [".xlsx", ".xls", ".csv"] if use_cleaned else [".xlsx", ".xls"]
+    files = collect_files(inp, extensions, recursive=True)
 
-    return mapping
+    if not files:
+        raise FileNotFoundError(f"No Excel files found at {inp}")
+    if use_cleaned:
+        return preflight_files(files, cleaned_gst_check)
+    return preflight_files(files, lambda f: gst_b2b_check(f, sheet_name=sheet_name, fallback_sheets=True))
 
 
-def _collect_files(input_path: Path, extensions: List[str]) -> List[Path]:
-    """
-    Collect files from a file or directory.
-    """
-    if input_path.is_file():
-        return [input_path]
+def bookkeeping_input_files(input_path: str, use_cleaned: bool = False) -> List[Path]:
+    """Bookkeeping files under input_path whose headers pass the pre-flight check."""
+    inp = Path(input_path).expanduser().resolve()
+    files = collect_files(inp, [".csv", ".xlsx", ".xls"], recursive=True)
 
-    found: List[Path] = []
-    if input_path.is_dir():
-        for ext in extensions:
-            found.extend(list(input_path.glob(f"*{ext}")))
-            found.extend(list(input_path.glob(f"**/*{ext}")))  # Recursive search
-    # Remove duplicates
-    return sorted({p.resolve() for p in found})
+    if not files:
+        raise FileNotFoundError(f"No CSV/Excel files found at {inp}")
+    return preflight_files(files, cleaned_books_check if use_cleaned else books_check)
 
 
 # =============================================================================
@@ -254,114 +95,11 @@ def _collect_files(input_path: Path, extensions: List[str]) -> List[Path]:
 # =============================================================================
 
 
-def _load_and_clean_gst(path: Path, sheet_name: str = "B2B") -> pd.DataFrame:
-    """
-    Load a raw GST Excel file, flatten columns, select required columns, and rename.
-    """
-    df_raw = pd.read_excel(path, sheet_name=sheet_name, skiprows=4, header=[0, 1])
-    df_raw.columns = _flatten_columns(df_raw.columns)
-
-    # Debug: Print actual columns found
-    print(f"    📋 Found {len(df_raw.columns)} columns")
-    if len(df_raw.columns) <= 20:
-        print(f"    Columns: {list(df_raw.columns)}")
-    else:
-        print(f"    First 10 columns: {list(df_raw.columns[:10])}")
-
-    # Use flexible column matching
-    try:
-        column_mapping = _find_column_mapping(list(df_raw.columns), GST_REQUIRED_COLUMNS)
-    except ValueError as e:
-        raise ValueError(f"Column matching failed: {e}")
-
-    # Select columns using the mapping
-    actual_required_columns = [column_mapping[req] for req in GST_REQUIRED_COLUMNS]
-    df = df_raw[actual_required_columns].copy()
-
-    # Create rename mapping: expected -> clean name
-    rename_map = {}
-    for expected, clean_name in GST_RENAME_COLUMNS.items():
-        actual_col = column_mapping[expected]
-        rename_map[actual_col] = clean_name
-
-    df = df.rename(columns=rename_map)
-
-    # Derive year_month from invoice_date
-    df["invoice_date"] = pd.to_datetime(df["invoice_date"], errors="coerce", dayfirst=True)
-    df["year_month"] = df["invoice_date"].dt.strftime("%Y-%m")
-    df["source_file"] = path.name
-    return df
-
-
-def _load_cleaned_gst_file(path: Path) -> pd.DataFrame:
-    """
-    Load an already-cleaned GST file (output of gst_file_processing).
-    Accepts CSV or Excel with flat headers and standard column names.
-    """
-    ext = path.suffix.lower()
-    if ext in {".xlsx", ".xls"}:
-        df = pd.read_excel(path)
-    else:
-        df = pd.read_csv(path)
-
-    # Ensure invoice_date and year_month exist
-    if "invoice_date" in df.columns:
-        df["invoice_date"] = pd.to_datetime(df["invoice_date"], errors="coerce", dayfirst=True)
-        if "year_month" not in df.columns:
-            df["year_month"] = df["invoice_date"].dt.strftime("%Y-%m")
-
-    df["source_file"] = path.name
-    return df
-
-
-def _get_excel_sheet_names(path: Path) -> List[str]:
-    """Return list of worksheet names in an Excel file."""
-    with pd.ExcelFile(path) as xl:
-        return xl.sheet_names
-
-
-def _is_sheet_not_found_error(e: Exception) -> bool:
-    """True if the exception indicates the requested worksheet name was not found."""
-    msg = str(e).lower()
-    return "not found" in msg and ("worksheet" in msg or "sheet" in msg)
-
-
-def _load_gst_from_file(path: Path, preferred_sheet: str = "B2B") -> pd.DataFrame:
-    """
-    Load GST data from an Excel file. Tries preferred_sheet (e.g. 'B2B') first;
-    if that sheet is missing, tries each available sheet until one has valid GST structure.
-    """
-    try:
-        return _load_and_clean_gst(path, sheet_name=preferred_sheet)
-    except Exception as e:
-        if not _is_sheet_not_found_error(e):
-            raise
-
-    sheet_names = _get_excel_sheet_names(path)
-    if not sheet_names:
-        raise ValueError(f"No worksheets found in {path.name}")
-
-    for name in sheet_names:
-        if name == preferred_sheet:
-            continue
-        try:
-            print(f"    Trying sheet: '{name}' (B2B not found)")
-            df = _load_and_clean_gst(path, sheet_name=name)
-            print(f"    ✓ Using sheet: '{name}'")
-            return df
-        except (ValueError, KeyError, Exception):
-            continue
-
-    raise ValueError(
-        f"No worksheet with valid GST B2B structure found. "
-        f"Available sheets: {sheet_names}. Expected a sheet (e.g. 'B2B') with GST invoice columns."
-    )
-
-
 def process_gst_files(
     input_path: str,
     sheet_name: str = "B2B",
     use_cleaned: bool = False,
+    files: Optional[List[Path]] = None,
 ) -> pd.DataFrame:
     """
     Process GST files and return combined DataFrame.
@@ -370,22 +108,19 @@ def process_gst_files(
         input_path: Path to GST file or folder.
         sheet_name: Sheet name for raw Excel files (default 'B2B').
         use_cleaned: If True, treat input as already-cleaned GST (CSV/Excel).
+        files: Files already collected and pre-flighted by gst_input_files.
     """
-    inp = Path(input_path).expanduser().resolve()
-    extensions = [".xlsx", ".xls", ".csv"] if use_cleaned else [".xlsx", ".xls"]
-    files = _collect_files(inp, extensions)
-
-    if not files:
-        raise FileNotFoundError(f"No Excel files found at {inp}")
+    if files is None:
+        files = gst_input_files(input_path, sheet_name=sheet_name, use_cleaned=use_cleaned)
 
     frames: List[pd.DataFrame] = []
-    for f in files:
+    for f in track(files, "GST files"):
         try:
             print(f"  → Processing GST file: {f.name}")
             if use_cleaned:
-                frames.append(_load_cleaned_gst_file(f))
+                frames.append(load_cleaned_gst(f))
             else:
-                frames.append(_load_gst_from_file(f, preferred_sheet=sheet_name))
+                frames.append(load_gst_b2b(f, sheet_name=sheet_name, fallback_sheets=True))
         except Exception as e:
             print(f"  ✗ Skipped {f.name}: {e}")
             continue
@@ -406,106 +141,30 @@ def process_gst_files(
 # =============================================================================
 
 
-def _load_and_clean_bookkeeping(path: Path) -> pd.DataFrame:
-    """
-    Load a Book Keeping CSV/Excel file, select required columns, rename, and clean data.
-    """
-    # Read CSV/Excel with bill_number as object (string) to preserve numbers as text
-    dtype_dict = {"Bill Number": str}
-    ext = path.suffix.lower()
-
-    try:
-        if ext in [".xlsx", ".xls"]:
-            df_raw = pd.read_excel(path, usecols=BOOKKEEPING_USE_COLUMNS, dtype=dtype_dict)
-        else:
-            df_raw = pd.read_csv(path, usecols=BOOKKEEPING_USE_COLUMNS, dtype=dtype_dict)
-    except KeyError as e:
-        # If some columns are missing, try to read all and check what's available
-        if ext in [".xlsx", ".xls"]:
-            df_all = pd.read_excel(path)
-        else:
-            df_all = pd.read_csv(path)
-        missing = [c for c in BOOKKEEPING_USE_COLUMNS if c not in df_all.columns]
-        raise ValueError(f"Missing required columns: {missing}") from e
-
-    df = df_raw.copy()
-    df = df.rename(columns=BOOKKEEPING_RENAME_COLUMNS)
-
-    # Derive year_month from bill_date
-    df["bill_date"] = pd.to_datetime(df["bill_date"], errors="coerce", dayfirst=True)
-    df["year_month"] = df["bill_date"].dt.strftime("%Y-%m")
-
-    # Convert branch_id to text (string)
-    df["branch_id"] = df["branch_id"].astype(str)
-
-    # Fill NA with 0 for amount_without_tax and round to 2 decimal places
-    df["amount_without_tax"] = df["amount_without_tax"].fillna(0).round(2)
-
-    # Fill NA with 0 and ensure 2 decimal places for specific tax/adjustment columns
-    decimal_cols = [
-        "integrated_tax",
-        "state_tax",
-        "central_tax",
-        "adjustment",
-        "taxable_value",
-        "cess",
-        "item_total",
-        "tax_percentage",
-        "amount_without_tax",
-    ]
-    for col in decimal_cols:
-        df[col] = df[col].fillna(0).round(2).astype(float)
-
-    # Fill NA with "Not available" for GSTIN_of_supplier
-    df["GSTIN_of_supplier"] = df["GSTIN_of_supplier"].fillna("Not available")
-
-    df["source_file"] = path.name
-    return df
-
-
-def _load_cleaned_bookkeeping_file(path: Path) -> pd.DataFrame:
-    """
-    Load an already-cleaned bookkeeping file (output of book_keeping_file_processing).
-    Accepts CSV or Excel with flat headers and standard column names.
-    """
-    ext = path.suffix.lower()
-    if ext in {".xlsx", ".xls"}:
-        df = pd.read_excel(path)
-    else:
-        df = pd.read_csv(path)
-
-    if "bill_number" in df.columns:
-        df["bill_number"] = df["bill_number"].astype(str)
-    if "bill_date" in df.columns and "year_month" not in df.columns:
-        df["bill_date"] = pd.to_datetime(df["bill_date"], errors="coerce", dayfirst=True)
-        df["year_month"] = df["bill_date"].dt.strftime("%Y-%m")
-
-    df["source_file"] = path.name
-    return df
-
-
-def process_bookkeeping_files(input_path: str, use_cleaned: bool = False) -> pd.DataFrame:
+def process_bookkeeping_files(
+    input_path: str,
+    use_cleaned: bool = False,
+    files: Optional[List[Path]] = None,
+) -> pd.DataFrame:
     """
     Process bookkeeping files and return combined DataFrame.
 
     Args:
         input_path: Path to bookkeeping file or folder.
         use_cleaned: If True, treat input as already-cleaned books (CSV/Excel).
+        files: Files already collected and pre-flighted by bookkeeping_input_files.
     """
-    inp = Path(input_path).expanduser().resolve()
-    files = _collect_files(inp, [".csv", ".xlsx", ".xls"])
-
-    if not files:
-        raise FileNotFoundError(f"No CSV/Excel files found at {inp}")
+    if files is None:
+        files = bookkeeping_input_files(input_path, use_cleaned=use_cleaned)
 
     frames: List[pd.DataFrame] = []
-    for f in files:
+    for f in track(files, "Books files"):
         try:
             print(f"  → Processing bookkeeping file: {f.name}")
             if use_cleaned:
-                frames.append(_load_cleaned_bookkeeping_file(f))
+                frames.append(load_cleaned_books(f))
             else:
-                frames.append(_load_and_clean_bookkeeping(f))
+                frames.append(load_books(f))
         except Exception as e:
             print(f"  ✗ Skipped {f.name}: {e}")
             continue
@@ -525,6 +184,58 @@ def process_bookkeeping_files(input_path: str, use_cleaned: bool = False) -> pd.
 # =============================================================================
 
 
+# Aggregated amount columns on each side
+GST_AMOUNT_COLUMNS = [
+    "gst_invoice_value",
+    "gst_taxable_value",
+    "gst_integrated_tax",
+    "gst_central_tax",
+    "gst_state_tax",
+    "gst_cess",
+]
+
+BOOKS_AMOUNT_COLUMNS = [
+    "books_item_total",
+    "books_integrated_tax",
+    "books_central_tax",
+    "books_state_tax",
+    "books_cess",
+    "books_invoice_value",
+]
+
+# (difference column, GST column, books column)
+DIFFERENCE_COLUMNS = [
+    ("invoice_value_difference", "gst_invoice_value", "books_invoice_value"),
+    ("item_value_difference", "gst_taxable_value", "books_item_total"),
+    ("integrated_tax_difference", "gst_integrated_tax", "books_integrated_tax"),
+    ("Central_tax_difference", "gst_central_tax", "books_central_tax"),
+    ("state_tax_difference", "gst_state_tax", "books_state_tax"),
+    ("cess_difference", "gst_cess", "books_cess"),
+]
+
+RECONCILE_KEY_COLUMNS = [
+    "gst_year_month",
+    "gst_GSTIN_of_supplier",
+    "books_year_month",
+    "books_GSTIN_of_supplier",
+]
+
+
+def _coerce_amounts(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Ensure amount columns are numeric before aggregation.
+    Only columns that arrive as text (e.g. "1,234.50" from a cleaned CSV) are
+    parsed; numeric columns are left untouched.
+    """
+    for col in columns:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(
+                df[col].astype(str).str.replace(",", "", regex=False).str.strip(),
+                errors="coerce",
+            )
+    return df
+
+
 def prepare_gst_data(gst_df: pd.DataFrame) -> pd.DataFrame:
     """
     Prepare GST data by grouping and aggregating.
@@ -532,18 +243,10 @@ def prepare_gst_data(gst_df: pd.DataFrame) -> pd.DataFrame:
     prefix = "gst_"
     gst_df = gst_df.copy()
     gst_df.columns = [prefix + col for col in gst_df.columns]
+    gst_df = _coerce_amounts(gst_df, GST_AMOUNT_COLUMNS)
 
     gst_data_main = (
-        gst_df.groupby(["gst_year_month", "gst_GSTIN_of_supplier"])[
-            [
-                "gst_invoice_value",
-                "gst_taxable_value",
-                "gst_integrated_tax",
-                "gst_central_tax",
-                "gst_state_tax",
-                "gst_cess",
-            ]
-        ]
+        gst_df.groupby(["gst_year_month", "gst_GSTIN_of_supplier"])[GST_AMOUNT_COLUMNS]
         .sum()
         .reset_index()
     )
@@ -558,16 +261,11 @@ def prepare_bookkeeping_data(books_df: pd.DataFrame) -> pd.DataFrame:
     prefix = "books_"
     books_df = books_df.copy()
     books_df.columns = [prefix + col for col in books_df.columns]
+    books_df = _coerce_amounts(books_df, BOOKS_AMOUNT_COLUMNS[:-1])
 
     books_required = (
         books_df.groupby(["books_year_month", "books_GSTIN_of_supplier"])[
-            [
-                "books_item_total",
-                "books_integrated_tax",
-                "books_central_tax",
-                "books_state_tax",
-                "books_cess",
-            ]
+            BOOKS_AMOUNT_COLUMNS[:-1]
         ]
         .sum()
         .reset_index()
@@ -584,86 +282,49 @@ def prepare_bookkeeping_data(books_df: pd.DataFrame) -> pd.DataFrame:
     return books_required
 
 
-def reconcile_data(gst_data_main: pd.DataFrame, books_required: pd.DataFrame) -> pd.DataFrame:
+def reconcile_data(
+    gst_data_main: pd.DataFrame,
+    books_required: pd.DataFrame,
+    tolerance: Optional[float] = None,
+) -> pd.DataFrame:
     """
     Merge GST and bookkeeping data and calculate differences.
+
+    Key columns missing on one side are filled with "NA" and amounts with 0,
+    so every amount and difference column stays float. With a tolerance
+    (in rupees), a Tolerance_Flag column marks matched rows where any
+    difference exceeds it.
     """
-    merged_data = (
-        gst_data_main.merge(
-            books_required,
-            left_on=["gst_year_month", "gst_GSTIN_of_supplier"],
-            right_on=["books_year_month", "books_GSTIN_of_supplier"],
-            how="outer",
-        )
-        .fillna("NA")
+    merged_data = gst_data_main.merge(
+        books_required,
+        left_on=["gst_year_month", "gst_GSTIN_of_supplier"],
+        right_on=["books_year_month", "books_GSTIN_of_supplier"],
+        how="outer",
     )
+    merged_data[RECONCILE_KEY_COLUMNS] = merged_data[RECONCILE_KEY_COLUMNS].fillna("NA")
+    amount_cols = GST_AMOUNT_COLUMNS + BOOKS_AMOUNT_COLUMNS
+    merged_data[amount_cols] = merged_data[amount_cols].fillna(0).astype(float)
 
     # Create match flag
-    merged_data["Match_Flag"] = np.where(
-        merged_data.gst_GSTIN_of_supplier == merged_data.books_GSTIN_of_supplier,
-        "GST Match",
-        "No GST Match",
-    )
-
-    # Convert columns to numeric
-    cols_to_convert = [
-        "gst_invoice_value",
-        "books_invoice_value",
-        "gst_taxable_value",
-        "books_item_total",
-        "gst_integrated_tax",
-        "books_integrated_tax",
-        "gst_central_tax",
-        "books_central_tax",
-        "gst_state_tax",
-        "books_state_tax",
-        "gst_cess",
-        "books_cess",
-    ]
-
-    for col in cols_to_convert:
-        merged_data[col] = (
-            merged_data[col]
-            .astype(str)
-            .str.replace(",", "")
-            .str.strip()
-            .replace("", "0")
+    same_gst = (
+        merged_data["gst_GSTIN_of_supplier"] == merged_data["books_GSTIN_of_supplier"]
+    ).to_numpy()
+    merged_data["Match_Flag"] = np.where(same_gst, "GST Match", "No GST Match")
+
+    # Calculate all differences in one block (0 where GSTINs don't match)
+    diff_names = [name for name, _, _ in DIFFERENCE_COLUMNS]
+    gst_values = merged_data[[g for _, g, _ in DIFFERENCE_COLUMNS]].to_numpy(dtype=float)
+    books_values = merged_data[[b for _, _, b in DIFFERENCE_COLUMNS]].to_numpy(dtype=float)
+    differences = np.where(same_gst[:, None], gst_values - books_values, 0.0)
+    merged_data[diff_names] = differences
+
+    if tolerance is not None:
+        above = np.abs(differences).max(axis=1, initial=0.0) > tolerance
+        merged_data["Tolerance_Flag"] = np.select(
+            [~same_gst, above],
+            ["No GST Match", "Above Tolerance"],
+            default="Within Tolerance",
         )
-        merged_data[col] = pd.to_numeric(merged_data[col], errors="coerce").fillna(0)
-
-    # Calculate differences
-    same_gst = merged_data["Match_Flag"] == "GST Match"
-
-    merged_data["invoice_value_difference"] = np.where(
-        same_gst,
-        merged_data["gst_invoice_value"] - merged_data["books_invoice_value"],
-        0,
-    )
-    merged_data["item_value_difference"] = np.where(
-        same_gst,
-        merged_data["gst_taxable_value"] - merged_data["books_item_total"],
-        0,
-    )
-    merged_data["integrated_tax_difference"] = np.where(
-        same_gst,
-        merged_data["gst_integrated_tax"] - merged_data["books_integrated_tax"],
-        0,
-    )
-    merged_data["Central_tax_difference"] = np.where(
-        same_gst,
-        merged_data["gst_central_tax"] - merged_data["books_central_tax"],
-        0,
-    )
-    merged_data["state_tax_difference"] = np.where(
-        same_gst,
-        merged_data["gst_state_tax"] - merged_data["books_state_tax"],
-        0,
-    )
-    merged_data["cess_difference"] = np.where(
-        same_gst,
-        merged_data["gst_cess"] - merged_data["books_cess"],
-        0,
-    )
 
     return merged_data
 
@@ -679,6 +340,10 @@ def run_reconciliation(
     output_path: Path,
     gst_mode: str = "raw",
     books_mode: str = "raw",
+    tolerance: Optional[float] = None,
+    invoice_level: bool = False,
+    invoice_amount_tolerance: float = 1.0,
+    invoice_date_window: int = 5,
 ) -> Path:
     """
     Run full reconciliation pipeline and save to output_path.
@@ -689,37 +354,58 @@ def run_reconciliation(
         output_path: Where to save reconciled output (CSV/Excel).
         gst_mode: "raw" if gst_input is raw B2B Excel, "clean" if already cleaned.
         books_mode: "raw" if books_input is raw Zoho Books export, "clean" if already cleaned.
+        tolerance: If set, flag matched rows whose differences exceed this many rupees.
+        invoice_level: Also match individual invoices to bills and save them to
+            "<output stem>_invoices<ext>" next to output_path.
+        invoice_amount_tolerance: Rupee tolerance for invoice-level matches.
+        invoice_date_window: Max days between invoice and bill date for fuzzy matches.
 
     Returns the resolved output_path.
     """
     _print_header("GST vs BOOKKEEPING RECONCILIATION")
+    use_cleaned_gst = gst_mode.lower() == "clean"
+    use_cleaned_books = books_mode.lower() == "clean"
+
+    # Step 0: Header-only check of both inputs before loading either
+    print("\n" + "=" * 60)
+    print("STEP 0: Pre-flight Header Check")
+    print("=" * 60)
+    with stage("preflight"):
+        gst_files = gst_input_files(gst_input, use_cleaned=use_cleaned_gst)
+        books_files = bookkeeping_input_files(books_input, use_cleaned=use_cleaned_books)
 
     # Step 1: GST processing
     print("\n" + "=" * 60)
     print("STEP 1: GST File Processing")
     print("=" * 60)
     print(f"Input path: {gst_input} (mode: {gst_mode})")
-    use_cleaned_gst = gst_mode.lower() == "clean"
-    gst_df = process_gst_files(gst_input, use_cleaned=use_cleaned_gst)
+    with stage("load", "GST") as record:
+        gst_df = process_gst_files(gst_input, use_cleaned=use_cleaned_gst, files=gst_files)
+        record["rows_out"] = len(gst_df)
 
     # Step 2: Bookkeeping processing
     print("\n" + "=" * 60)
     print("STEP 2: Bookkeeping File Processing")
     print("=" * 60)
     print(f"Input path: {books_input} (mode: {books_mode})")
-    use_cleaned_books = books_mode.lower() == "clean"
-    books_df = process_bookkeeping_files(books_input, use_cleaned=use_cleaned_books)
+    with stage("load", "Books") as record:
+        books_df = process_bookkeeping_files(books_input, use_cleaned=use_cleaned_books, files=books_files)
+        record["rows_out"] = len(books_df)
 
     # Step 3: Prepare data
     print("\n" + "=" * 60)
     print("STEP 3: Preparing Data for Reconciliation")
     print("=" * 60)
     print("  → Preparing GST data...")
-    gst_data_main = prepare_gst_data(gst_df)
+    with stage("aggregate", "GST", rows_in=len(gst_df)) as record:
+        gst_data_main = prepare_gst_data(gst_df)
+        record["rows_out"] = len(gst_data_main)
     print(f"     GST records: {len(gst_data_main)}")
 
     print("  → Preparing bookkeeping data...")
-    books_required = prepare_bookkeeping_data(books_df)
+    with stage("aggregate", "Books", rows_in=len(books_df)) as record:
+        books_required = prepare_bookkeeping_data(books_df)
+        record["rows_out"] = len(books_required)
     print(f"     Bookkeeping records: {len(books_required)}")
 
     # Step 4: Reconcile
@@ -727,7 +413,9 @@ def run_reconciliation(
     print("STEP 4: Reconciliation")
     print("=" * 60)
     print("  → Merging and calculating differences...")
-    merged_data = reconcile_data(gst_data_main, books_required)
+    with stage("merge", rows_in=len(gst_data_main) + len(books_required)) as record:
+        merged_data = reconcile_data(gst_data_main, books_required, tolerance=tolerance)
+        record["rows_out"] = len(merged_data)
     print(f"     Merged records: {len(merged_data)}")
 
     # Step 5: Save output
@@ -735,14 +423,16 @@ def run_reconciliation(
     print("STEP 5: Saving Output")
     print("=" * 60)
 
-    output_path = output_path.expanduser().resolve()
+    output_path = preview_path(output_path.expanduser().resolve())
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     ext = output_path.suffix.lower()
-    if ext in {".xlsx", ".xls"}:
-        merged_data.to_excel(output_path, index=False)
-    else:
-        merged_data.to_csv(output_path, index=False)
+    with stage("write", rows_in=len(merged_data)):
+        if ext in {".xlsx", ".xls"}:
+            merged_data.to_excel(output_path, index=False)
+        else:
+            merged_data.to_csv(output_path, index=False)
+    outputs = [output_path]
 
     print("\n✅ Reconciliation Complete!")
     print(f"   Output saved to: {output_path}")
@@ -751,7 +441,48 @@ def run_reconciliation(
         f"   Matched records: "
         f"{len(merged_data[merged_data['Match_Flag'] == 'GST Match'])}"
     )
-
+    if tolerance is not None:
+        above = int((merged_data["Tolerance_Flag"] == "Above Tolerance").sum())
+        print(f"   Above ₹{tolerance:g} tolerance: {above}")
+
+    if invoice_level:
+        # Step 6: Invoice-level matching
+        print("\n" + "=" * 60)
+        print("STEP 6: Invoice-Level Matching")
+        print("=" * 60)
+        print(
+            f"  → Matching invoices to bills "
+            f"(±₹{invoice_amount_tolerance:g}, ±{invoice_date_window} days)..."
+        )
+        with stage("map", "Invoices", rows_in=len(gst_df) + len(books_df)) as record:
+            invoice_matches = match_invoices(
+                gst_df,
+                books_df,
+                amount_tolerance=invoice_amount_tolerance,
+                date_window_days=invoice_date_window,
+            )
+            record["rows_out"] = len(invoice_matches)
+        invoice_output = output_path.with_name(
+            f"{output_path.stem}_invoices{output_path.suffix}"
+        )
+        with stage("write", "Invoices", rows_in=len(invoice_matches)):
+            if ext in {".xlsx", ".xls"}:
+                invoice_matches.to_excel(invoice_output, index=False)
+            else:
+                invoice_matches.to_csv(invoice_output, index=False)
+        outputs.append(invoice_output)
+
+        gst_invoices, books_bills, counts = summarize_matches(invoice_matches)
+        print("\n✅ Invoice-Level Matching Complete!")
+        print(f"   Output saved to: {invoice_output}")
+        print(f"   GST invoices   : {gst_invoices}")
+        print(f"   Books bills    : {books_bills}")
+        for status, count in counts.items():
+            print(f"   {status:<15}: {count}")
+
+    # Raw GSTR-2B workbooks are read from their B2B sheet
+    gst_inputs = gst_files if use_cleaned_gst else [(f, "B2B") for f in gst_files]
+    preview_report(gst_inputs + books_files, outputs)
     return output_path
 
 
@@ -794,12 +525,62 @@ Examples:
         required=True,
         help="Output CSV/Excel file path",
     )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help="Flag matched rows whose differences exceed this amount in rupees (adds Tolerance_Flag)",
+    )
+    parser.add_argument(
+        "--invoice-level",
+        action="store_true",
+        help='Also match individual GST invoices to Books bills (saved as "<output>_invoices")',
+    )
+    parser.add_argument(
+        "--invoice-amount-tolerance",
+        type=float,
+        default=1.0,
+        help="Rupee tolerance for invoice-level matching (default: 1.0)",
+    )
+    parser.add_argument(
+        "--invoice-date-window",
+        type=int,
+        default=5,
+        help="Max days between invoice and bill date for fuzzy invoice matches (default: 5)",
+    )
+    parser.add_argument(
+        "--preview",
+        type=int,
+        metavar="N",
+        help="Dry run on the first N rows of every input and extrapolate the output size",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="JSON",
+        help="Write per-stage timings and memory use to this JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run; writes <output>.prof and a hot-function summary",
+    )
+    parser.add_argument(
+        "--progress-json",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Emit JSON-lines progress events on stdout (or append them to PATH)",
+    )
     return parser
 
 
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
+    set_preview_rows(args.preview)
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, preview_path(args.output))
+    set_progress(args.progress_json)
 
     try:
         gst_input = args.gst_input
@@ -811,11 +592,17 @@ def main() -> None:
             output_path,
             gst_mode=args.gst_mode,
             books_mode=args.books_mode,
+            tolerance=args.tolerance,
+            invoice_level=args.invoice_level,
+            invoice_amount_tolerance=args.invoice_amount_tolerance,
+            invoice_date_window=args.invoice_date_window,
         )
     except Exception:
         print("\n❌ Error during processing:")
         print(traceback.format_exc())
+        write_metrics("error")
         sys.exit(1)
+    write_metrics()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark of `read_csv_typed` on a large Amazon MTR B2B export.
+
+Writes a synthetic MTR B2B CSV (the columns gst_reconcile reads plus a
+few it ignores, as in real exports) and reads it with AMAZON_MTR_SCHEMA
+once per CSV engine: pandas' C parser and, when installed, pyarrow. Each
+read runs in a fresh process, so the peak RSS printed is that engine's
+alone. The columns, row count and dtypes of both reads are compared.
+
+Usage:
+    python scripts/csv_ingest_benchmark.py --rows 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from finance_io import have_pyarrow, lazy_import, peak_rss_mb, read_csv_typed
+from gst_reconcile import AMAZON_MTR_COLUMNS, AMAZON_MTR_SCHEMA
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Present in real exports but not read by gst_reconcile
+IGNORED_COLUMNS = ["Warehouse Id", "Fulfillment Channel", "Payment Method Code", "Bill To City", "Ship To City"]
+STATES = ["DELHI", "KARNATAKA", "MAHARASHTRA", "TAMIL NADU", "WEST BENGAL"]
+CHUNK_ROWS = 250_000
+
+
+def _chunk(start: int, rows: int, rng) -> "pd.DataFrame":
+    """rows synthetic MTR B2B lines numbered from start."""
+    ids = np.arange(start, start + rows)
+    refund = rng.random(rows) < 0.08
+    dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 31 * 24 * 3600, rows), unit="s")
+    intra = rng.random(rows) < 0.3
+    columns = {
+        "Invoice Number": pd.Series(ids).map("IN-DEL-{:09d}".format),
+        "Invoice Date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "Transaction Type": np.where(refund, "Refund", "Shipment"),
+        "Principal Amount Basis": np.round(rng.uniform(50, 5000, rows), 2),
+        "Cgst Rate": np.where(intra, 0.09, 0.0),
+        "Sgst Rate": np.where(intra, 0.09, 0.0),
+        "Igst Rate": np.where(intra, 0.0, 0.18),
+        "Utgst Rate": 0.0,
+        "Ship To State": np.array(STATES)[rng.integers(0, len(STATES), rows)],
+        "Credit Note Date": np.where(refund, dates.strftime("%Y-%m-%d %H:%M:%S"), ""),
+        "Credit Note No": np.where(refund, pd.Series(ids).map("CN-{:09d}".format), ""),
+        "Seller Gstin": "29AAAAA0000A1Z5",
+        "Customer Bill To Gstid": np.where(rng.random(rows) < 0.5, "07BBBBB1111B1Z6", ""),
+        "Buyer Name": "Buyer",
+        "Order Id": pd.Series(ids).map(lambda i: f"402-{i % 9999999:07d}-{i // 7 % 9999999:07d}"),
+        "Sku": pd.Series(rng.integers(0, 5000, rows)).map("SKU-{:05d}".format),
+        "Item Description": "Synthetic item",
+        "Quantity": rng.integers(1, 4, rows),
+        "Hsn/sac": "39241090",
+        "Tcs Igst Amount": 0.0,
+        "Tcs Cgst Amount": 0.0,
+        "Tcs Sgst Amount": 0.0,
+        "Irn Filing Status": "",
+        "Irn Number": "",
+    }
+    for name in IGNORED_COLUMNS:
+        columns[name] = "x"
+    return pd.DataFrame({name: columns[name] for name in AMAZON_MTR_COLUMNS + IGNORED_COLUMNS})
+
+
+def write_synthetic_mtr(path: Path, rows: int, seed: int = 0) -> Path:
+    """Write a rows-long MTR B2B CSV in chunks."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = _chunk(start, min(CHUNK_ROWS, rows - start), rng)
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return path
+
+
+def read_once(path: str, engine: str) -> Dict:
+    """Read path with read_csv_typed on one engine; time, peak RSS and shape."""
+    started = time.perf_counter()
+    df = read_csv_typed(Path(path), AMAZON_MTR_SCHEMA, engine=engine)
+    seconds = time.perf_counter() - started
+    return {
+        "engine": engine,
+        "seconds": round(seconds, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "rows": len(df),
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="read_csv_typed time and memory per CSV engine")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows in the synthetic MTR (default: 2000000)")
+    parser.add_argument("--csv", type=str, help="Benchmark this MTR CSV instead of a synthetic one")
+    parser.add_argument("--repeat", type=int, default=3, help="Reads per engine; the fastest is reported (default: 3)")
+    args = parser.parse_args()
+
+    engines = ["c", "pyarrow"] if have_pyarrow() else ["c"]
+    if not have_pyarrow():
+        print("pyarrow is not installed; only the C parser is measured")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.csv:
+            path = Path(args.csv)
+        else:
+            started = time.perf_counter()
+            path = write_synthetic_mtr(Path(tmp) / "MTR_B2B-synthetic.csv", args.rows)
+            print(f"Synthetic MTR: {args.rows} rows ({path.stat().st_size / 1024 ** 2:.0f} MB) "
+                  f"written in {time.perf_counter() - started:.1f}s")
+
+        # Fresh interpreter per read so the peaks do not mix
+        ctx = multiprocessing.get_context("spawn")
+        results = []
+        for engine in engines:
+            runs = []
+            for _ in range(args.repeat):
+                with ctx.Pool(1, maxtasksperchild=1) as pool:
+                    runs.append(pool.apply(read_once, (str(path), engine)))
+            results.append(min(runs, key=lambda r: r["seconds"]))
+
+    for result in results:
+        print(f"\n{result['engine']:>8}: {result['rows']} rows in {result['seconds']}s, "
+              f"peak RSS {result['peak_rss_mb']} MB")
+    if len(results) == 2:
+        c, arrow = results
+        print(f"\npyarrow speed-up: {c['seconds'] / arrow['seconds']:.1f}x")
+        differing = {col for col in c["dtypes"] if c["dtypes"][col] != arrow["dtypes"].get(col)}
+        if set(c["dtypes"]) != set(arrow["dtypes"]) or c["rows"] != arrow["rows"]:
+            print("   columns or row counts differ between engines")
+        for col in sorted(differing):
+            print(f"   dtype of {col}: c {c['dtypes'][col]}, pyarrow {arrow['dtypes'].get(col)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+Shared helpers for the finance CLI scripts in this folder.
+
+The scripts are run directly (``python scripts/<name>.py``), so this package is
+importable as ``finance_io`` from any of them.
+"""
+
+from .column_mapping import find_column_mapping, resolve_column_mapping
+from .doctype import (
+    CREDIT_NOTE,
+    DOCUMENT_LABELS,
+    DOCUMENT_SIGNATURES,
+    OTHER,
+    TAX_INVOICE,
+    DocumentTypeMismatch,
+    classify_page,
+    classify_pdf,
+    classify_text,
+    expect_document,
+    page_text,
+)
+from .ingest import (
+    CSV_ENGINE_ENV,
+    CsvSchema,
+    csv_engine,
+    csv_header,
+    have_pyarrow,
+    read_csv_typed,
+    text_dtype,
+)
+from .invoice_index import INVOICE_INDEX_ENV, INVOICE_INDEX_NAME, InvoiceIndex, invoice_index_path
+from .isolation import (
+    RSS_EXIT_CODE,
+    WATCHDOG_INTERVAL,
+    WORKER_MAX_RSS_ENV,
+    WORKER_TIMEOUT_ENV,
+    IsolatedWorker,
+    WorkerLimitExceeded,
+    worker_limits,
+)
+from .journal import JOURNAL_BATCH_FILES, JOURNAL_NAME, RETRY_STATUS, BatchJournal, file_sha256
+from .layout import (
+    CREDIT_NOTE_TEMPLATE,
+    SNAP_TOLERANCE,
+    TABLE_ENGINE_ENV,
+    TABLE_ENGINES,
+    TAX_INVOICE_TEMPLATE,
+    TableReader,
+    TableTemplate,
+    table_engine,
+)
+from .lazy import lazy_import
+from .loaders import (
+    BOOKS_DECIMAL_COLUMNS,
+    BOOKS_RENAME_COLUMNS,
+    BOOKS_USE_COLUMNS,
+    GST_B2B_RENAME_COLUMNS,
+    GST_B2B_REQUIRED_COLUMNS,
+    coerce_dates,
+    collect_files,
+    excel_sheet_names,
+    flatten_columns,
+    load_books,
+    load_cleaned_books,
+    load_cleaned_gst,
+    load_gst_b2b,
+    read_table,
+)
+from .marketplace import classify_marketplace, load_marketplace_rules
+from .metrics import (
+    METRICS_ENV,
+    METRICS_TRACEMALLOC_ENV,
+    begin_stage,
+    current_rss_mb,
+    end_stage,
+    metrics_path,
+    peak_rss_mb,
+    set_metrics_path,
+    stage,
+    stage_metrics,
+    write_metrics,
+)
+from .pdfpages import iter_pages, open_pdf, release_document_cache, release_page
+from .periods import PERIOD_COLUMN, filter_periods, format_period, month_end_period
+from .preflight import (
+    CLEANED_BOOKS_REQUIRED_COLUMNS,
+    CLEANED_GST_REQUIRED_COLUMNS,
+    HeaderCheck,
+    books_check,
+    check_header,
+    cleaned_books_check,
+    cleaned_gst_check,
+    gst_b2b_check,
+    missing_columns,
+    preflight_files,
+    preflight_report,
+    read_header,
+    run_preflight,
+)
+from .preview import (
+    PREVIEW_ENV,
+    PREVIEW_SUFFIX,
+    count_rows,
+    preview_path,
+    preview_report,
+    preview_rows,
+    set_preview_rows,
+)
+from .profiling import (
+    PROFILE_ENV,
+    PROFILE_TOP_N,
+    add_worker_stats,
+    profile_base,
+    profile_mode,
+    profiled_call,
+    start_profile,
+    worker_profiling,
+)
+from .progress import PROGRESS_ENV, emit, progress_target, set_progress, track
+from .sales_store import (
+    MEASURE_COLUMNS,
+    NUMERIC_COLUMNS,
+    SALES_SCHEMA,
+    SALES_STORE_ENV,
+    SALES_STORE_NAME,
+    UNIFIED_COLUMNS,
+    SalesStore,
+    month_end,
+    sales_store_path,
+)
+from .sniff import RETAIL_LAYOUTS, SNIFF_ROWS, read_sniffed_excel, sniff_header
+from .spool import SPOOL_BATCH_ROWS, STREAM_ENV, RowBuffer, RowSpool, spool_dir, stream_enabled
+from .writers import write_table
+
+__all__ = [
+    "BOOKS_DECIMAL_COLUMNS",
+    "BOOKS_RENAME_COLUMNS",
+    "BOOKS_USE_COLUMNS",
+    "CLEANED_BOOKS_REQUIRED_COLUMNS",
+    "CLEANED_GST_REQUIRED_COLUMNS",
+    "CREDIT_NOTE",
+    "CREDIT_NOTE_TEMPLATE",
+    "CSV_ENGINE_ENV",
+    "DOCUMENT_LABELS",
+    "DOCUMENT_SIGNATURES",
+    "GST_B2B_RENAME_COLUMNS",
+    "GST_B2B_REQUIRED_COLUMNS",
+    "INVOICE_INDEX_ENV",
+    "INVOICE_INDEX_NAME",
+    "JOURNAL_BATCH_FILES",
+    "JOURNAL_NAME",
+    "MEASURE_COLUMNS",
+    "METRICS_ENV",
+    "METRICS_TRACEMALLOC_ENV",
+    "NUMERIC_COLUMNS",
+    "OTHER",
+    "PERIOD_COLUMN",
+    "PREVIEW_ENV",
+    "PREVIEW_SUFFIX",
+    "PROFILE_ENV",
+    "PROFILE_TOP_N",
+    "PROGRESS_ENV",
+    "RETAIL_LAYOUTS",
+    "RETRY_STATUS",
+    "RSS_EXIT_CODE",
+    "SALES_SCHEMA",
+    "SALES_STORE_ENV",
+    "SALES_STORE_NAME",
+    "SNAP_TOLERANCE",
+    "SNIFF_ROWS",
+    "SPOOL_BATCH_ROWS",
+    "STREAM_ENV",
+    "TABLE_ENGINES",
+    "TABLE_ENGINE_ENV",
+    "TAX_INVOICE",
+    "TAX_INVOICE_TEMPLATE",
+    "UNIFIED_COLUMNS",
+    "WATCHDOG_INTERVAL",
+    "WORKER_MAX_RSS_ENV",
+    "WORKER_TIMEOUT_ENV",
+    "BatchJournal",
+    "CsvSchema",
+    "DocumentTypeMismatch",
+    "HeaderCheck",
+    "InvoiceIndex",
+    "IsolatedWorker",
+    "RowBuffer",
+    "RowSpool",
+    "SalesStore",
+    "TableReader",
+    "TableTemplate",
+    "WorkerLimitExceeded",
+    "add_worker_stats",
+    "begin_stage",
+    "books_check",
+    "check_header",
+    "classify_marketplace",
+    "classify_page",
+    "classify_pdf",
+    "classify_text",
+    "cleaned_books_check",
+    "cleaned_gst_check",
+    "coerce_dates",
+    "collect_files",
+    "count_rows",
+    "csv_engine",
+    "csv_header",
+    "current_rss_mb",
+    "emit",
+    "end_stage",
+    "excel_sheet_names",
+    "expect_document",
+    "file_sha256",
+    "filter_periods",
+    "find_column_mapping",
+    "flatten_columns",
+    "format_period",
+    "gst_b2b_check",
+    "have_pyarrow",
+    "invoice_index_path",
+    "iter_pages",
+    "lazy_import",
+    "load_books",
+    "load_cleaned_books",
+    "load_cleaned_gst",
+    "load_gst_b2b",
+    "load_marketplace_rules",
+    "metrics_path",
+    "missing_columns",
+    "month_end",
+    "month_end_period",
+    "open_pdf",
+    "page_text",
+    "peak_rss_mb",
+    "preflight_files",
+    "preflight_report",
+    "preview_path",
+    "preview_report",
+    "preview_rows",
+    "profile_base",
+    "profile_mode",
+    "profiled_call",
+    "progress_target",
+    "read_csv_typed",
+    "read_header",
+    "read_sniffed_excel",
+    "read_table",
+    "release_document_cache",
+    "release_page",
+    "resolve_column_mapping",
+    "run_preflight",
+    "sales_store_path",
+    "set_metrics_path",
+    "set_preview_rows",
+    "set_progress",
+    "sniff_header",
+    "spool_dir",
+    "stage",
+    "stage_metrics",
+    "start_profile",
+    "stream_enabled",
+    "table_engine",
+    "text_dtype",
+    "track",
+    "worker_limits",
+    "worker_profiling",
+    "write_metrics",
+    "write_table",
+]
@@ -0,0 +1,216 @@
+"""
+Flexible header matching for GSTR-2B B2B exports, with a cache per header layout.
+
+GSTR-2B workbooks from the portal almost always share the same two-level header,
+so the keyword scan only needs to run the first time a layout is seen. Mappings
+are memoized by a fingerprint of the flattened header, in-process and on disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Key terms for each expected B2B column (used when no exact match exists)
+GST_B2B_COLUMN_KEYWORDS: Dict[str, List[str]] = {
+    "GSTIN_of_supplier_Unnamed:_0_level_1": ["gstin", "supplier"],
+    "Trade/Legal name_Unnamed:_1_level_1": ["trade", "legal", "name"],
+    "Invoice_Details_Invoice_number": ["invoice", "number"],
+    "Invoice_Details_Invoice_Date": ["invoice", "date"],
+    "Invoice_Details_Invoice_Value": ["invoice", "value"],
+    "Place_of_supply_Unnamed:_6_level_1": ["place", "supply"],
+    "Supply Attract Reverse Charge_Unnamed:_7_level_1": [
+        "supply",
+        "attract",
+        "reverse",
+        "charge",
+    ],
+    "Taxable_Value_Unnamed:_8_level_1": ["taxable", "value"],
+    "Tax_Amount_Integrated_Tax": ["integrated", "tax"],
+    "Tax_Amount_Central_Tax": ["central", "tax"],
+    "Tax_Amount_State/UT_Tax": ["state", "ut", "tax"],
+    "Tax_Amount_Cess": ["cess"],
+    "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1": [
+        "filing",
+        "date",
+        "gstr",
+    ],
+}
+
+CACHE_FILE_NAME = "column_mappings.json"
+
+_memory_cache: Dict[str, Dict[str, str]] = {}
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+def cache_dir() -> Path:
+    """Directory for on-disk caches (HRMS_CACHE_DIR, default ~/.cache/hrms-finance)."""
+    env = os.environ.get("HRMS_CACHE_DIR")
+    if env:
+        return Path(env).expanduser()
+    return Path.home() / ".cache" / "hrms-finance"
+
+
+def layout_fingerprint(
+    actual_columns: Sequence[str],
+    expected_columns: Sequence[str],
+    keywords: Dict[str, List[str]],
+) -> str:
+    """Stable fingerprint of a header layout and the matching rules applied to it."""
+    payload = json.dumps(
+        [list(actual_columns), list(expected_columns), keywords],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _load_disk_cache() -> Dict[str, Dict[str, str]]:
+    try:
+        with open(cache_dir() / CACHE_FILE_NAME, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_disk_cache(fingerprint: str, mapping: Dict[str, str]) -> None:
+    """Add one mapping to the on-disk cache. Best effort: I/O errors are ignored."""
+    path = cache_dir() / CACHE_FILE_NAME
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = _load_disk_cache()
+        data[fingerprint] = mapping
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# =============================================================================
+# MATCHING
+# =============================================================================
+
+def find_column_mapping(
+    actual_columns: List[str],
+    expected_columns: Sequence[str],
+    keywords: Optional[Dict[str, List[str]]] = None,
+    verbose: bool = True,
+) -> Dict[str, str]:
+    """
+    Map expected column names to actual column names using flexible matching.
+    Returns a dictionary mapping expected -> actual column names.
+    """
+    column_keywords = GST_B2B_COLUMN_KEYWORDS if keywords is None else keywords
+    mapping = {}
+    actual_lower = [c.lower() for c in actual_columns]
+
+    for expected in expected_columns:
+        # Try exact match first
+        if expected in actual_columns:
+            mapping[expected] = expected
+            continue
+
+        # Try case-insensitive exact match
+        expected_lower = expected.lower()
+        if expected_lower in actual_lower:
+            idx = actual_lower.index(expected_lower)
+            mapping[expected] = actual_columns[idx]
+            continue
+
+        # Try partial matching using keywords
+        keywords_for_col = column_keywords.get(expected, [])
+        if not keywords_for_col:
+            # Fallback: extract key parts from expected column name
+            key_parts = expected.split("_Unnamed:")[0].lower()
+            key_parts = key_parts.replace("/", "_").replace("-", "_").split("_")
+            keywords_for_col = [
+                p
+                for p in key_parts
+                if p and p not in ["unnamed", "level", "details", "amount"]
+            ]
+
+        best_match = None
+        best_score = 0
+
+        for actual in actual_columns:
+            actual_lower_clean = actual.lower().replace("/", "_").replace("-", "_")
+
+            # Count how many keywords are found in the actual column name
+            matches = sum(1 for keyword in keywords_for_col if keyword in actual_lower_clean)
+
+            # Require at least 50% of keywords to match, or all if there are only 1–2
+            min_required = (
+                max(1, int(len(keywords_for_col) * 0.5))
+                if len(keywords_for_col) > 2
+                else len(keywords_for_col)
+            )
+
+            if matches >= min_required and matches > best_score:
+                best_score = matches
+                best_match = actual
+
+        if best_match:
+            mapping[expected] = best_match
+            if verbose:
+                print(f"    ✓ Matched '{expected}' -> '{best_match}'")
+        else:
+            # If no match found, raise error with helpful message
+            preview = (
+                f"{actual_columns[:15]}..."
+                if len(actual_columns) > 15
+                else f"{actual_columns}"
+            )
+            raise ValueError(
+                f"Could not find column matching '{expected}'. "
+                f"Looking for keywords: {keywords_for_col}. "
+                f"Available columns: {preview}"
+            )
+
+    return mapping
+
+
+def resolve_column_mapping(
+    actual_columns: List[str],
+    expected_columns: Sequence[str],
+    keywords: Optional[Dict[str, List[str]]] = None,
+    use_disk_cache: bool = True,
+) -> Dict[str, str]:
+    """
+    Cached `find_column_mapping`.
+
+    Repeat header layouts are answered from the in-process or on-disk cache
+    without any fuzzy matching; the column list and match log are printed
+    only the first time a layout is seen.
+    """
+    column_keywords = GST_B2B_COLUMN_KEYWORDS if keywords is None else keywords
+    fingerprint = layout_fingerprint(actual_columns, expected_columns, column_keywords)
+
+    mapping = _memory_cache.get(fingerprint)
+    if mapping is None and use_disk_cache:
+        mapping = _load_disk_cache().get(fingerprint)
+        if mapping is not None:
+            _memory_cache[fingerprint] = mapping
+    if mapping is not None:
+        print(f"    ✓ Known header layout ({fingerprint[:8]}), reusing column mapping")
+        return dict(mapping)
+
+    print(f"    📋 New header layout ({fingerprint[:8]}), {len(actual_columns)} columns")
+    if len(actual_columns) <= 20:
+        print(f"    Columns: {list(actual_columns)}")
+    else:
+        print(f"    First 10 columns: {list(actual_columns[:10])}")
+
+    mapping = find_column_mapping(actual_columns, expected_columns, column_keywords)
+    _memory_cache[fingerprint] = mapping
+    if use_disk_cache:
+        _save_disk_cache(fingerprint, mapping)
+    return dict(mapping)
@@ -0,0 +1,99 @@
+"""
+First-page document classifier for the Amazon PDF extractors.
+
+Mixed upload folders hold payment advices, statements and the other kind of
+Amazon document next to the ones an extractor wants. `classify_page` looks
+only at the characters of the first page, in content-stream order, with no
+line clustering or table detection, and matches them against
+DOCUMENT_SIGNATURES. Content-stream order is not always reading order, so a
+page is only rejected on a positive match: `expect_document` refuses a file
+that matches another kind's signature ahead of the expected one, and lets
+everything else through to the header regexes, which remain the real check.
+pdfplumber caches the parsed characters, so an accepted page is not
+interpreted a second time.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Pattern, Tuple
+
+from .pdfpages import open_pdf
+
+TAX_INVOICE = "tax_invoice"
+CREDIT_NOTE = "credit_note"
+OTHER = "other"
+
+DOCUMENT_LABELS: Dict[str, str] = {
+    TAX_INVOICE: "tax invoice",
+    CREDIT_NOTE: "credit note",
+    OTHER: "other document",
+}
+
+# Document kind -> patterns that must all match; the first kind that matches
+# wins, so more specific kinds come first (a credit note also quotes its
+# invoice number). Whitespace is optional because characters are joined
+# without spaces.
+DOCUMENT_SIGNATURES: List[Tuple[str, Tuple[Pattern, ...]]] = [
+    (OTHER, (re.compile(r"payment\s*advice|remittance\s*advice|statement\s*of\s*account", re.IGNORECASE),)),
+    (
+        CREDIT_NOTE,
+        (
+            re.compile(r"credit\s*note\s*number", re.IGNORECASE),
+            re.compile(r"credit\s*note\s*date", re.IGNORECASE),
+        ),
+    ),
+    (
+        TAX_INVOICE,
+        (
+            re.compile(r"invoice\s*number", re.IGNORECASE),
+            re.compile(r"invoice\s*date", re.IGNORECASE),
+        ),
+    ),
+]
+
+
+class DocumentTypeMismatch(ValueError):
+    """A PDF was classified as a different kind of document than expected."""
+
+
+def classify_text(text: str) -> str:
+    """Document kind for a page's text: TAX_INVOICE, CREDIT_NOTE or OTHER."""
+    for kind, patterns in DOCUMENT_SIGNATURES:
+        if all(p.search(text) for p in patterns):
+            return kind
+    return OTHER
+
+
+def page_text(page) -> str:
+    """The page's characters in content-stream order, without layout analysis."""
+    return "".join(char["text"] for char in page.chars)
+
+
+def classify_page(page) -> str:
+    """Document kind of a pdfplumber page."""
+    return classify_text(page_text(page))
+
+
+def classify_pdf(path) -> str:
+    """Document kind of a PDF file, from its first page."""
+    with open_pdf(path) as pdf:
+        if not pdf.pages:
+            return OTHER
+        return classify_page(pdf.pages[0])
+
+
+def expect_document(page, expected: str) -> None:
+    """
+    Raise DocumentTypeMismatch when page matches the signature of a kind
+    listed ahead of expected. A page that matches nothing, or only kinds
+    after expected, is let through.
+    """
+    text = page_text(page)
+    for kind, patterns in DOCUMENT_SIGNATURES:
+        if kind == expected:
+            return
+        if all(p.search(text) for p in patterns):
+            raise DocumentTypeMismatch(
+                f"Classified as {DOCUMENT_LABELS[kind]}, not a {DOCUMENT_LABELS[expected]}"
+            )
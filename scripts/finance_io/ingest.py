@@ -0,0 +1,177 @@
+"""
+CSV ingestion with per-source schemas and an optional pyarrow engine.
+
+Marketplace exports (Amazon MTR/B2C/Stock, Jio, Zoho Books, shipments) are
+read through `read_csv_typed`. When pyarrow is installed the multithreaded
+pyarrow CSV reader is used; otherwise, or if it rejects a file or an option,
+the read silently falls back to pandas' C parser. A `CsvSchema` names the
+columns a processor uses, which of them are identifiers to keep as text,
+and which amounts and dates to convert once at load time.
+
+Identifier columns (the schema's text columns and any ``dtype``) are handed
+to pyarrow as string columns, so they are never inferred as numbers: HSN
+"0012" and invoice "000123" keep their leading zeros on both engines.
+
+Set HRMS_CSV_ENGINE=c (or =pyarrow) to force one engine.
+"""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+
+from .lazy import lazy_import
+from .preview import preview_rows
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+CSV_ENGINE_ENV = "HRMS_CSV_ENGINE"
+
+# pandas' default missing-value markers, which the C parser applies
+NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+
+class CsvSchema(NamedTuple):
+    """Columns to read from one kind of CSV export and how to type them."""
+
+    columns: Optional[Sequence[str]] = None  # projection; absent columns are skipped
+    text: Sequence[str] = ()  # identifiers (GSTIN, invoice/order IDs, SKU, HSN)
+    numbers: Sequence[str] = ()  # amounts, coerced with errors="coerce"
+    dates: Sequence[str] = ()  # parsed once with errors="coerce"
+
+
+@lru_cache(maxsize=None)
+def have_pyarrow() -> bool:
+    """True when pyarrow can be imported (checked without importing it)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def csv_engine() -> str:
+    """Engine for `read_csv_typed`: HRMS_CSV_ENGINE, else pyarrow when installed."""
+    engine = os.environ.get(CSV_ENGINE_ENV, "").strip().lower()
+    if engine in ("c", "pyarrow"):
+        return engine
+    return "pyarrow" if have_pyarrow() else "c"
+
+
+def text_dtype():
+    """
+    String dtype for identifier columns: Arrow-backed when pyarrow is available.
+
+    Missing values stay NaN (not pd.NA), so `.astype(str)` and the "nan"
+    checks in the processors behave as they do on object columns. pandas
+    versions without that StringDtype option get plain object strings.
+    """
+    try:
+        return pd.StringDtype("pyarrow" if have_pyarrow() else "python", na_value=np.nan)
+    except TypeError:
+        return str
+
+
+def csv_header(path: Path) -> List[str]:
+    """Column names from the first line of a CSV file."""
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as fh:
+        return next(csv.reader(fh), [])
+
+
+def _read_pyarrow(path: Path, usecols: Optional[Sequence[str]] = None, dtype=None) -> pd.DataFrame:
+    """
+    pandas.read_csv(path, usecols=usecols, dtype=dtype) on the pyarrow CSV
+    reader. The dtype columns are read as strings rather than converted after
+    pyarrow has inferred them; any other option raises TypeError.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    options = {}
+    if usecols is not None:
+        # pandas keeps the file's column order, whatever the order of usecols
+        wanted = set(usecols)
+        options["include_columns"] = [c for c in csv_header(path) if c in wanted]
+    if dtype is not None:
+        if not isinstance(dtype, dict):
+            raise TypeError("only a per-column dtype mapping is read with pyarrow")
+        options["column_types"] = {c: pa.string() for c in dtype}
+    table = pa_csv.read_csv(
+        str(path),
+        convert_options=pa_csv.ConvertOptions(null_values=NA_VALUES, strings_can_be_null=True, **options),
+    )
+    # Columns with no values at all are float NaN under the C parser
+    schema = table.schema
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.float64()))
+    df = table.cast(schema).to_pandas()
+    return df.astype(dtype) if dtype else df
+
+
+def read_csv_typed(
+    path: Path,
+    schema: Optional[CsvSchema] = None,
+    engine: Optional[str] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Read a CSV file with the schema's projection and types applied.
+
+    Extra keyword arguments go to pandas.read_csv. The pyarrow reader takes
+    only usecols and dtype; with any other option, or if it fails for any
+    reason, the file is read with the C parser, so errors surface exactly as
+    they did before. In preview mode only the first preview_rows() rows are
+    read.
+    """
+    if preview_rows() and "nrows" not in kwargs:
+        kwargs["nrows"] = preview_rows()
+    if schema is not None:
+        header = csv_header(path) if schema.columns is not None or schema.text else []
+        if schema.columns is not None:
+            wanted = set(schema.columns)
+            kwargs.setdefault("usecols", [c for c in header if c in wanted])
+        if schema.text:
+            present = set(header)
+            dtype = {c: text_dtype() for c in schema.text if c in present}
+            kwargs["dtype"] = {**dtype, **(kwargs.get("dtype") or {})}
+
+    engine = engine or csv_engine()
+    df = None
+    if engine == "pyarrow":
+        try:
+            df = _read_pyarrow(path, **kwargs)
+        except Exception:
+            df = None
+    if df is None:
+        df = pd.read_csv(path, low_memory=False, **kwargs)
+
+    if schema is not None:
+        for col in schema.numbers:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        for col in schema.dates:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
@@ -0,0 +1,183 @@
+"""
+Persistent index of extracted Amazon invoice and credit note numbers.
+
+Every run of the PDF extractors records what it extracted (document type,
+number, date, source file, SHA-256 of the PDF, line items, total, batch and
+time) in a local SQLite database, by default ``invoice_index.sqlite`` in the
+cache directory (HRMS_CACHE_DIR). Any other PDF carrying a number that was
+extracted before, in an earlier batch or earlier in the same one, is
+reported as a duplicate, including a byte-identical copy under another file
+name ("Same Content" tells the two cases apart). Only re-extracting the same
+source file (same number, file name and SHA-256) is neither reported nor
+recorded again, so re-running a folder is harmless. `lookup` is one indexed
+query per file.
+
+The rows of a run are written in one short transaction after its workbook
+is saved, so a failed or interrupted run leaves nothing behind and other
+runs are never blocked for long. ``--invoice-index PATH`` or
+HRMS_INVOICE_INDEX picks another database; "off" disables the index.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .column_mapping import cache_dir
+from .journal import file_sha256
+
+INVOICE_INDEX_ENV = "HRMS_INVOICE_INDEX"
+INVOICE_INDEX_NAME = "invoice_index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_type TEXT NOT NULL,
+    number TEXT NOT NULL,
+    doc_date TEXT,
+    source_file TEXT,
+    sha256 TEXT,
+    line_items INTEGER,
+    total REAL,
+    batch TEXT,
+    extracted_at TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_number ON documents (doc_type, number);
+"""
+
+_COLUMNS = ["doc_type", "number", "doc_date", "source_file", "sha256", "line_items", "total", "batch", "extracted_at"]
+
+
+def invoice_index_path(path: Optional[str] = None) -> Optional[Path]:
+    """Database to use: the flag, else HRMS_INVOICE_INDEX, else the cache directory; None when off."""
+    value = (path or os.environ.get(INVOICE_INDEX_ENV, "")).strip()
+    if value.lower() in ("0", "off", "false", "no"):
+        return None
+    return Path(value).expanduser() if value else cache_dir() / INVOICE_INDEX_NAME
+
+
+class InvoiceIndex:
+    """Extracted documents of one type, with this run's additions pending until `commit`."""
+
+    def __init__(self, path: Path, doc_type: str, batch: Optional[str] = None):
+        self.path = Path(path)
+        self.doc_type = doc_type
+        self.batch = batch
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_by_number: Dict[str, List[Dict[str, Any]]] = {}
+        self._sha: Dict[str, str] = {}
+
+    def _file_sha256(self, pdf_path) -> str:
+        key = str(pdf_path)
+        if key not in self._sha:
+            self._sha[key] = file_sha256(pdf_path)
+        return self._sha[key]
+
+    def _source(self, pdf_path) -> Tuple[str, str]:
+        """(file name, SHA-256) identifying the source file of an extraction."""
+        return Path(pdf_path).name, self._file_sha256(pdf_path)
+
+    def lookup(self, number: str, other_than: Optional[Tuple[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        The first extraction of number (earlier runs first, then this run), or
+        None; with other_than, a (file name, SHA-256) pair, only extractions
+        from another source file.
+        """
+        name, sha = other_than or (None, None)
+        row = self.conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM documents WHERE doc_type = ? AND number = ? "
+            "AND NOT (source_file IS ? AND sha256 IS ?) ORDER BY id LIMIT 1",
+            (self.doc_type, number, name, sha),
+        ).fetchone()
+        if row is not None:
+            return dict(row)
+        return next(
+            (r for r in self._pending_by_number.get(number, []) if (r["source_file"], r["sha256"]) != (name, sha)),
+            None,
+        )
+
+    def indexed(self, number: str, pdf_path) -> bool:
+        """Whether number was already extracted from this very source file (same name and SHA-256)."""
+        name, sha = self._source(pdf_path)
+        row = self.conn.execute(
+            "SELECT 1 FROM documents WHERE doc_type = ? AND number = ? AND source_file = ? AND sha256 = ? LIMIT 1",
+            (self.doc_type, number, name, sha),
+        ).fetchone()
+        return row is not None or any(
+            (r["source_file"], r["sha256"]) == (name, sha) for r in self._pending_by_number.get(number, [])
+        )
+
+    def check(self, number: str, pdf_path) -> Optional[Dict[str, Any]]:
+        """
+        Duplicate QC row for pdf_path when another source file carrying number
+        was extracted before, else None. "Same Content" tells a copy of that
+        PDF under another name apart from a different PDF carrying the same
+        number; the same file extracted again is not a duplicate.
+        """
+        source = self._source(pdf_path)
+        previous = self.lookup(number, other_than=source)
+        if previous is None:
+            return None
+        return {
+            "Source File": source[0],
+            "Duplicate Of": previous["source_file"],
+            "Previous Batch": previous["batch"],
+            "Previously Extracted": previous["extracted_at"],
+            "Same Content": "Yes" if previous["sha256"] == source[1] else "No",
+        }
+
+    def add(self, number: str, pdf_path, **fields: Any) -> None:
+        """
+        Queue one extracted document (doc_date, line_items, total) from
+        pdf_path, unless this source file is already indexed under number.
+        """
+        if self.indexed(number, pdf_path):
+            return
+        record = {
+            "doc_type": self.doc_type,
+            "number": number,
+            "source_file": Path(pdf_path).name,
+            "sha256": self._file_sha256(pdf_path),
+            "batch": self.batch,
+            "extracted_at": datetime.now().isoformat(timespec="seconds"),
+            **fields,
+        }
+        self._pending.append(record)
+        self._pending_by_number.setdefault(number, []).append(record)
+
+    def commit(self) -> int:
+        """Write this run's new documents in one transaction; returns how many."""
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO documents ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [tuple(record.get(col) for col in _COLUMNS) for record in self._pending],
+            )
+        written, self._pending, self._pending_by_number = len(self._pending), [], {}
+        self._sha = {}
+        return written
+
+    def search(self, text: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Documents of any type whose number or source file contains text, newest first."""
+        like = f"%{text}%"
+        rows = self.conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM documents WHERE number LIKE ? OR source_file LIKE ? "
+            "ORDER BY id DESC LIMIT ?",
+            (like, like, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
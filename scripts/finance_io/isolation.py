@@ -0,0 +1,169 @@
+"""
+Per-call time and memory limits, enforced in a worker process.
+
+One pathological PDF can keep ``extract_tables()`` busy for minutes and
+grow the process by gigabytes. `IsolatedWorker` runs a function in a
+long-lived worker process, one call at a time:
+
+- the parent waits at most ``timeout`` seconds for each result, then kills
+  the worker and raises `WorkerLimitExceeded` ("Timed out after 30s");
+- a watchdog thread in the worker checks its RSS every WATCHDOG_INTERVAL
+  seconds and exits the process once it passes ``max_rss_mb``, which the
+  parent reports as "Exceeded memory limit of 1500 MB".
+
+A killed worker is replaced on the next call, so the batch carries on.
+Limits come from the script flags or from HRMS_WORKER_TIMEOUT /
+HRMS_WORKER_MAX_RSS_MB. With neither set, calls run in-process as before.
+The function must be defined at module level so it can be pickled. When the
+run is profiled, each call is profiled in the worker and its stats merged
+into the parent's profile (see finance_io.profiling).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from .metrics import current_rss_mb
+from .profiling import add_worker_stats, profiled_call, worker_profiling
+
+WORKER_TIMEOUT_ENV = "HRMS_WORKER_TIMEOUT"
+WORKER_MAX_RSS_ENV = "HRMS_WORKER_MAX_RSS_MB"
+
+# Seconds between RSS checks in the worker
+WATCHDOG_INTERVAL = 0.25
+
+# Exit code of a worker stopped by its RSS watchdog
+RSS_EXIT_CODE = 86
+
+
+class WorkerLimitExceeded(RuntimeError):
+    """A call ran past the timeout or the memory limit; the message says which."""
+
+
+def _env_limit(name: str) -> Optional[float]:
+    try:
+        value = float(os.environ.get(name, ""))
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def worker_limits(
+    timeout: Optional[float] = None, max_rss_mb: Optional[float] = None
+) -> Tuple[Optional[float], Optional[float]]:
+    """(timeout, max_rss_mb) from the flags, else the environment; None means no limit."""
+    return (
+        timeout or _env_limit(WORKER_TIMEOUT_ENV),
+        max_rss_mb or _env_limit(WORKER_MAX_RSS_ENV),
+    )
+
+
+def _rss_watchdog(max_rss_mb: float) -> None:
+    while True:
+        rss = current_rss_mb()
+        if rss is not None and rss > max_rss_mb:
+            os._exit(RSS_EXIT_CODE)
+        time.sleep(WATCHDOG_INTERVAL)
+
+
+def _worker_main(conn, func: Callable, max_rss_mb: Optional[float], profile: bool = False) -> None:
+    if max_rss_mb:
+        threading.Thread(target=_rss_watchdog, args=(max_rss_mb,), daemon=True).start()
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            return
+        if args is None:
+            return
+        try:
+            conn.send(("ok",) + profiled_call(profile, func, *args))
+        except Exception as e:
+            try:
+                conn.send(("error", e, None))
+            except Exception:
+                # Exceptions that cannot be pickled come back as RuntimeError
+                conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}"), None))
+
+
+class IsolatedWorker:
+    """Call func(*args) under a wall-clock timeout and an RSS ceiling."""
+
+    def __init__(self, func: Callable, timeout: Optional[float] = None, max_rss_mb: Optional[float] = None):
+        self.func = func
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self._proc = None
+        self._conn = None
+
+    @property
+    def isolated(self) -> bool:
+        """True when calls go to a worker process (some limit is set)."""
+        return bool(self.timeout or self.max_rss_mb)
+
+    def _start(self) -> None:
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._proc = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, self.func, self.max_rss_mb, worker_profiling()), daemon=True
+        )
+        self._proc.start()
+        child_conn.close()
+
+    def _stop(self) -> Optional[int]:
+        """Kill the worker (if still running) and return its exit code."""
+        proc, self._proc = self._proc, None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if proc is None:
+            return None
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        return proc.exitcode
+
+    def __call__(self, *args: Any) -> Any:
+        """
+        Return func(*args). Raises WorkerLimitExceeded when a limit is hit
+        or the worker dies; an exception raised by func is re-raised here.
+        """
+        if not self.isolated:
+            return self.func(*args)
+        if self._proc is None or not self._proc.is_alive():
+            self._stop()
+            self._start()
+        self._conn.send(args)
+        if not self._conn.poll(self.timeout):
+            self._stop()
+            raise WorkerLimitExceeded(f"Timed out after {self.timeout:g}s")
+        try:
+            status, value, stats = self._conn.recv()
+        except EOFError:
+            code = self._stop()
+            if code == RSS_EXIT_CODE:
+                raise WorkerLimitExceeded(f"Exceeded memory limit of {self.max_rss_mb:g} MB") from None
+            raise WorkerLimitExceeded(f"Worker process died (exit code {code})") from None
+        add_worker_stats(stats)
+        if status == "error":
+            raise value
+        return value
+
+    def close(self) -> None:
+        """Stop the worker process, if one was started."""
+        if self._proc is not None and self._proc.is_alive():
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+            self._proc.join(1)
+        self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
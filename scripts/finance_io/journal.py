@@ -0,0 +1,184 @@
+"""
+Checkpoint journal for resumable PDF batch extraction.
+
+With ``--stream`` the extractors spill rows to ``<output stem>.spool/`` (see
+finance_io.spool) and `BatchJournal` keeps ``journal.jsonl`` beside them: one
+line per finished PDF (file name, SHA-256 of its content, status, invoice
+number, line items, and the row ranges it added to each spill file), then a
+checkpoint line with the size of every spill file once its rows are on disk.
+Entries are committed every JOURNAL_BATCH_FILES files and when the batch ends.
+
+``--resume`` reopens the journal: spill files are cut back to the last
+checkpoint, PDFs whose name and content match a committed entry are skipped,
+and only the rows of files that are part of this run are read back, so a
+changed or removed PDF does not leave stale rows behind. PDFs excluded for a
+transient reason (status RETRY_STATUS: a worker timeout or memory cap) are
+not skipped but tried again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .spool import RowSpool
+
+JOURNAL_NAME = "journal.jsonl"
+
+# Files committed per checkpoint
+JOURNAL_BATCH_FILES = 50
+
+# Status of a file excluded for a per-PDF limit; resume tries it again
+RETRY_STATUS = "limit"
+
+
+def file_sha256(path) -> str:
+    """SHA-256 of a file's content, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BatchJournal:
+    """Journal of the PDFs committed to the spill files in folder."""
+
+    def __init__(self, folder: Path, resume: bool = False, batch_files: int = JOURNAL_BATCH_FILES):
+        self.folder = Path(folder)
+        self.path = self.folder / JOURNAL_NAME
+        self.batch_files = batch_files
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.sinks: Dict[str, RowSpool] = {}
+        self._checkpoint: Dict[str, Dict[str, int]] = {}
+        self._marks: Dict[str, int] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._seen: set = set()
+        self._sha: Dict[str, str] = {}
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._load()
+        else:
+            self.path.write_text("", encoding="utf-8")
+
+    def _load(self) -> None:
+        """Read the committed entries: those followed by a checkpoint line."""
+        group: List[Dict[str, Any]] = []
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn last line
+                if record.get("event") == "checkpoint":
+                    for entry in group:
+                        self.entries[entry["file"]] = entry
+                    group = []
+                    self._checkpoint = record["spool"]
+                else:
+                    group.append(record)
+        # Rewrite without uncommitted entries so new ones follow the last checkpoint
+        self._write_lines(self._committed_lines(), mode="w")
+
+    def _committed_lines(self) -> List[Dict[str, Any]]:
+        if not self._checkpoint:
+            return []
+        return [*self.entries.values(), {"event": "checkpoint", "spool": self._checkpoint}]
+
+    def _write_lines(self, records: Sequence[Dict[str, Any]], mode: str = "a") -> None:
+        with open(self.path, mode, encoding="utf-8") as fh:
+            for record in records:
+                fh.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def spool(self, name: str, columns: Sequence[str]) -> RowSpool:
+        """
+        Open the spill file name in the journal's folder. When resuming, it is
+        cut back to its size at the last checkpoint and continued.
+        """
+        path = self.folder / name
+        state = self._checkpoint.get(name)
+        if state and path.exists():
+            with open(path, "r+b") as fh:
+                fh.truncate(state["bytes"])
+        sink = RowSpool(path, columns, append=bool(state))
+        self.sinks[name] = sink
+        self._marks[name] = sink.rows
+        return sink
+
+    def done(self, pdf_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        The committed entry for pdf_path if its content is unchanged, else
+        None. An entry with RETRY_STATUS is None too, so the file is retried.
+        """
+        pdf_path = Path(pdf_path)
+        entry = self.entries.get(pdf_path.name)
+        if entry is None or entry.get("status") == RETRY_STATUS:
+            return None
+        sha = self._sha[pdf_path.name] = file_sha256(pdf_path)
+        if entry.get("sha256") != sha:
+            return None
+        self._seen.add(pdf_path.name)
+        return entry
+
+    def commit(self, pdf_path: Path, status: str, **fields: Any) -> None:
+        """
+        Record pdf_path as finished, with the rows each spill file gained
+        since the previous commit. Checkpoints every batch_files files.
+        """
+        pdf_path = Path(pdf_path)
+        name = pdf_path.name
+        sha = self._sha.pop(name, None) or file_sha256(pdf_path)
+        rows = {}
+        for sink_name, sink in self.sinks.items():
+            rows[sink_name] = [self._marks[sink_name], sink.rows]
+            self._marks[sink_name] = sink.rows
+        entry = {"file": name, "sha256": sha, "status": status, **fields, "rows": rows}
+        self.entries[name] = entry
+        self._seen.add(name)
+        self._pending.append(entry)
+        if len(self._pending) >= self.batch_files:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Flush the spill files, then commit the pending entries."""
+        if not self._pending:
+            return
+        state = {}
+        for sink_name, sink in self.sinks.items():
+            sink.flush()
+            state[sink_name] = {"rows": sink.rows, "bytes": sink.path.stat().st_size}
+        self._write_lines([*self._pending, {"event": "checkpoint", "spool": state}])
+        self._checkpoint = state
+        self._pending = []
+
+    def read(self, sink: RowSpool):
+        """
+        The sink's rows as a DataFrame, keeping only rows of files committed
+        or skipped in this run (in spill file order).
+        """
+        df = sink.read()
+        name = sink.path.name
+        keep = sorted(
+            row
+            for file_name, entry in self.entries.items()
+            if file_name in self._seen
+            for row in range(*entry["rows"].get(name, (0, 0)))
+        )
+        if len(keep) == len(df):
+            return df
+        return df.iloc[keep].reset_index(drop=True)
+
+    def close(self) -> None:
+        self.checkpoint()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,47 @@
+"""
+Deferred imports for heavy libraries (pandas, numpy, pdfplumber).
+
+The scripts are spawned fresh for every request from the Next.js routes and
+also serve ``--help`` and interactive prompts. Binding ``pd = lazy_import("pandas")``
+at module top keeps the usual ``pd.`` call sites, but the library is only
+loaded on first attribute access, i.e. when processing actually starts.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+import types
+
+
+class _MissingModule(types.ModuleType):
+    """Stand-in for an uninstalled module; raises on first use, not at import."""
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        raise ModuleNotFoundError(f"No module named '{self.__name__}'", name=self.__name__)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Return module `name`, loading it on first attribute access.
+
+    Already-imported modules are returned as is. A missing module yields a
+    stand-in that raises ModuleNotFoundError when used, so scripts can still
+    print help or reject bad arguments without it.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return _MissingModule(name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,413 @@
+"""
+Loaders for GSTR-2B B2B workbooks and Zoho Books bill exports.
+
+The GST, Book Keeping and combined reconciliation scripts all read the same
+inputs; they share the directory walk, header flattening, sheet probing and
+dtype plans defined here.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from .column_mapping import resolve_column_mapping
+from .ingest import read_csv_typed
+from .lazy import lazy_import
+from .preview import preview_rows
+
+pd = lazy_import("pandas")
+
+
+# =============================================================================
+# GSTR-2B B2B LAYOUT
+# =============================================================================
+
+GST_B2B_REQUIRED_COLUMNS = [
+    "GSTIN_of_supplier_Unnamed:_0_level_1",
+    "Trade/Legal name_Unnamed:_1_level_1",
+    "Invoice_Details_Invoice_number",
+    "Invoice_Details_Invoice_Date",
+    "Invoice_Details_Invoice_Value",
+    "Place_of_supply_Unnamed:_6_level_1",
+    "Supply Attract Reverse Charge_Unnamed:_7_level_1",
+    "Taxable_Value_Unnamed:_8_level_1",
+    "Tax_Amount_Integrated_Tax",
+    "Tax_Amount_Central_Tax",
+    "Tax_Amount_State/UT_Tax",
+    "Tax_Amount_Cess",
+    "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1",
+]
+
+GST_B2B_RENAME_COLUMNS = {
+    "GSTIN_of_supplier_Unnamed:_0_level_1": "GSTIN_of_supplier",
+    "Trade/Legal name_Unnamed:_1_level_1": "trade_legal_name",
+    "Invoice_Details_Invoice_number": "invoice_number",
+    "Invoice_Details_Invoice_Date": "invoice_date",
+    "Invoice_Details_Invoice_Value": "invoice_value",
+    "Place_of_supply_Unnamed:_6_level_1": "place_of_supply",
+    "Supply Attract Reverse Charge_Unnamed:_7_level_1": "supply_attract_reverse_charge",
+    "Taxable_Value_Unnamed:_8_level_1": "taxable_value",
+    "Tax_Amount_Integrated_Tax": "integrated_tax",
+    "Tax_Amount_Central_Tax": "central_tax",
+    "Tax_Amount_State/UT_Tax": "state_tax",
+    "Tax_Amount_Cess": "cess",
+    "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1": "filing_date",
+}
+
+# Portal export: 4 preamble rows, then a two-level header
+GST_B2B_SKIPROWS = 4
+GST_B2B_HEADER = [0, 1]
+
+
+# =============================================================================
+# ZOHO BOOKS BILL LAYOUT
+# =============================================================================
+
+BOOKS_USE_COLUMNS = [
+    "Bill Date",
+    "Vendor Name",
+    "Bill Number",
+    "Account",
+    "Branch Name",
+    "SubTotal",
+    "Total",
+    "Item Total",
+    "IGST",
+    "SGST",
+    "CGST",
+    "CESS",
+    "Adjustment",
+    "Tax Percentage",
+    "GST Identification Number (GSTIN)",
+    "Branch ID",
+    "Source of Supply",
+]
+
+BOOKS_RENAME_COLUMNS = {
+    "Bill Date": "bill_date",
+    "Vendor Name": "vendor_name",
+    "Bill Number": "bill_number",
+    "Account": "account_type",
+    "Branch Name": "branch_name",
+    "SubTotal": "amount_without_tax",
+    "Total": "taxable_value",
+    "Item Total": "item_total",
+    "IGST": "integrated_tax",
+    "SGST": "state_tax",
+    "CGST": "central_tax",
+    "CESS": "cess",
+    "Adjustment": "adjustment",
+    "Tax Percentage": "tax_percentage",
+    "GST Identification Number (GSTIN)": "GSTIN_of_supplier",
+    "Branch ID": "branch_id",
+    "Source of Supply": "place_of_supply",
+}
+
+# Filled with 0 on load and always written with 2 decimal places
+BOOKS_DECIMAL_COLUMNS = [
+    "integrated_tax",
+    "state_tax",
+    "central_tax",
+    "adjustment",
+    "taxable_value",
+    "cess",
+    "item_total",
+    "tax_percentage",
+    "amount_without_tax",
+]
+
+
+# =============================================================================
+# DTYPE PLANS
+# =============================================================================
+# Identifier columns are read as text so numbers like "00123" keep their zeros.
+
+BOOKS_DTYPES: Dict[str, type] = {"Bill Number": str}
+CLEANED_BOOKS_DTYPES: Dict[str, type] = {"bill_number": str, "GSTIN_of_supplier": str}
+CLEANED_GST_DTYPES: Dict[str, type] = {"invoice_number": str, "GSTIN_of_supplier": str}
+
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+
+
+# Leading ISO date (2024-04-03, optionally with a time), as written by to_csv
+_ISO_DATE = r"^\s*\d{4}-\d{2}-\d{2}"
+
+
+def coerce_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse a date column once: datetime columns are returned as is, ISO
+    strings (cleaned outputs) are read as year-month-day, and anything else
+    (portal and Zoho exports such as 03/04/2024) day-first. Unparseable
+    values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    iso = values.astype(str).str.match(_ISO_DATE)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    if iso.any():
+        parsed[iso] = pd.to_datetime(values[iso].astype(str).str.strip(), errors="coerce", format="ISO8601")
+    if (~iso).any():
+        parsed[~iso] = pd.to_datetime(values[~iso], errors="coerce", dayfirst=True)
+    return parsed
+
+
+# =============================================================================
+# FILE DISCOVERY
+# =============================================================================
+
+def collect_files(
+    input_path: Path,
+    extensions: Iterable[str],
+    recursive: bool = False,
+) -> List[Path]:
+    """
+    Collect files with the given extensions from a file or directory.
+
+    The directory is walked once (every level when recursive), matching
+    extensions case-insensitively. Office lock files (``~$name.xlsx``) are
+    skipped.
+    """
+    input_path = Path(input_path)
+    if input_path.is_file():
+        return [input_path]
+    if not input_path.is_dir():
+        return []
+
+    wanted = {e.lower() for e in extensions}
+
+    def _keep(name: str) -> bool:
+        return not name.startswith("~$") and os.path.splitext(name)[1].lower() in wanted
+
+    found: List[Path] = []
+    if recursive:
+        for root, _dirs, names in os.walk(input_path):
+            found.extend(Path(root) / n for n in names if _keep(n))
+    else:
+        with os.scandir(input_path) as entries:
+            found.extend(Path(e.path) for e in entries if e.is_file() and _keep(e.name))
+    return sorted(found)
+
+
+# =============================================================================
+# WORKBOOK PROBING
+# =============================================================================
+
+_sheet_names_cache: Dict[Tuple[str, int, int], List[str]] = {}
+
+
+def _file_key(path: Path) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return (str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+
+
+def excel_sheet_names(path: Path) -> List[str]:
+    """
+    Worksheet names of an Excel file.
+
+    Probed at most once per file version; `load_gst_b2b` fills the same cache
+    from the handle it already has open.
+    """
+    key = _file_key(path)
+    names = _sheet_names_cache.get(key)
+    if names is None:
+        with pd.ExcelFile(path) as xl:
+            names = _sheet_names_cache[key] = list(xl.sheet_names)
+    return list(names)
+
+
+def read_table(path: Path, **kwargs) -> pd.DataFrame:
+    """Read a CSV or Excel file, chosen by extension (first rows only in preview mode)."""
+    if Path(path).suffix.lower() in EXCEL_EXTENSIONS:
+        if preview_rows() and "nrows" not in kwargs:
+            kwargs["nrows"] = preview_rows()
+        return pd.read_excel(path, **kwargs)
+    return read_csv_typed(path, **kwargs)
+
+
+# =============================================================================
+# GST (GSTR-2B B2B)
+# =============================================================================
+
+def flatten_columns(columns: Iterable[Tuple]) -> List[str]:
+    """
+    Flatten MultiIndex columns by joining non-empty parts with "_"
+    and applying the same cleaning as the notebook.
+    """
+    flattened = [
+        "_".join([str(c).strip() for c in col if pd.notna(c) and c != ""])
+        for col in columns
+    ]
+    cleaned = (
+        pd.Index(flattened)
+        .str.replace(" ", "_")
+        .str.replace("(₹)", "", regex=False)
+        .str.replace("__", "_")
+        .str.strip("_")
+        .tolist()
+    )
+    return cleaned
+
+
+def _parse_gst_sheet(
+    xl: pd.ExcelFile,
+    sheet_name: str,
+    required_columns: Sequence[str],
+    rename_columns: Mapping[str, str],
+    flexible_headers: bool,
+) -> pd.DataFrame:
+    # Match the header first, then parse only the matched columns
+    header = flatten_columns(
+        xl.parse(sheet_name, skiprows=GST_B2B_SKIPROWS, header=GST_B2B_HEADER, nrows=0).columns
+    )
+
+    if flexible_headers:
+        try:
+            column_mapping = resolve_column_mapping(header, required_columns)
+        except ValueError as e:
+            raise ValueError(f"Column matching failed: {e}")
+    else:
+        missing = [c for c in required_columns if c not in header]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+        column_mapping = {c: c for c in required_columns}
+
+    # pandas refuses usecols with a two-level header, so parse the data rows
+    # headerless and label the selected positions from the header read above
+    usecols = sorted({header.index(column_mapping[req]) for req in required_columns})
+    df_raw = xl.parse(
+        sheet_name,
+        skiprows=GST_B2B_SKIPROWS + len(GST_B2B_HEADER),
+        header=None,
+        usecols=usecols,
+        nrows=preview_rows(),
+    )
+    df_raw.columns = [header[i] for i in usecols]
+
+    df = df_raw[[column_mapping[req] for req in required_columns]].copy()
+    return df.rename(
+        columns={column_mapping[expected]: clean for expected, clean in rename_columns.items()}
+    )
+
+
+def load_gst_b2b(
+    path: Path,
+    sheet_name: str = "B2B",
+    required_columns: Sequence[str] = GST_B2B_REQUIRED_COLUMNS,
+    rename_columns: Mapping[str, str] = GST_B2B_RENAME_COLUMNS,
+    flexible_headers: bool = True,
+    fallback_sheets: bool = False,
+    parse_dates: bool = True,
+) -> pd.DataFrame:
+    """
+    Load a raw GSTR-2B Excel file, flatten columns, select required columns, and rename.
+
+    The workbook is opened once. With fallback_sheets, a missing sheet_name
+    falls back to the first other sheet with a valid B2B structure. With
+    parse_dates, invoice_date is parsed and year_month derived from it.
+    """
+    path = Path(path)
+    with pd.ExcelFile(path) as xl:
+        sheet_names = _sheet_names_cache.setdefault(_file_key(path), list(xl.sheet_names))
+        if sheet_name in sheet_names:
+            df = _parse_gst_sheet(xl, sheet_name, required_columns, rename_columns, flexible_headers)
+        elif not fallback_sheets:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        elif not sheet_names:
+            raise ValueError(f"No worksheets found in {path.name}")
+        else:
+            df = None
+            for name in sheet_names:
+                try:
+                    print(f"    Trying sheet: '{name}' ({sheet_name} not found)")
+                    df = _parse_gst_sheet(xl, name, required_columns, rename_columns, flexible_headers)
+                    print(f"    ✓ Using sheet: '{name}'")
+                    break
+                except Exception:
+                    continue
+            if df is None:
+                raise ValueError(
+                    f"No worksheet with valid GST B2B structure found. "
+                    f"Available sheets: {sheet_names}. Expected a sheet (e.g. 'B2B') with GST invoice columns."
+                )
+
+    if parse_dates:
+        df["invoice_date"] = coerce_dates(df["invoice_date"])
+        df["year_month"] = df["invoice_date"].dt.strftime("%Y-%m")
+    df["source_file"] = path.name
+    return df
+
+
+def load_cleaned_gst(path: Path) -> pd.DataFrame:
+    """
+    Load an already-cleaned GST file (output of the GST cleaning scripts).
+    Accepts CSV or Excel with flat headers and standard column names.
+    """
+    path = Path(path)
+    df = read_table(path, dtype=CLEANED_GST_DTYPES)
+
+    if "invoice_date" in df.columns:
+        df["invoice_date"] = coerce_dates(df["invoice_date"])
+        if "year_month" not in df.columns:
+            df["year_month"] = df["invoice_date"].dt.strftime("%Y-%m")
+
+    df["source_file"] = path.name
+    return df
+
+
+# =============================================================================
+# BOOK KEEPING (ZOHO BILLS)
+# =============================================================================
+
+def load_books(path: Path) -> pd.DataFrame:
+    """
+    Load a Book Keeping CSV/Excel file, select required columns, rename, and clean data.
+    """
+    path = Path(path)
+    try:
+        df = read_table(path, usecols=BOOKS_USE_COLUMNS, dtype=BOOKS_DTYPES)
+    except (KeyError, ValueError) as e:
+        # usecols failed: read only the header to report what is missing
+        header = read_table(path, nrows=0).columns
+        missing = [c for c in BOOKS_USE_COLUMNS if c not in header]
+        if not missing:
+            raise
+        raise ValueError(f"Missing required columns: {missing}") from e
+
+    df = df.rename(columns=BOOKS_RENAME_COLUMNS)
+
+    # Derive year_month from bill_date
+    df["bill_date"] = coerce_dates(df["bill_date"])
+    df["year_month"] = df["bill_date"].dt.strftime("%Y-%m")
+
+    # Convert branch_id to text (string)
+    df["branch_id"] = df["branch_id"].astype(str)
+
+    # Fill NA with 0 and ensure 2 decimal places for tax/adjustment columns
+    for col in BOOKS_DECIMAL_COLUMNS:
+        df[col] = df[col].fillna(0).round(2).astype(float)
+
+    df["GSTIN_of_supplier"] = df["GSTIN_of_supplier"].fillna("Not available")
+
+    df["source_file"] = path.name
+    return df
+
+
+def load_cleaned_books(path: Path) -> pd.DataFrame:
+    """
+    Load an already-cleaned bookkeeping file (output of book_keeping_file_processing).
+    Accepts CSV or Excel with flat headers and standard column names.
+    """
+    path = Path(path)
+    df = read_table(path, dtype=CLEANED_BOOKS_DTYPES)
+
+    if "bill_number" in df.columns:
+        df["bill_number"] = df["bill_number"].astype(str)
+    if "bill_date" in df.columns:
+        df["bill_date"] = coerce_dates(df["bill_date"])
+        if "year_month" not in df.columns:
+            df["year_month"] = df["bill_date"].dt.strftime("%Y-%m")
+
+    df["source_file"] = path.name
+    return df
@@ -0,0 +1,86 @@
+"""
+Marketplace classification of Retail/Export customers from a rule table.
+
+Rules live in ``marketplace_rules.csv`` (pattern, marketplace), so new
+quick-commerce or B2B customers are added there rather than in code. Each
+distinct customer name is classified once; rows get the result through a
+categorical code lookup.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+MARKETPLACE_RULES_FILE = Path(__file__).with_name("marketplace_rules.csv")
+DEFAULT_MARKETPLACE = "Retail Sale"
+
+_rules_cache: Dict[Tuple[str, int], List[Tuple[str, str]]] = {}
+
+
+def _rules_path(path: Optional[Path] = None) -> Path:
+    if path is not None:
+        return Path(path)
+    env = os.environ.get("HRMS_MARKETPLACE_RULES")
+    return Path(env).expanduser() if env else MARKETPLACE_RULES_FILE
+
+
+def load_marketplace_rules(path: Optional[Path] = None) -> List[Tuple[str, str]]:
+    """
+    Read (PATTERN, marketplace) rules in priority order.
+
+    Patterns are upper-cased; blank lines and lines starting with "#" are
+    ignored. Parsed once per file version.
+    """
+    path = _rules_path(path)
+    key = (str(path.resolve()), os.stat(path).st_mtime_ns)
+    rules = _rules_cache.get(key)
+    if rules is None:
+        with open(path, newline="", encoding="utf-8") as fh:
+            lines = (ln for ln in fh if ln.strip() and not ln.lstrip().startswith("#"))
+            rules = [
+                (row["pattern"].strip().upper(), row["marketplace"].strip())
+                for row in csv.DictReader(lines)
+                if (row.get("pattern") or "").strip()
+            ]
+        _rules_cache[key] = rules
+    return rules
+
+
+def classify_marketplace(customers, rules: Optional[List[Tuple[str, str]]] = None):
+    """
+    Marketplace for each customer name, as a categorical Series on the same index.
+
+    The first rule whose pattern is a substring of the upper-cased name wins;
+    otherwise DEFAULT_MARKETPLACE.
+    """
+    if rules is None:
+        rules = load_marketplace_rules()
+
+    codes, uniques = pd.factorize(customers, use_na_sentinel=False)
+    names = pd.Index(uniques).astype(str).str.upper()
+
+    categories = list(dict.fromkeys([m for _, m in rules] + [DEFAULT_MARKETPLACE]))
+    category_code = {m: i for i, m in enumerate(categories)}
+
+    labels = np.full(len(names), category_code[DEFAULT_MARKETPLACE], dtype=np.int32)
+    unassigned = np.ones(len(names), dtype=bool)
+    for pattern, marketplace in rules:
+        if not unassigned.any():
+            break
+        hit = unassigned & np.asarray(names.str.contains(pattern, regex=False))
+        labels[hit] = category_code[marketplace]
+        unassigned &= ~hit
+
+    return pd.Series(
+        pd.Categorical.from_codes(labels[codes], categories=categories),
+        index=customers.index,
+        name="marketplace",
+    )
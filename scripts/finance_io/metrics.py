@@ -0,0 +1,212 @@
+"""
+Per-stage timing and memory metrics for the finance scripts.
+
+Scripts mark their named stages (load, clean, map, aggregate, merge, write),
+either with ``with stage("load", "Amazon MTR") as s:`` around a short block or
+with ``begin_stage(...)`` / ``end_stage(rows_out=...)`` around a long one.
+Each stage records wall time, CPU time, rows in/out and how much it raised the
+process' peak RSS. Recording is always on and costs a couple of clock reads.
+Stage boundaries are also sent as progress events (see finance_io.progress).
+
+``--metrics out.json`` (or HRMS_METRICS=out.json) makes `write_metrics`
+save the report as JSON and print a short timing table. Python allocation
+deltas from tracemalloc are added when HRMS_METRICS_TRACEMALLOC=1; that
+slows allocation-heavy code, so it is off by default.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .progress import emit
+
+METRICS_ENV = "HRMS_METRICS"
+METRICS_TRACEMALLOC_ENV = "HRMS_METRICS_TRACEMALLOC"
+
+_MB = 1024 * 1024
+
+_started = (datetime.now(), time.perf_counter(), time.process_time())
+_stages: List[Dict[str, Any]] = []
+_open: Optional[Dict[str, Any]] = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None if unknown)."""
+    try:
+        import resource
+    except ImportError:
+        counters = _windows_memory_counters()
+        return round(counters.PeakWorkingSetSize / _MB, 1) if counters else None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (_MB if sys.platform == "darwin" else 1024), 1)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process right now, in MB (the peak where unknown)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return round(int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / _MB, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        counters = _windows_memory_counters()
+        return round(counters.WorkingSetSize / _MB, 1) if counters else None
+    return peak_rss_mb()
+
+
+def _windows_memory_counters():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters
+    except Exception:
+        return None
+
+
+def set_metrics_path(path: Optional[str]) -> None:
+    """Write the metrics report to path at exit (None leaves HRMS_METRICS as is)."""
+    if path:
+        os.environ[METRICS_ENV] = str(path)
+    if metrics_path() and os.environ.get(METRICS_TRACEMALLOC_ENV) == "1" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def metrics_path() -> Optional[Path]:
+    """Where the metrics report goes, or None when it is not requested."""
+    path = os.environ.get(METRICS_ENV, "").strip()
+    return Path(path) if path else None
+
+
+def begin_stage(name: str, label: Optional[str] = None, rows_in: Optional[int] = None) -> Dict[str, Any]:
+    """Start a stage (closing any stage still open) and return its record."""
+    global _open
+    if _open is not None:
+        end_stage()
+    _open = {"stage": name, "label": label, "rows_in": rows_in, "rows_out": None}
+    emit("stage_start", stage=name, label=label, rows_in=rows_in)
+    _open["_t"] = (time.perf_counter(), time.process_time(), peak_rss_mb())
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        _open["_t"] += (tracemalloc.get_traced_memory()[0],)
+    return _open
+
+
+def end_stage(rows_out: Optional[int] = None, status: str = "ok") -> Optional[Dict[str, Any]]:
+    """Close the open stage, recording its rows out; returns the record."""
+    global _open
+    record, _open = _open, None
+    if record is None:
+        return None
+    wall0, cpu0, rss0, *alloc0 = record.pop("_t")
+    if rows_out is not None:
+        record["rows_out"] = rows_out
+    rss = peak_rss_mb()
+    record.update(
+        wall_s=round(time.perf_counter() - wall0, 3),
+        cpu_s=round(time.process_time() - cpu0, 3),
+        peak_rss_mb=rss,
+        rss_growth_mb=round(rss - rss0, 1) if rss is not None and rss0 is not None else None,
+        status=status,
+    )
+    if alloc0 and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        record["py_alloc_mb"] = round((current - alloc0[0]) / _MB, 1)
+        record["py_peak_mb"] = round((peak - alloc0[0]) / _MB, 1)
+    _stages.append(record)
+    emit(
+        "stage_end",
+        stage=record["stage"],
+        label=record["label"],
+        rows_out=record["rows_out"],
+        wall_s=record["wall_s"],
+        status=status,
+    )
+    return record
+
+
+@contextmanager
+def stage(name: str, label: Optional[str] = None, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Record the enclosed block as one stage. Set ``record["rows_out"]`` on the
+    yielded record to report the rows it produced.
+    """
+    record = begin_stage(name, label, rows_in)
+    try:
+        yield record
+    except BaseException:
+        end_stage(status="error")
+        raise
+    end_stage()
+
+
+def stage_metrics() -> List[Dict[str, Any]]:
+    """Records of the stages finished so far."""
+    return list(_stages)
+
+
+def write_metrics(status: str = "ok") -> Optional[Path]:
+    """
+    Save the JSON report when metrics were requested and print the stage
+    timings. A stage still open (e.g. after an error) is closed as "incomplete".
+    Returns the report path, or None when metrics are off.
+    """
+    path = metrics_path()
+    if path is None:
+        return None
+    if _open is not None:
+        end_stage(status="incomplete")
+
+    started, wall0, cpu0 = _started
+    report = {
+        "script": Path(sys.argv[0]).name,
+        "argv": sys.argv[1:],
+        "started": started.isoformat(timespec="seconds"),
+        "status": status,
+        "wall_s": round(time.perf_counter() - wall0, 3),
+        "cpu_s": round(time.process_time() - cpu0, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": _stages,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️  Could not write metrics to {path}: {e}")
+        return None
+
+    print(f"\n⏱  Stage timings (total {report['wall_s']:.2f}s, peak RSS {report['peak_rss_mb']} MB):")
+    for s in _stages:
+        name = f"{s['stage']} [{s['label']}]" if s["label"] else s["stage"]
+        rows_in, rows_out = ("-" if n is None else n for n in (s["rows_in"], s["rows_out"]))
+        print(f"   {name:<32} {s['wall_s']:>8.2f}s  cpu {s['cpu_s']:>7.2f}s  rows {rows_in} → {rows_out}")
+    print(f"   Metrics saved to: {path}")
+    return path
@@ -0,0 +1,58 @@
+"""
+Page-at-a-time iteration over pdfplumber documents with bounded memory.
+
+pdfplumber keeps every page's parsed objects (chars, lines, rects, edges and
+the text map) cached on the Page for as long as the PDF is open, and pdfminer
+keeps every indirect object it has resolved in the document's object cache.
+Walking ``pdf.pages`` of a long credit note therefore grows memory page by
+page. `iter_pages` hands out one page at a time and releases both caches once
+the caller moves on, so a worker's peak memory depends on the largest page
+rather than on the page count. A released page must not be used again.
+
+Documents are opened with ``laparams=None`` (`open_pdf`), so pdfminer's
+layout analysis never runs; only the analyses a caller asks for (text,
+tables) do, on the page at hand.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Optional
+
+from .lazy import lazy_import
+
+pdfplumber = lazy_import("pdfplumber")
+
+
+def open_pdf(path):
+    """Open a PDF with pdfplumber, without pdfminer layout analysis."""
+    return pdfplumber.open(path, laparams=None)
+
+
+def release_page(page) -> None:
+    """Drop the parsed objects pdfplumber cached for page."""
+    close = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+    if close is not None:
+        close()
+
+
+def release_document_cache(pdf) -> None:
+    """Drop the indirect objects pdfminer has resolved so far (re-read on demand)."""
+    cache = getattr(getattr(pdf, "doc", None), "_cached_objs", None)
+    if isinstance(cache, dict):
+        cache.clear()
+
+
+def iter_pages(pdf, max_pages: Optional[int] = None, release: bool = True) -> Iterator:
+    """
+    Yield the pages of pdf in order (at most max_pages), releasing each one's
+    caches when the next is requested or the loop ends, including on break.
+    """
+    for number, page in enumerate(pdf.pages, 1):
+        if max_pages is not None and number > max_pages:
+            return
+        try:
+            yield page
+        finally:
+            if release:
+                release_page(page)
+                release_document_cache(pdf)
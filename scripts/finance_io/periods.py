@@ -0,0 +1,55 @@
+"""
+Month-end ``Period`` labels ("31-Jan-2025") shared by the channel processors.
+
+A file covers only a handful of months, so dates are bucketed into monthly
+periods in one vectorized pass and each distinct month is formatted once.
+The result is a categorical whose categories are in calendar order, which
+keeps ``Period`` cheap to group and filter on downstream.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+PERIOD_COLUMN = "Period"
+
+
+def format_period(period) -> str:
+    """Label for one monthly pd.Period, e.g. "29-Feb-2024"."""
+    return f"{period.days_in_month:02d}-{period.strftime('%b-%Y')}"
+
+
+def month_end_period(dates):
+    """
+    Month-end Period label for each date, as a categorical Series.
+
+    Missing or unparseable dates get "" (same as the per-row version).
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce")
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+
+    codes, months = pd.factorize(dates.dt.to_period("M"), sort=True)
+    labels = [format_period(m) for m in months]
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels.append("")
+
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=labels),
+        index=dates.index,
+        name=PERIOD_COLUMN,
+    )
+
+
+def filter_periods(df, periods: Optional[Iterable[str]]):
+    """Rows of df whose Period is one of periods (all rows when periods is empty)."""
+    if not periods or PERIOD_COLUMN not in df.columns:
+        return df
+    return df[df[PERIOD_COLUMN].isin(list(periods))]
@@ -0,0 +1,248 @@
+"""
+Header-only pre-flight validation of CSV/Excel inputs.
+
+Each script declares the columns it cannot do without; before any heavy
+loading, only the header of every input is read (the first line of a CSV,
+the first rows of an Excel sheet through openpyxl's read-only mode) and
+checked against them. Bad uploads are rejected up front with a report
+naming the file, the missing columns and the closest header found. A
+header the caller has already read (e.g. by `read_sniffed_excel`) is
+checked as given, without opening the file again.
+"""
+
+from __future__ import annotations
+
+import csv
+import difflib
+import textwrap
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .column_mapping import find_column_mapping
+from .lazy import lazy_import
+from .loaders import (
+    BOOKS_USE_COLUMNS,
+    EXCEL_EXTENSIONS,
+    GST_B2B_HEADER,
+    GST_B2B_REQUIRED_COLUMNS,
+    GST_B2B_SKIPROWS,
+    excel_sheet_names,
+    flatten_columns,
+)
+
+pd = lazy_import("pandas")
+
+# A required column: one name, or a tuple of alternative names
+Column = Union[str, Tuple[str, ...]]
+
+# Columns the reconciliation needs from already-cleaned GST / Books files
+# (year_month is derived from the date column when absent)
+CLEANED_GST_REQUIRED_COLUMNS: List[Column] = [
+    "GSTIN_of_supplier",
+    ("year_month", "invoice_date"),
+    "invoice_value",
+    "taxable_value",
+    "integrated_tax",
+    "central_tax",
+    "state_tax",
+    "cess",
+]
+CLEANED_BOOKS_REQUIRED_COLUMNS: List[Column] = [
+    "GSTIN_of_supplier",
+    ("year_month", "bill_date"),
+    "item_total",
+    "integrated_tax",
+    "central_tax",
+    "state_tax",
+    "cess",
+]
+
+
+class HeaderCheck(NamedTuple):
+    """One input to validate. sheet_name may be a tuple of candidate sheets."""
+
+    label: str
+    path: str
+    required: Sequence[Column] = ()
+    sheet_name: Union[int, str, Tuple[str, ...]] = 0
+    header: Union[int, List[int]] = 0
+    skiprows: int = 0
+    any_sheet: bool = False
+    resolve: Optional[Callable[[List[str], Sequence[Column]], List[str]]] = None
+    columns: Optional[Sequence[str]] = None  # header already read by the caller; the file is not opened
+
+
+def read_header(path, sheet_name=0, header=0, skiprows=0) -> List[str]:
+    """
+    Column names of a CSV or Excel file, reading only its header row(s).
+    Two-level Excel headers are flattened the same way as the loaders do.
+    """
+    path = Path(path)
+    if path.suffix.lower() in EXCEL_EXTENSIONS:
+        cols = pd.read_excel(path, sheet_name=sheet_name, header=header, skiprows=skiprows, nrows=0).columns
+        if getattr(cols, "nlevels", 1) > 1:
+            return flatten_columns(cols)
+        return [str(c) for c in cols]
+
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as fh:
+        reader = csv.reader(fh)
+        for _ in range(skiprows + (header if isinstance(header, int) else 0)):
+            next(reader, None)
+        row = next(reader, None)
+    if row is None:
+        raise ValueError("file is empty")
+    return row
+
+
+def missing_columns(columns: Sequence[str], required: Sequence[Column]) -> List[str]:
+    """Required columns (alternatives joined with " | ") not present in columns."""
+    present = set(columns)
+    missing = []
+    for col in required:
+        options = (col,) if isinstance(col, str) else tuple(col)
+        if not any(o in present for o in options):
+            missing.append(" | ".join(options))
+    return missing
+
+
+def _candidate_sheets(check: HeaderCheck, sheet_names: List[str]) -> List[Union[int, str]]:
+    if isinstance(check.sheet_name, int):
+        return [check.sheet_name]
+    wanted = (check.sheet_name,) if isinstance(check.sheet_name, str) else tuple(check.sheet_name)
+    sheets = [s for s in wanted if s in sheet_names]
+    if check.any_sheet:
+        sheets += [s for s in sheet_names if s not in sheets]
+    return sheets
+
+
+def _check_columns(check: HeaderCheck, sheet) -> Tuple[List[str], List[str]]:
+    if check.columns is not None:
+        columns = [str(c) for c in check.columns]
+    else:
+        columns = read_header(check.path, sheet_name=sheet, header=check.header, skiprows=check.skiprows)
+    resolve = check.resolve or missing_columns
+    return columns, resolve(columns, check.required)
+
+
+def check_header(check: HeaderCheck) -> Optional[str]:
+    """Problem description for one input, or None when its header is fine."""
+    name = Path(check.path).name
+    where = name
+    try:
+        if check.columns is None and Path(check.path).suffix.lower() in EXCEL_EXTENSIONS:
+            sheet_names = excel_sheet_names(check.path)
+            sheets = _candidate_sheets(check, sheet_names)
+            if not sheets:
+                return (
+                    f"{check.label} ({name}): worksheet {check.sheet_name!r} not found; "
+                    f"available sheets: {sheet_names}"
+                )
+            columns, missing = _check_columns(check, sheets[0])
+            for sheet in sheets[1:]:
+                if not missing:
+                    break
+                try:
+                    other = _check_columns(check, sheet)
+                except Exception:
+                    continue
+                if not other[1]:
+                    columns, missing = other
+            if isinstance(sheets[0], str):
+                where = f"{name}, sheet '{sheets[0]}'"
+        else:
+            columns, missing = _check_columns(check, None)
+    except Exception as e:
+        return f"{check.label} ({name}): cannot read header: {e}"
+
+    if not missing:
+        return None
+    lines = [f"{check.label} ({where}): missing {len(missing)} required column(s):"]
+    for col in missing:
+        close = difflib.get_close_matches(col.split(" | ")[0], columns, n=1, cutoff=0.6)
+        hint = f" (closest: '{close[0]}')" if close else ""
+        lines.append(f"    - '{col}'{hint}")
+    return "\n".join(lines)
+
+
+def gst_b2b_missing_columns(columns: Sequence[str], required: Sequence[Column]) -> List[str]:
+    """Required GSTR-2B columns that flexible header matching cannot place."""
+    missing = []
+    for expected in required:
+        try:
+            find_column_mapping(list(columns), [expected], verbose=False)
+        except ValueError:
+            missing.append(expected)
+    return missing
+
+
+def gst_b2b_check(
+    path,
+    sheet_name: str = "B2B",
+    required_columns: Sequence[str] = GST_B2B_REQUIRED_COLUMNS,
+    flexible_headers: bool = True,
+    fallback_sheets: bool = False,
+) -> HeaderCheck:
+    """HeaderCheck matching what `load_gst_b2b` will accept with the same options."""
+    return HeaderCheck(
+        label="GST",
+        path=str(path),
+        required=required_columns,
+        sheet_name=sheet_name,
+        header=GST_B2B_HEADER,
+        skiprows=GST_B2B_SKIPROWS,
+        any_sheet=fallback_sheets,
+        resolve=gst_b2b_missing_columns if flexible_headers else None,
+    )
+
+
+def books_check(path) -> HeaderCheck:
+    """HeaderCheck matching what `load_books` will accept."""
+    return HeaderCheck(label="Books", path=str(path), required=BOOKS_USE_COLUMNS)
+
+
+def cleaned_gst_check(path) -> HeaderCheck:
+    """HeaderCheck for an already-cleaned GST CSV/Excel file."""
+    return HeaderCheck(label="GST", path=str(path), required=CLEANED_GST_REQUIRED_COLUMNS)
+
+
+def cleaned_books_check(path) -> HeaderCheck:
+    """HeaderCheck for an already-cleaned Books CSV/Excel file."""
+    return HeaderCheck(label="Books", path=str(path), required=CLEANED_BOOKS_REQUIRED_COLUMNS)
+
+
+def run_preflight(checks: Sequence[HeaderCheck]) -> Dict[str, str]:
+    """
+    Check the header of every input and print a short report.
+    Returns {path: problem} for the rejected inputs (empty when all are fine).
+    """
+    problems: Dict[str, str] = {}
+    for check in checks:
+        problem = check_header(check)
+        if problem:
+            # Several sheets of one workbook can fail; keep every report
+            problems[check.path] = "\n".join(filter(None, [problems.get(check.path), problem]))
+    paths = {check.path for check in checks}
+    if problems:
+        print(f"  ❌ Pre-flight: {len(problems)} of {len(paths)} file(s) rejected")
+        for problem in problems.values():
+            print(textwrap.indent(problem, "    "))
+    else:
+        print(f"  ✓ Pre-flight: {len(paths)} file(s) OK")
+    return problems
+
+
+def preflight_report(problems: Iterable[str]) -> str:
+    """Single message for a failed pre-flight, for (ok, msg) style returns."""
+    return "Pre-flight check failed:\n" + "\n".join(problems)
+
+
+def preflight_files(files: Sequence[Path], make_check: Callable[[Path], HeaderCheck]) -> List[Path]:
+    """
+    Pre-flight a batch of input files and keep only the ones that pass.
+    Raises RuntimeError with the full report when none of them does.
+    """
+    problems = run_preflight([make_check(f) for f in files])
+    accepted = [f for f in files if str(f) not in problems]
+    if not accepted:
+        raise RuntimeError(preflight_report(problems.values()))
+    return accepted
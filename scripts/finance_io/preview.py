@@ -0,0 +1,138 @@
+"""
+Preview (dry-run) mode: process only the first N data rows of every input.
+
+``--preview N`` on a script calls `set_preview_rows`; the loaders then pass
+``nrows=preview_rows()`` to pandas, so the full transformation runs on a
+small slice and mapping problems surface in a second or two. The setting
+lives in HRMS_PREVIEW_ROWS so worker processes inherit it. Outputs go
+through `preview_path`, so a dry run writes "<name>_preview.<ext>" and never
+replaces a real output. After the run, `preview_report` compares the input
+sizes with what was read and prints the extrapolated output row count.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+PREVIEW_ENV = "HRMS_PREVIEW_ROWS"
+PREVIEW_SUFFIX = "_preview"
+
+# A sheet read from a workbook: a name or index, or a tuple of alternative
+# names (the first one present is read), as in HeaderCheck.sheet_name
+Sheet = Union[int, str, tuple]
+
+
+def set_preview_rows(rows: Optional[int]) -> None:
+    """Turn preview mode on for N rows per input (None or 0 turns it off)."""
+    if rows:
+        os.environ[PREVIEW_ENV] = str(int(rows))
+    else:
+        os.environ.pop(PREVIEW_ENV, None)
+
+
+def preview_rows() -> Optional[int]:
+    """Rows to read per input in preview mode, or None for a full run."""
+    try:
+        rows = int(os.environ.get(PREVIEW_ENV, ""))
+    except ValueError:
+        return None
+    return rows if rows > 0 else None
+
+
+def preview_path(path):
+    """
+    Where a run writes path: "<stem>_preview<suffix>" next to it in preview
+    mode, so a dry run never overwrites the real output; path otherwise.
+    None stays None (scripts that pick a default name apply this to it).
+    """
+    if path is None or preview_rows() is None:
+        return path
+    target = Path(path)
+    if not target.stem.endswith(PREVIEW_SUFFIX):
+        target = target.with_name(f"{target.stem}{PREVIEW_SUFFIX}{target.suffix}")
+    return target if isinstance(path, Path) else str(target)
+
+
+def _pick_sheet(wb, sheet: Sheet):
+    """The worksheet a script reads for sheet, or None when the workbook lacks it."""
+    if isinstance(sheet, int):
+        return wb.worksheets[sheet] if sheet < len(wb.worksheets) else None
+    names = sheet if isinstance(sheet, tuple) else (sheet,)
+    return next((wb[name] for name in names if name in wb.sheetnames), None)
+
+
+def _sheet_rows(path, sheets: Optional[Sequence[Sheet]] = None) -> Optional[List[int]]:
+    """Data rows of the given sheets (all when None) of a .xlsx file, [rows] for a CSV, or None."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    try:
+        if suffix == ".xls":
+            return None
+        if suffix == ".xlsx":
+            from openpyxl import load_workbook
+
+            wb = load_workbook(path, read_only=True)
+            try:
+                worksheets = wb.worksheets if sheets is None else [_pick_sheet(wb, sheet) for sheet in sheets]
+                return [max((ws.max_row or 1) - 1, 0) for ws in worksheets if ws is not None]
+            finally:
+                wb.close()
+
+        lines = 0
+        last = b"\n"
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+        if last != b"\n":
+            lines += 1
+        return [max(lines - 1, 0)]
+    except Exception:
+        return None
+
+
+def count_rows(path, sheet_name=None) -> Optional[int]:
+    """
+    Approximate number of data rows in a CSV or .xlsx file (header excluded).
+
+    CSV lines are counted in binary chunks; for Excel, the sheet dimensions
+    recorded in the workbook are used (all sheets when sheet_name is None).
+    Returns None when the size cannot be determined cheaply.
+    """
+    rows = _sheet_rows(path, None if sheet_name is None else [sheet_name])
+    return None if rows is None else sum(rows)
+
+
+def preview_report(inputs: Iterable, outputs: Iterable) -> None:
+    """
+    Print how much of each input the preview read and the projected output size.
+
+    An input is a path, or (path, sheet) / (path, [sheets]) for the sheets a
+    script reads from a workbook; a bare workbook path counts its first
+    sheet, the one pandas reads by default. Inputs read in full (reference
+    data not limited by preview mode) should be left out.
+    """
+    rows = preview_rows()
+    if rows is None:
+        return
+
+    total = read = 0
+    for item in inputs:
+        path, sheets = item if isinstance(item, tuple) else (item, 0)
+        if not path:
+            continue
+        if not isinstance(sheets, list):
+            sheets = [sheets]
+        # The row limit applies per sheet, so a workbook is counted sheet by sheet
+        for n in _sheet_rows(path, sheets) or []:
+            total += n
+            read += min(n, rows)
+
+    produced = sum(count_rows(p) or 0 for p in outputs if p and Path(p).exists())
+    factor = total / read if read else 1.0
+
+    print(f"\n🔎 PREVIEW: first {rows} rows of each input were processed")
+    print(f"   Input rows read : {read} of ~{total}")
+    print(f"   Output rows     : {produced} (≈{round(produced * factor)} on the full inputs)")
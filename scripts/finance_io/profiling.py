@@ -0,0 +1,195 @@
+"""
+Opt-in profiling of a whole script run.
+
+``--profile`` (or HRMS_PROFILE=1 for runs spawned by the Next.js routes)
+makes `start_profile` wrap the rest of the process in cProfile. At exit the
+raw profile is written next to the output as ``<output stem>.prof`` (open it
+with ``python -m pstats`` or snakeviz) together with ``<output
+stem>_profile.txt``, the top functions by cumulative and by own time.
+
+HRMS_PROFILE=pyinstrument uses the pyinstrument sampling profiler instead,
+when it is installed; it writes ``_profile.txt`` and ``_profile.html``.
+When profiling is off, `start_profile` only reads one environment variable.
+
+Work done in worker processes (`IsolatedWorker` under --timeout/--max-rss,
+the amazon-batch month workers) is invisible to the parent's profiler. Such
+calls go through `profiled_call`, which profiles them in the worker with
+cProfile, and the parent merges the returned stats into its ``.prof`` with
+`add_worker_stats`. A call killed for a limit leaves no stats. pyinstrument
+cannot merge profiles, so under it worker calls are not profiled and a
+warning says so.
+"""
+
+from __future__ import annotations
+
+import atexit
+import importlib.util
+import io
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROFILE_ENV = "HRMS_PROFILE"
+
+# Functions listed in each section of the text summary
+PROFILE_TOP_N = 40
+
+# Profiler started by start_profile: (mode, profiler, pid of the profiled process)
+_running: Optional[Tuple[str, Any, int]] = None
+# cProfile stats of calls profiled in worker processes, merged at exit
+_worker_stats: List[Dict] = []
+_warned_pyinstrument = False
+
+
+def profile_mode(enabled: bool = False) -> Optional[str]:
+    """Profiler to use ("cprofile" or "pyinstrument"), or None when profiling is off."""
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value == "pyinstrument":
+        if importlib.util.find_spec("pyinstrument") is not None:
+            return "pyinstrument"
+        print("⚠️  pyinstrument is not installed; profiling with cProfile instead")
+        return "cprofile"
+    if enabled or value in ("1", "true", "yes", "cprofile"):
+        return "cprofile"
+    return None
+
+
+def profile_base(output=None) -> Path:
+    """Path prefix for the profile files: the output's stem, else the script name in the CWD."""
+    if output:
+        out = Path(output).expanduser()
+        if out.is_dir():
+            return out / Path(sys.argv[0]).stem
+        return out.with_name(out.stem)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return Path.cwd() / f"{Path(sys.argv[0]).stem}_{stamp}"
+
+
+def start_profile(enabled: bool = False, output=None) -> bool:
+    """
+    Profile the rest of this run when --profile or HRMS_PROFILE asks for it.
+    The files are written when the process exits, including via sys.exit().
+    Returns True when a profiler was started.
+    """
+    mode = profile_mode(enabled)
+    if mode is None:
+        return False
+
+    global _running
+    base = profile_base(output)
+    if mode == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        atexit.register(_write_pyinstrument, profiler, base)
+    else:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        atexit.register(_write_cprofile, profiler, base)
+    _running = (mode, profiler, os.getpid())
+    print(f"🔬 Profiling this run ({mode})")
+    return True
+
+
+def worker_profiling() -> bool:
+    """
+    True when calls handed to worker processes should be profiled there
+    (this run is profiled with cProfile). Under pyinstrument, warns once
+    that worker calls are left out and returns False.
+    """
+    global _warned_pyinstrument
+    if _running is None or _running[2] != os.getpid():
+        return False
+    if _running[0] == "pyinstrument":
+        if not _warned_pyinstrument:
+            print("⚠️  pyinstrument profiles this process only; work done in worker processes is not included")
+            _warned_pyinstrument = True
+        return False
+    return True
+
+
+def profiled_call(enabled: bool, func: Callable, *args: Any) -> Tuple[Any, Optional[Dict]]:
+    """
+    (func(*args), stats), run in a worker process. With enabled the call is
+    profiled with cProfile and stats is its raw stats table, for the parent
+    to pass to `add_worker_stats`; otherwise stats is None.
+    """
+    if not enabled:
+        return func(*args), None
+    import cProfile
+
+    if _running is not None and _running[2] != os.getpid():
+        # A forked worker inherits the parent's profiler; its data would be lost
+        _running[1].disable()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        value = func(*args)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return value, profiler.stats
+
+
+def add_worker_stats(stats: Optional[Dict]) -> None:
+    """Merge stats returned by `profiled_call` into this run's cProfile output."""
+    if stats:
+        _worker_stats.append(stats)
+
+
+class _WorkerStats:
+    """A stats table in the form pstats.Stats.add accepts."""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _write_cprofile(profiler, base: Path) -> None:
+    import pstats
+
+    profiler.disable()
+    prof_path = base.with_name(base.name + ".prof")
+    text_path = base.with_name(base.name + "_profile.txt")
+    try:
+        base.parent.mkdir(parents=True, exist_ok=True)
+        buf = io.StringIO()
+        stats = pstats.Stats(profiler, stream=buf)
+        for worker_stats in _worker_stats:
+            stats.add(_WorkerStats(worker_stats))
+        stats.dump_stats(str(prof_path))
+        stats.strip_dirs()
+        buf.write(f"Top {PROFILE_TOP_N} functions by cumulative time\n")
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        buf.write(f"\nTop {PROFILE_TOP_N} functions by own time\n")
+        stats.sort_stats("tottime").print_stats(PROFILE_TOP_N)
+        text_path.write_text(buf.getvalue(), encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️  Could not write profile to {prof_path}: {e}")
+        return
+    print(f"🔬 Profile saved to: {prof_path}")
+    print(f"   Hot functions  : {text_path}")
+    if _worker_stats:
+        print(f"   Includes       : {len(_worker_stats)} call(s) profiled in worker processes")
+
+
+def _write_pyinstrument(profiler, base: Path) -> None:
+    profiler.stop()
+    text_path = base.with_name(base.name + "_profile.txt")
+    html_path = base.with_name(base.name + "_profile.html")
+    try:
+        base.parent.mkdir(parents=True, exist_ok=True)
+        text_path.write_text(profiler.output_text(unicode=True), encoding="utf-8")
+        html_path.write_text(profiler.output_html(), encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️  Could not write profile to {text_path}: {e}")
+        return
+    print(f"🔬 Profile saved to: {html_path}")
+    print(f"   Hot functions  : {text_path}")
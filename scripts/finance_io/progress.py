@@ -0,0 +1,94 @@
+"""
+Machine-readable progress events (JSON lines) for long-running scripts.
+
+``--progress-json`` (or HRMS_PROGRESS=-) prints one JSON object per line on
+stdout, flushed immediately, between the usual console messages; a path
+instead of "-" appends the events to that file as a side channel. Every
+event has "event" and "t" (seconds since the script started):
+
+- ``stage_start`` / ``stage_end``: emitted by the finance_io.metrics stage
+  markers, with stage, label, rows_in / rows_out and wall_s
+- ``progress``: emitted by `track` after each file of a batch, with label,
+  done, total, item, elapsed_s, rate (items/s) and eta_s
+
+When progress output is off, `emit` returns after one dictionary lookup.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+PROGRESS_ENV = "HRMS_PROGRESS"
+
+T = TypeVar("T")
+
+_t0 = time.perf_counter()
+
+
+def set_progress(target: Optional[str]) -> None:
+    """Send progress events to target ("-" for stdout, else a file path); None leaves HRMS_PROGRESS as is."""
+    if target:
+        os.environ[PROGRESS_ENV] = str(target)
+
+
+def progress_target() -> Optional[str]:
+    """Where progress events go: "-" for stdout, a file path, or None when off."""
+    target = os.environ.get(PROGRESS_ENV, "").strip()
+    if target.lower() in ("1", "true", "stdout"):
+        return "-"
+    return target or None
+
+
+def emit(event: str, **fields: Any) -> None:
+    """Write one progress event (no-op when progress output is off)."""
+    target = progress_target()
+    if target is None:
+        return
+    record = {"event": event, "t": round(time.perf_counter() - _t0, 3), **fields}
+    line = json.dumps(record, default=str, ensure_ascii=False)
+    if target == "-":
+        print(line, flush=True)
+        return
+    try:
+        with open(target, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+    except OSError as e:
+        print(f"⚠️  Could not write progress to {target}: {e}", file=sys.stderr)
+
+
+def track(
+    items: Iterable[T],
+    label: str,
+    item_name: Optional[Callable[[T], str]] = None,
+) -> Iterator[T]:
+    """
+    Yield items, emitting a "progress" event once the loop body for each one
+    has finished (also when it ends with ``continue``).
+    """
+    items = list(items)
+    total = len(items)
+    if progress_target() is None:
+        yield from items
+        return
+
+    name = item_name or (lambda item: getattr(item, "name", None) or str(item))
+    start = time.perf_counter()
+    emit("progress", label=label, done=0, total=total)
+    for done, item in enumerate(items, 1):
+        yield item
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else None
+        emit(
+            "progress",
+            label=label,
+            done=done,
+            total=total,
+            item=name(item),
+            elapsed_s=round(elapsed, 3),
+            rate=round(rate, 3) if rate else None,
+            eta_s=round((total - done) / rate, 1) if rate else None,
+        )
@@ -0,0 +1,293 @@
+"""
+Local SQLite store of the unified GST sales rows, queryable across months.
+
+Every channel processor (`process_amazon_files`, `process_retail_export`,
+`process_jio_file`) and `merge_files` writes the same unified columns
+(UNIFIED_COLUMNS) to one CSV per run. `SalesStore.load` appends such a run
+to a ``sales`` table, so questions that span months or channels ("all
+refunds for SKU X in FY25") become one indexed query instead of loading a
+CSV per month into pandas.
+
+Loading replaces the rows previously stored under the same run (by default
+the file name), so re-running a month and loading its output again never
+double counts, while runs whose Periods overlap (a January report carrying
+December refunds, next to the December report) all keep their rows. A
+merge of runs already stored is a run of its own: load either the merge or
+its inputs, not both. Besides the unified columns each row keeps ``run``
+and ``period_end`` (Period as an ISO date, for range filters); there are
+indexes on run, Period, marketplace, Invoice Number/CN and SKU. A small
+``loads`` table counts the rows of each run per marketplace and Period, so
+listing the store needs no scan of ``sales``.
+
+The store is opt-in: ``--store [PATH]`` or HRMS_SALES_STORE ("1" for the
+default ``gst_sales.sqlite`` in the cache directory, or a path).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .column_mapping import cache_dir
+from .ingest import CsvSchema, read_csv_typed
+from .lazy import lazy_import
+from .periods import PERIOD_COLUMN
+
+pd = lazy_import("pandas")
+
+SALES_STORE_ENV = "HRMS_SALES_STORE"
+SALES_STORE_NAME = "gst_sales.sqlite"
+
+UNIFIED_COLUMNS = [
+    "Supplier GSTID",
+    "Buyer GST",
+    "Buyer Name",
+    "Date",
+    "Time",
+    "type",
+    "Order ID",
+    "SKU",
+    "description",
+    "Category",
+    "Qty",
+    "marketplace",
+    "order state",
+    "Invoice Number/CN",
+    "HSN",
+    "B2B/B2C",
+    "Inter/Intra",
+    "GST Rate",
+    "product sales",
+    "shipping credits",
+    "promotional rebates",
+    "Invoice Total",
+    "Invoice Value",
+    "Tax",
+    "Taxable Value",
+    "IGST",
+    "CGST",
+    "SGST",
+    "TCS-IGST",
+    "TCS-CGST",
+    "TCS-SGST",
+    "TDS",
+    "Nature",
+    "Period",
+    "E Invoice Status",
+    "E Invoice IRN",
+    "Invoice Status",
+    "E way Bill number",
+]
+# Amounts stored as REAL; placeholders such as "-" become NULL
+NUMERIC_COLUMNS = [
+    "Qty",
+    "GST Rate",
+    "product sales",
+    "shipping credits",
+    "promotional rebates",
+    "Invoice Total",
+    "Invoice Value",
+    "Tax",
+    "Taxable Value",
+    "IGST",
+    "CGST",
+    "SGST",
+    "TCS-IGST",
+    "TCS-CGST",
+    "TCS-SGST",
+    "TDS",
+]
+# Summed per group by `SalesStore.query` with group_by
+MEASURE_COLUMNS = ["Qty", "Taxable Value", "Tax", "Invoice Value"]
+
+SALES_SCHEMA = CsvSchema(
+    text=["Supplier GSTID", "Buyer GST", "Order ID", "SKU", "Invoice Number/CN", "HSN", "Period"],
+    numbers=NUMERIC_COLUMNS,
+)
+
+_EXTRA_COLUMNS = ["run", "period_end"]
+_INDEXES = {
+    "sales_run": ["run"],
+    "sales_period": ["period_end"],
+    "sales_marketplace": ["marketplace", "period_end"],
+    "sales_invoice": ["Invoice Number/CN"],
+    "sales_sku": ["SKU", "period_end"],
+}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sales_store_path(path: Optional[str] = None) -> Optional[Path]:
+    """
+    Store to load into: path, else the path in HRMS_SALES_STORE, else the
+    default in the cache directory. None when neither path (use "" for the
+    bare flag) nor HRMS_SALES_STORE asks for the store.
+    """
+    env = os.environ.get(SALES_STORE_ENV, "").strip()
+    switch = env.lower() in ("", "0", "off", "false", "no", "1", "on", "true", "yes")
+    if path is None and env.lower() in ("", "0", "off", "false", "no"):
+        return None
+    value = (path or "").strip() or ("" if switch else env)
+    return Path(value).expanduser() if value else cache_dir() / SALES_STORE_NAME
+
+
+def month_end(value: str) -> str:
+    """ISO month-end date for a month given as "2025-01", "Jan-2025" or a Period label."""
+    return pd.Period(pd.Timestamp(value), freq="M").end_time.strftime("%Y-%m-%d")
+
+
+def _period_ends(periods) -> "pd.Series":
+    """ISO month-end date for each Period label; each distinct label is parsed once."""
+    labels = periods.astype(str)
+    unique = labels.drop_duplicates()
+    parsed = pd.to_datetime(unique, format="%d-%b-%Y", errors="coerce").dt.strftime("%Y-%m-%d")
+    return labels.map(dict(zip(unique, parsed)))
+
+
+class SalesStore:
+    """Unified sales rows of every loaded run, in one SQLite database."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        columns = [
+            f"{_quote(c)} {'REAL' if c in NUMERIC_COLUMNS else 'TEXT'}" for c in UNIFIED_COLUMNS + _EXTRA_COLUMNS
+        ]
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS sales ({', '.join(columns)})")
+        for name, cols in _INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON sales ({', '.join(map(_quote, cols))})")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS loads (marketplace TEXT, Period TEXT, period_end TEXT, run TEXT, "
+            "rows INTEGER, loaded_at TEXT)"
+        )
+        self.conn.commit()
+
+    def load(self, df, run: str) -> int:
+        """Store the unified rows of df as run, replacing what an earlier load of run stored; returns rows."""
+        frame = pd.DataFrame(index=df.index)
+        for col in UNIFIED_COLUMNS:
+            if col not in df.columns:
+                frame[col] = None
+            elif col in NUMERIC_COLUMNS:
+                frame[col] = pd.to_numeric(df[col], errors="coerce")
+            elif col == "Date":
+                dates = pd.to_datetime(df[col], errors="coerce")
+                frame[col] = dates.dt.strftime("%Y-%m-%d %H:%M:%S")
+            else:
+                frame[col] = df[col].astype(object)
+        frame["run"] = run
+        frame["period_end"] = _period_ends(frame[PERIOD_COLUMN]) if PERIOD_COLUMN in df.columns else None
+        frame = frame.astype(object).where(frame.notna(), None)
+
+        keys = ["marketplace", "period_end"]
+        loads = frame.groupby(keys, dropna=False, sort=False).agg(Period=(PERIOD_COLUMN, "first"), rows=("run", "size"))
+        loaded_at = datetime.now().isoformat(timespec="seconds")
+        placeholders = ", ".join("?" * len(frame.columns))
+        with self.conn:
+            self.conn.execute("DELETE FROM sales WHERE run = ?", (run,))
+            self.conn.execute("DELETE FROM loads WHERE run = ?", (run,))
+            self.conn.executemany(
+                f"INSERT INTO sales ({', '.join(map(_quote, frame.columns))}) VALUES ({placeholders})",
+                frame.itertuples(index=False, name=None),
+            )
+            self.conn.executemany(
+                "INSERT INTO loads VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (marketplace, period, period_end, run, int(rows), loaded_at)
+                    for (marketplace, period_end), period, rows in zip(loads.index, loads["Period"], loads["rows"])
+                ],
+            )
+        return len(frame)
+
+    def load_csv(self, path, run: Optional[str] = None) -> int:
+        """Store a unified CSV written by a processor or merge; run defaults to its file name."""
+        # "-" placeholders in amount columns are parsed as missing, not coerced row by row
+        df = read_csv_typed(path, SALES_SCHEMA, na_values={c: ["-"] for c in NUMERIC_COLUMNS})
+        return self.load(df, run or Path(path).name)
+
+    def periods(self):
+        """Stored marketplaces and Periods with their rows, runs and last load, in calendar order."""
+        return pd.read_sql_query(
+            "SELECT marketplace, MAX(Period) AS Period, SUM(rows) AS rows, GROUP_CONCAT(run, ', ') AS runs, "
+            "MAX(loaded_at) AS loaded_at FROM loads GROUP BY marketplace, period_end ORDER BY period_end, marketplace",
+            self.conn,
+        )
+
+    def query(
+        self,
+        sku: Optional[str] = None,
+        marketplace: Optional[str] = None,
+        invoice: Optional[str] = None,
+        type: Optional[str] = None,
+        periods: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        group_by: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ):
+        """
+        Stored rows matching every filter given, as a DataFrame. start and end
+        bound the month range (inclusive); with group_by the rows are counted
+        and MEASURE_COLUMNS summed per group instead.
+        """
+        where: List[str] = []
+        params: List[Any] = []
+        for col, value in (("SKU", sku), ("marketplace", marketplace), ("Invoice Number/CN", invoice)):
+            if value is not None:
+                where.append(f"{_quote(col)} = ?")
+                params.append(value)
+        if type is not None:
+            where.append("lower(type) = lower(?)")
+            params.append(type)
+        if periods:
+            where.append(f"period_end IN ({', '.join('?' * len(periods))})")
+            params.extend(month_end(p) for p in periods)
+        if start is not None:
+            where.append("period_end >= ?")
+            params.append(month_end(start))
+        if end is not None:
+            where.append("period_end <= ?")
+            params.append(month_end(end))
+
+        if group_by:
+            unknown = [c for c in group_by if c not in UNIFIED_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown column(s) to group by: {', '.join(unknown)}")
+            keys = ", ".join(map(_quote, group_by))
+            measures = ", ".join(f"ROUND(SUM({_quote(c)}), 2) AS {_quote(c)}" for c in MEASURE_COLUMNS)
+            sql = f"SELECT {keys}, COUNT(*) AS rows, {measures} FROM sales"
+        else:
+            sql = f"SELECT {', '.join(map(_quote, UNIFIED_COLUMNS))} FROM sales"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group_by:
+            sql += f" GROUP BY {keys} ORDER BY {keys}"
+        else:
+            sql += " ORDER BY period_end, rowid"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def sql(self, statement: str, params: Tuple = ()):
+        """Result of a read-only SQL statement against the ``sales`` table."""
+        self.conn.execute("PRAGMA query_only = ON")
+        try:
+            return pd.read_sql_query(statement, self.conn, params=params)
+        finally:
+            self.conn.execute("PRAGMA query_only = OFF")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
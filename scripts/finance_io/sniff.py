@@ -0,0 +1,75 @@
+"""
+Header sniffing for Excel exports whose header row position varies.
+
+The workbook is opened once: the first rows are parsed to find the header
+row and tell which kind of export it is, and the full read reuses the same
+handle instead of loading the file a second time.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .lazy import lazy_import
+from .preview import preview_rows
+
+pd = lazy_import("pandas")
+
+# Rows scanned for a header before giving up
+SNIFF_ROWS = 10
+
+# Export kind -> column that identifies its header row
+RETAIL_LAYOUTS: Dict[str, str] = {
+    "invoice": "Invoice Number",
+    "credit": "Credit Note Number",
+}
+
+
+def sniff_header(
+    preview, layouts: Dict[str, str], expected: Optional[str] = None
+) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Find the first row of preview (read with header=None) that holds one of
+    the layouts' key columns, matched exactly (surrounding spaces ignored).
+    With expected, that layout's key is looked for first, so an export that
+    also carries another layout's key (a credit note export with the linked
+    "Invoice Number" ahead of "Credit Note Number") is still recognised.
+    Returns (kind, row) or (None, None).
+    """
+    cells = [[str(value).strip() for value in row] for row in preview.itertuples(index=False)]
+    if expected is not None:
+        key = layouts[expected]
+        for row_idx, row in enumerate(cells):
+            if key in row:
+                return expected, row_idx
+    keys = {col: kind for kind, col in layouts.items()}
+    for row_idx, row in enumerate(cells):
+        for value in row:
+            kind = keys.get(value)
+            if kind is not None:
+                return kind, row_idx
+    return None, None
+
+
+def read_sniffed_excel(
+    path: Path,
+    layouts: Dict[str, str] = RETAIL_LAYOUTS,
+    sheet_name=0,
+    sniff_rows: int = SNIFF_ROWS,
+    expected: Optional[str] = None,
+):
+    """
+    Open an Excel file once, sniff its header row and read the data.
+
+    Returns (kind, header_row, df); kind and header_row are None (and df is
+    the raw preview) when no known header is found in the first sniff_rows.
+    With expected (a layouts kind), that layout wins whenever its key is
+    present; another kind is returned only when it is absent.
+    """
+    with pd.ExcelFile(path) as xl:
+        preview = xl.parse(sheet_name, header=None, nrows=sniff_rows)
+        kind, header_row = sniff_header(preview, layouts, expected)
+        if kind is None:
+            return None, None, preview
+        return kind, header_row, xl.parse(sheet_name, header=header_row, nrows=preview_rows())
@@ -0,0 +1,118 @@
+"""
+Row sinks for the PDF batch extractors.
+
+The extractors hand every file's rows to a sink instead of growing Python
+lists. `RowBuffer` keeps them in memory, as before. `RowSpool`, used with
+``--stream`` (or HRMS_STREAM=1), appends them in small batches to a CSV
+spill file in ``<output stem>.spool/`` next to the output, so memory stays
+flat however many PDFs are in the batch and rows written before a crash are
+still on disk. Both sinks return the rows as a DataFrame with `read` once
+the batch is done.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+STREAM_ENV = "HRMS_STREAM"
+
+# Rows buffered before a spool appends them to its file
+SPOOL_BATCH_ROWS = 500
+
+
+def stream_enabled(enabled: bool = False) -> bool:
+    """True when --stream or HRMS_STREAM asks for on-disk row spools."""
+    return enabled or os.environ.get(STREAM_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def spool_dir(output) -> Path:
+    """Folder for the spill files of one output: ``<output stem>.spool`` beside it."""
+    out = Path(output).expanduser()
+    return out.with_name(out.stem + ".spool")
+
+
+class RowBuffer:
+    """Rows (dicts) collected in memory, in a fixed column order."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns: List[str] = list(columns)
+        self.rows = 0
+        self._buffer: List[Dict[str, Any]] = []
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Add rows; keys outside the sink's columns are ignored."""
+        for row in rows:
+            self._buffer.append(row)
+            self.rows += 1
+
+    def read(self) -> pd.DataFrame:
+        """All rows added so far as a DataFrame with the sink's columns."""
+        return pd.DataFrame(self._buffer, columns=self.columns)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class RowSpool(RowBuffer):
+    """
+    Rows appended to a CSV spill file in batches of batch_rows.
+
+    Only the current batch is held in memory. The file is opened per batch,
+    so everything flushed before a crash stays readable. With append=True an
+    existing spill file is continued instead of replaced.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        columns: Sequence[str],
+        batch_rows: int = SPOOL_BATCH_ROWS,
+        append: bool = False,
+    ):
+        super().__init__(columns)
+        self.path = Path(path)
+        self.batch_rows = batch_rows
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if append and self.path.exists():
+            with open(self.path, newline="", encoding="utf-8") as fh:
+                self.rows = max(sum(1 for _ in csv.reader(fh)) - 1, 0)
+        else:
+            with open(self.path, "w", newline="", encoding="utf-8") as fh:
+                csv.writer(fh).writerow(self.columns)
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> None:
+        super().append(rows)
+        if len(self._buffer) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append the buffered rows to the spill file."""
+        if not self._buffer:
+            return
+        with open(self.path, "a", newline="", encoding="utf-8") as fh:
+            csv.DictWriter(fh, fieldnames=self.columns, extrasaction="ignore").writerows(self._buffer)
+        self._buffer = []
+
+    def read(self) -> pd.DataFrame:
+        """
+        The whole spill file as a DataFrame. Every column is read as text and
+        blank cells come back as NaN, as None values do from `RowBuffer`.
+        """
+        self.flush()
+        return pd.read_csv(self.path, dtype=str, keep_default_na=False, na_values=[""], encoding="utf-8")
+
+    def close(self) -> None:
+        self.flush()
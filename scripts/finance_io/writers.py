@@ -0,0 +1,59 @@
+"""
+Output writers shared by the cleaning scripts.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List
+
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def _prepare_decimal_columns(df: pd.DataFrame, decimal_cols: List[str]) -> pd.DataFrame:
+    """
+    Make decimal_cols the only float columns of df, so a single `float_format`
+    in `to_csv` applies to exactly those columns.
+
+    Decimal columns that are not float yet (e.g. strings read from Excel) are
+    coerced to numeric with NA -> 0. The result is a new frame; the caller's
+    df and its columns are left untouched. Any other float column is passed
+    through as object so it keeps its default representation.
+    """
+    converted = {}
+    for col in decimal_cols:
+        s = df[col]
+        if not pd.api.types.is_float_dtype(s):
+            converted[col] = pd.to_numeric(s, errors="coerce").fillna(0).astype(float)
+        elif s.hasnans:
+            converted[col] = s.fillna(0)
+    if converted:
+        df = df.assign(**converted)
+
+    other_floats = [c for c in df.select_dtypes(include="float").columns if c not in decimal_cols]
+    if other_floats:
+        df = df.astype({c: object for c in other_floats})
+    return df
+
+
+def write_table(df: pd.DataFrame, out: Path, decimal_cols: Iterable[str] = ()) -> None:
+    """
+    Write DataFrame to CSV or Excel based on file extension.
+
+    For CSV, columns listed in decimal_cols are written with exactly 2 decimal
+    places (e.g. 2345.00) by the CSV writer itself; no string columns are built.
+    Missing values in those columns are written as 0.00.
+    """
+    ext = Path(out).suffix.lower()
+    if ext in {".xlsx", ".xls"}:
+        df.to_excel(out, index=False)
+        return
+
+    decimal_cols = [c for c in dict.fromkeys(decimal_cols) if c in df.columns]
+    if decimal_cols:
+        df = _prepare_decimal_columns(df, decimal_cols)
+        df.to_csv(out, index=False, float_format="%.2f")
+    else:
+        df.to_csv(out, index=False)
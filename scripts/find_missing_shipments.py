@@ -13,13 +13,38 @@ Usage:
     python find_missing_shipments.py -m "main_data.csv" -c "country.xlsx" -s "SheetName" -o "output.xlsx"
 """
 
-import pandas as pd
 import os
 import argparse
 import sys
 from pathlib import Path
 from datetime import datetime
 
+from finance_io import (
+    CsvSchema,
+    HeaderCheck,
+    begin_stage,
+    csv_header,
+    end_stage,
+    lazy_import,
+    preview_path,
+    preview_report,
+    read_csv_typed,
+    run_preflight,
+    set_metrics_path,
+    set_preview_rows,
+    set_progress,
+    start_profile,
+    write_metrics,
+)
+
+pd = lazy_import("pandas")
+
+# Identifier columns of main_data kept as text
+MAIN_DATA_SCHEMA = CsvSchema(text=['shipmentId', 'shipmentName', 'destinationFC', 'merchantSKU'])
+
+# Column holding the shipment reference in the country sheet (first match wins)
+REFERENCE_COLUMNS = ['Reference No.', 'Reference No', 'ReferenceNo', 'reference_no', 'Reference_No', 'Shipment ID']
+
 
 def get_file_path(prompt, file_type="file"):
     """Get file path from user with drag-and-drop support"""
@@ -115,17 +140,17 @@ def load_main_data(csv_path):
                       'totalReceivedQuantity': 'Total Received Quantity',
                       'totalDiscrepancyQuantity': 'Total Discrepancy Quantity'}
         
-        # Read CSV - try to use only required columns if they exist
-        main_data = pd.read_csv(csv_path)
+        # Read the header first, then only the required columns that exist
+        header = csv_header(csv_path)
         
         # Check if 'Shipment ID' or 'shipmentId' column exists
-        if 'Shipment ID' not in main_data.columns and 'shipmentId' not in main_data.columns:
+        if 'Shipment ID' not in header and 'shipmentId' not in header:
             print("❌ Error: Could not find 'Shipment ID' or 'shipmentId' column in main_data")
-            print(f"Available columns: {', '.join(main_data.columns)}")
+            print(f"Available columns: {', '.join(header)}")
             return None
         
-        # Select only required columns that exist in the CSV
-        available_cols = [col for col in required_col if col in main_data.columns]
+        available_cols = [col for col in required_col if col in header]
+        main_data = read_csv_typed(csv_path, MAIN_DATA_SCHEMA, usecols=available_cols or None)
         if available_cols:
             main_data = main_data.loc[:, available_cols]
         
@@ -203,14 +228,13 @@ def load_country_data(excel_path, sheet_name):
     try:
         print(f"\n📂 Loading country data from sheet '{sheet_name}'...")
         
-        # Read Excel sheet
+        # Read Excel sheet (in full even in preview mode: it is the reference
+        # side, and a truncated one would report most shipments as missing)
         country_data = pd.read_excel(excel_path, sheet_name=sheet_name)
         
         # Check if 'Reference No.' column exists (try variations)
         ref_col = None
-        possible_cols = ['Reference No.', 'Reference No', 'ReferenceNo', 'reference_no', 'Reference_No','Shipment ID']
-        
-        for col in possible_cols:
+        for col in REFERENCE_COLUMNS:
             if col in country_data.columns:
                 ref_col = col
                 break
@@ -321,6 +345,7 @@ def create_output(missing_shipments, main_data, country_sheet, output_path=None,
     output_path = Path(output_path)
     if output_path.suffix.lower() != '.xlsx':
         output_path = output_path.with_suffix('.xlsx')
+    output_path = preview_path(output_path)
     
     # Write to Excel
     try:
@@ -443,24 +468,38 @@ def create_output(missing_shipments, main_data, country_sheet, output_path=None,
 
 def process_files(main_data_path, country_file_path, sheet_name, output_path=None):
     """Process files - core processing logic"""
+    # Check both headers before loading either file
+    problems = run_preflight([
+        HeaderCheck('main_data', main_data_path, [('Shipment ID', 'shipmentId')]),
+        HeaderCheck('Country data', country_file_path, [tuple(REFERENCE_COLUMNS)], sheet_name=sheet_name),
+    ])
+    if problems:
+        return None
+    
     # Load main_data
+    begin_stage("load", "main_data")
     main_data_result = load_main_data(main_data_path)
     if main_data_result is None:
         return None
     main_data, main_shipments = main_data_result
+    end_stage(rows_out=len(main_data))
     
     # Load country data
+    begin_stage("load", sheet_name)
     country_data_result = load_country_data(country_file_path, sheet_name)
     if country_data_result is None:
         return None
     country_data, country_refs, ref_col, status_col = country_data_result
+    end_stage(rows_out=len(country_data))
     
     # Find missing shipments
     print(f"\n{'='*60}")
     print("COMPARING SHIPMENT IDs...")
     print('='*60)
     
+    begin_stage("merge", "Shipment IDs", rows_in=len(main_shipments) + len(country_refs))
     missing_shipments = find_missing_shipments(main_shipments, country_refs)
+    end_stage(rows_out=len(missing_shipments))
     
     print(f"\n📊 Comparison Results:")
     print(f"   - Total Shipment IDs in main_data: {len(main_shipments)}")
@@ -473,7 +512,9 @@ def process_files(main_data_path, country_file_path, sheet_name, output_path=Non
     print("COMPARING STATUS CHANGES...")
     print('='*60)
     
+    begin_stage("merge", "Status", rows_in=len(main_data) + len(country_data))
     status_changes = find_status_changes(main_data, country_data, ref_col, status_col)
+    end_stage(rows_out=len(status_changes or []))
     
     if status_changes is not None:
         print(f"\n📊 Status Comparison Results:")
@@ -489,6 +530,7 @@ def process_files(main_data_path, country_file_path, sheet_name, output_path=Non
         print("CREATING OUTPUT FILE...")
         print('='*60)
         
+        begin_stage("write", rows_in=len(missing_shipments) + len(status_changes))
         output_file = create_output(
             missing_shipments if missing_shipments else [], 
             main_data, 
@@ -499,6 +541,7 @@ def process_files(main_data_path, country_file_path, sheet_name, output_path=Non
             ref_col=ref_col,
             status_col=status_col
         )
+        end_stage()
         
         return output_file
     else:
@@ -529,8 +572,35 @@ def main():
         '-o', '--output',
         help='Output Excel file path (optional)'
     )
+    parser.add_argument(
+        '--preview',
+        type=int,
+        metavar='N',
+        help='Dry run: read only the first N rows of each input'
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='JSON',
+        help='Write per-stage timings and memory use to this JSON file'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the run; writes <output>.prof and a hot-function summary'
+    )
+    parser.add_argument(
+        '--progress-json',
+        nargs='?',
+        const='-',
+        metavar='PATH',
+        help='Emit JSON-lines progress events on stdout (or append them to PATH)'
+    )
     
     args = parser.parse_args()
+    set_preview_rows(args.preview)
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, preview_path(args.output))
+    set_progress(args.progress_json)
     
     print("\n" + "="*60)
     print("  AMAZON SHIPMENT TRACKER - MISSING SHIPMENT ID FINDER")
@@ -552,6 +622,8 @@ def main():
             print("  PROCESS COMPLETE!")
             print('='*60)
             print(f"\n📁 Output file: {output_file}")
+            preview_report([args.main_data], [output_file])
+        write_metrics()
         return
     
     # Otherwise, use interactive mode
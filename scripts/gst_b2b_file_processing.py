@@ -22,45 +22,38 @@ import traceback
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
-import pandas as pd
+from finance_io import (
+    collect_files,
+    gst_b2b_check,
+    lazy_import,
+    load_gst_b2b,
+    preflight_files,
+    set_metrics_path,
+    set_progress,
+    stage,
+    start_profile,
+    track,
+    write_metrics,
+    write_table,
+)
+
+pd = lazy_import("pandas")
 
 
 # =============================================================================
-# CONSTANTS (B2B full column set)
+# CONSTANTS (column set and layout live in finance_io.loaders)
 # =============================================================================
 
-REQUIRED_COLUMNS = [
-    "GSTIN_of_supplier_Unnamed:_0_level_1",
-    "Trade/Legal name_Unnamed:_1_level_1",
-    "Invoice_Details_Invoice_number",
-    "Invoice_Details_Invoice_Date",
-    "Invoice_Details_Invoice_Value",
-    "Place_of_supply_Unnamed:_6_level_1",
-    "Supply Attract Reverse Charge_Unnamed:_7_level_1",
-    "Taxable_Value_Unnamed:_8_level_1",
-    "Tax_Amount_Integrated_Tax",
-    "Tax_Amount_Central_Tax",
-    "Tax_Amount_State/UT_Tax",
-    "Tax_Amount_Cess",
-    "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1",
+# Amount columns written with 2 decimal places when --two-decimals is used
+DECIMAL_COLUMNS = [
+    "invoice_value",
+    "taxable_value",
+    "integrated_tax",
+    "central_tax",
+    "state_tax",
+    "cess",
 ]
 
-RENAME_COLUMNS = {
-    "GSTIN_of_supplier_Unnamed:_0_level_1": "GSTIN_of_supplier",
-    "Trade/Legal name_Unnamed:_1_level_1": "trade_legal_name",
-    "Invoice_Details_Invoice_number": "invoice_number",
-    "Invoice_Details_Invoice_Date": "invoice_date",
-    "Invoice_Details_Invoice_Value": "invoice_value",
-    "Place_of_supply_Unnamed:_6_level_1": "place_of_supply",
-    "Supply Attract Reverse Charge_Unnamed:_7_level_1": "supply_attract_reverse_charge",
-    "Taxable_Value_Unnamed:_8_level_1": "taxable_value",
-    "Tax_Amount_Integrated_Tax": "integrated_tax",
-    "Tax_Amount_Central_Tax": "central_tax",
-    "Tax_Amount_State/UT_Tax": "state_tax",
-    "Tax_Amount_Cess": "cess",
-    "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1": "filing_date",
-}
-
 
 # =============================================================================
 # HELPERS
@@ -71,149 +64,27 @@ def _print_header(title: str):
     print(f"\n{bar}\n{title}\n{bar}")
 
 
-def _flatten_columns(columns: Iterable[Tuple]) -> List[str]:
-    """
-    Flatten MultiIndex columns by joining non-empty parts with "_"
-    and applying the same cleaning as the notebook.
-    """
-    flattened = [
-        "_".join([str(c).strip() for c in col if pd.notna(c) and c != ""])
-        for col in columns
-    ]
-    cleaned = (
-        pd.Index(flattened)
-        .str.replace(" ", "_")
-        .str.replace("(₹)", "", regex=False)
-        .str.replace("__", "_")
-        .str.strip("_")
-        .tolist()
-    )
-    return cleaned
-
-
-def _find_column_mapping(actual_columns: List[str], expected_columns: List[str]) -> dict:
-    """
-    Map expected column names to actual column names using flexible matching.
-    Returns a dictionary mapping expected -> actual column names.
-    """
-    mapping = {}
-    actual_lower = [c.lower() for c in actual_columns]
-
-    column_keywords = {
-        "GSTIN_of_supplier_Unnamed:_0_level_1": ["gstin", "supplier"],
-        "Trade/Legal name_Unnamed:_1_level_1": ["trade", "legal", "name"],
-        "Invoice_Details_Invoice_number": ["invoice", "number"],
-        "Invoice_Details_Invoice_Date": ["invoice", "date"],
-        "Invoice_Details_Invoice_Value": ["invoice", "value"],
-        "Place_of_supply_Unnamed:_6_level_1": ["place", "supply"],
-        "Supply Attract Reverse Charge_Unnamed:_7_level_1": ["supply", "attract", "reverse", "charge"],
-        "Taxable_Value_Unnamed:_8_level_1": ["taxable", "value"],
-        "Tax_Amount_Integrated_Tax": ["integrated", "tax"],
-        "Tax_Amount_Central_Tax": ["central", "tax"],
-        "Tax_Amount_State/UT_Tax": ["state", "ut", "tax"],
-        "Tax_Amount_Cess": ["cess"],
-        "GSTR-1/1A/IFF/GSTR-5_Filing_Date_Unnamed:_14_level_1": ["filing", "date", "gstr"],
-    }
-
-    for expected in expected_columns:
-        if expected in actual_columns:
-            mapping[expected] = expected
-            continue
-
-        expected_lower = expected.lower()
-        if expected_lower in actual_lower:
-            idx = actual_lower.index(expected_lower)
-            mapping[expected] = actual_columns[idx]
-            continue
-
-        keywords = column_keywords.get(expected, [])
-        if not keywords:
-            key_parts = expected.split("_Unnamed:")[0].lower()
-            key_parts = key_parts.replace("/", "_").replace("-", "_").split("_")
-            keywords = [p for p in key_parts if p and p not in ["unnamed", "level", "details", "amount"]]
-
-        best_match = None
-        best_score = 0
-
-        for actual in actual_columns:
-            actual_lower_clean = actual.lower().replace("/", "_").replace("-", "_")
-            matches = sum(1 for keyword in keywords if keyword in actual_lower_clean)
-            min_required = max(1, int(len(keywords) * 0.5)) if len(keywords) > 2 else len(keywords)
-
-            if matches >= min_required and matches > best_score:
-                best_score = matches
-                best_match = actual
-
-        if best_match:
-            mapping[expected] = best_match
-            print(f"    ✓ Matched '{expected}' -> '{best_match}'")
-        else:
-            raise ValueError(
-                f"Could not find column matching '{expected}'. "
-                f"Looking for keywords: {keywords}. "
-                f"Available columns: {actual_columns[:15]}..." if len(actual_columns) > 15 else f"Available columns: {actual_columns}"
-            )
-
-    return mapping
-
-
-def _load_and_clean(path: Path, sheet_name: str = "B2B") -> pd.DataFrame:
-    """
-    Load a GST Excel file, flatten columns, select required columns, and rename.
-    """
-    df_raw = pd.read_excel(path, sheet_name=sheet_name, skiprows=4, header=[0, 1])
-    df_raw.columns = _flatten_columns(df_raw.columns)
-
-    print(f"    📋 Found {len(df_raw.columns)} columns")
-    if len(df_raw.columns) <= 20:
-        print(f"    Columns: {list(df_raw.columns)}")
-    else:
-        print(f"    First 10 columns: {list(df_raw.columns[:10])}")
-
-    try:
-        column_mapping = _find_column_mapping(list(df_raw.columns), REQUIRED_COLUMNS)
-    except ValueError as e:
-        raise ValueError(f"Column matching failed: {e}")
-
-    actual_required_columns = [column_mapping[req] for req in REQUIRED_COLUMNS]
-    df = df_raw[actual_required_columns].copy()
-
-    rename_map = {}
-    for expected, clean_name in RENAME_COLUMNS.items():
-        actual_col = column_mapping[expected]
-        rename_map[actual_col] = clean_name
-
-    df = df.rename(columns=rename_map)
-
-    df["invoice_date"] = pd.to_datetime(df["invoice_date"], errors="coerce", dayfirst=True)
-    df["year_month"] = df["invoice_date"].dt.strftime("%Y-%m")
-    df["source_file"] = path.name
-    return df
-
-
-def _collect_files(input_path: Path) -> List[Path]:
-    """Collect excel files from a file or directory."""
-    if input_path.is_file():
-        return [input_path]
-    return sorted(list(input_path.glob("*.xlsx")) + list(input_path.glob("*.xls")))
-
-
 # =============================================================================
 # CORE PROCESS
 # =============================================================================
 
-def _write_output(df: pd.DataFrame, out: Path) -> None:
-    """Write DataFrame to CSV or Excel based on file extension."""
-    ext = out.suffix.lower()
-    if ext in {".xlsx", ".xls"}:
-        df.to_excel(out, index=False)
-    else:
-        df.to_csv(out, index=False)
+def _write_output(df: pd.DataFrame, out: Path, decimal_cols: Iterable[str] = ()) -> None:
+    """
+    Write DataFrame to CSV or Excel based on file extension.
+    For CSV, decimal_cols are written with 2 decimal places (e.g., 2345.00).
+    """
+    write_table(df, out, decimal_cols=decimal_cols)
 
 
-def process_input(input_path: str, output_path: str, sheet_name: str = "B2B") -> Tuple[int, int]:
+def process_input(
+    input_path: str,
+    output_path: str,
+    sheet_name: str = "B2B",
+    two_decimals: bool = False,
+) -> Tuple[int, int]:
     """
     Process a single file or a directory of files.
+    With two_decimals, amount columns in CSV output are written as 0.00.
 
     Returns:
         tuple: (files_processed, rows_written)
@@ -221,15 +92,18 @@ def process_input(input_path: str, output_path: str, sheet_name: str = "B2B") ->
     inp = Path(input_path).expanduser().resolve()
     out = Path(output_path).expanduser().resolve()
 
-    files = _collect_files(inp)
+    files = collect_files(inp, [".xlsx", ".xls"])
     if not files:
         raise FileNotFoundError(f"No Excel files found at {inp}")
+    files = preflight_files(files, lambda f: gst_b2b_check(f, sheet_name=sheet_name))
 
     frames: List[pd.DataFrame] = []
-    for f in files:
+    for f in track(files, "GST files"):
         try:
             print(f"  → Processing {f.name}")
-            frames.append(_load_and_clean(f, sheet_name=sheet_name))
+            with stage("load", f.name) as record:
+                frames.append(load_gst_b2b(f, sheet_name=sheet_name))
+                record["rows_out"] = len(frames[-1])
         except Exception as e:
             print(f"  ✗ Skipped {f.name}: {e}")
             continue
@@ -237,9 +111,12 @@ def process_input(input_path: str, output_path: str, sheet_name: str = "B2B") ->
     if not frames:
         raise RuntimeError("No files processed successfully.")
 
-    combined = pd.concat(frames, ignore_index=True, sort=False)
+    with stage("merge", rows_in=sum(len(df) for df in frames)) as record:
+        combined = pd.concat(frames, ignore_index=True, sort=False)
+        record["rows_out"] = len(combined)
     out.parent.mkdir(parents=True, exist_ok=True)
-    _write_output(combined, out)
+    with stage("write", rows_in=len(combined)):
+        _write_output(combined, out, decimal_cols=DECIMAL_COLUMNS if two_decimals else ())
 
     print(f"\n✅ Saved cleaned data to {out}")
     print(f"   Files processed: {len(frames)}")
@@ -282,6 +159,28 @@ Examples:
         default="B2B",
         help="Sheet name to read (default: B2B)",
     )
+    parser.add_argument(
+        "--two-decimals",
+        action="store_true",
+        help="Write amount columns with exactly 2 decimal places in CSV output",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="JSON",
+        help="Write per-stage timings and memory use to this JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run; writes <output>.prof and a hot-function summary",
+    )
+    parser.add_argument(
+        "--progress-json",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Emit JSON-lines progress events on stdout (or append them to PATH)",
+    )
 
     return parser
 
@@ -289,6 +188,9 @@ Examples:
 def main():
     parser = build_parser()
     args = parser.parse_args()
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, args.output)
+    set_progress(args.progress_json)
 
     if not args.input:
         _print_header("GST B2B FILE PROCESSOR")
@@ -313,11 +215,18 @@ def main():
 
     _print_header("GST B2B FILE PROCESSOR")
     try:
-        process_input(str(input_path), str(output_path), sheet_name=args.sheet)
+        process_input(
+            str(input_path),
+            str(output_path),
+            sheet_name=args.sheet,
+            two_decimals=args.two_decimals,
+        )
     except Exception:
         print("❌ Error during processing:")
         print(traceback.format_exc())
+        write_metrics("error")
         sys.exit(1)
+    write_metrics()
 
 
 if __name__ == "__main__":
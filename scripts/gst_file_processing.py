@@ -22,7 +22,22 @@ import traceback
 from pathlib import Path
 from typing import Iterable, List, Optional, Tuple
 
-import pandas as pd
+from finance_io import (
+    collect_files,
+    gst_b2b_check,
+    lazy_import,
+    load_gst_b2b,
+    preflight_files,
+    set_metrics_path,
+    set_progress,
+    stage,
+    start_profile,
+    track,
+    write_metrics,
+    write_table,
+)
+
+pd = lazy_import("pandas")
 
 
 # =============================================================================
@@ -56,6 +71,16 @@ RENAME_COLUMNS = {
 }
 
 
+# Amount columns written with 2 decimal places when --two-decimals is used
+DECIMAL_COLUMNS = [
+    "invoice_value",
+    "taxable_value",
+    "integrated_tax",
+    "central_tax",
+    "state_tax",
+]
+
+
 # =============================================================================
 # HELPERS
 # =============================================================================
@@ -65,70 +90,27 @@ def _print_header(title: str):
     print(f"\n{bar}\n{title}\n{bar}")
 
 
-def _flatten_columns(columns: Iterable[Tuple]) -> List[str]:
-    """
-    Flatten MultiIndex columns by joining non-empty parts with "_"
-    and applying the same cleaning as the notebook.
-    """
-    flattened = [
-        "_".join([str(c).strip() for c in col if pd.notna(c) and c != ""])
-        for col in columns
-    ]
-    cleaned = (
-        pd.Index(flattened)
-        .str.replace(" ", "_")
-        .str.replace("(₹)", "", regex=False)
-        .str.replace("__", "_")
-        .str.strip("_")
-        .tolist()
-    )
-    return cleaned
-
-
-def _load_and_clean(path: Path, sheet_name: str = "B2B") -> pd.DataFrame:
-    """
-    Load a GST Excel file, flatten columns, select required columns, and rename.
-    """
-    df_raw = pd.read_excel(path, sheet_name=sheet_name, skiprows=4, header=[0, 1])
-    df_raw.columns = _flatten_columns(df_raw.columns)
-
-    missing = [c for c in REQUIRED_COLUMNS if c not in df_raw.columns]
-    if missing:
-        raise ValueError(f"Missing required columns: {missing}")
-
-    df = df_raw[REQUIRED_COLUMNS].copy()
-    df = df.rename(columns=RENAME_COLUMNS)
-    df["source_file"] = path.name
-    return df
-
-
-def _collect_files(input_path: Path) -> List[Path]:
-    """
-    Collect excel files from a file or directory.
-    """
-    if input_path.is_file():
-        return [input_path]
-    return sorted(list(input_path.glob("*.xlsx")) + list(input_path.glob("*.xls")))
-
-
 # =============================================================================
 # CORE PROCESS
 # =============================================================================
 
-def _write_output(df: pd.DataFrame, out: Path) -> None:
+def _write_output(df: pd.DataFrame, out: Path, decimal_cols: Iterable[str] = ()) -> None:
     """
     Write DataFrame to CSV or Excel based on file extension.
+    For CSV, decimal_cols are written with 2 decimal places (e.g., 2345.00).
     """
-    ext = out.suffix.lower()
-    if ext in {".xlsx", ".xls",".csv"}:
-        df.to_excel(out, index=False)
-    else:
-        df.to_csv(out, index=False)
+    write_table(df, out, decimal_cols=decimal_cols)
 
 
-def process_input(input_path: str, output_path: str, sheet_name: str = "B2B") -> Tuple[int, int]:
+def process_input(
+    input_path: str,
+    output_path: str,
+    sheet_name: str = "B2B",
+    two_decimals: bool = False,
+) -> Tuple[int, int]:
     """
     Process a single file or a directory of files.
+    With two_decimals, amount columns in CSV output are written as 0.00.
 
     Returns:
         tuple: (files_processed, rows_written)
@@ -136,15 +118,30 @@ def process_input(input_path: str, output_path: str, sheet_name: str = "B2B") ->
     inp = Path(input_path).expanduser().resolve()
     out = Path(output_path).expanduser().resolve()
 
-    files = _collect_files(inp)
+    files = collect_files(inp, [".xlsx", ".xls"])
     if not files:
         raise FileNotFoundError(f"No Excel files found at {inp}")
+    files = preflight_files(
+        files,
+        lambda f: gst_b2b_check(f, sheet_name=sheet_name, required_columns=REQUIRED_COLUMNS, flexible_headers=False),
+    )
 
     frames: List[pd.DataFrame] = []
-    for f in files:
+    for f in track(files, "GST files"):
         try:
             print(f"  → Processing {f.name}")
-            frames.append(_load_and_clean(f, sheet_name=sheet_name))
+            with stage("load", f.name) as record:
+                frames.append(
+                    load_gst_b2b(
+                        f,
+                        sheet_name=sheet_name,
+                        required_columns=REQUIRED_COLUMNS,
+                        rename_columns=RENAME_COLUMNS,
+                        flexible_headers=False,
+                        parse_dates=False,
+                    )
+                )
+                record["rows_out"] = len(frames[-1])
         except Exception as e:
             print(f"  ✗ Skipped {f.name}: {e}")
             continue
@@ -152,9 +149,12 @@ def process_input(input_path: str, output_path: str, sheet_name: str = "B2B") ->
     if not frames:
         raise RuntimeError("No files processed successfully.")
 
-    combined = pd.concat(frames, ignore_index=True, sort=False)
+    with stage("merge", rows_in=sum(len(df) for df in frames)) as record:
+        combined = pd.concat(frames, ignore_index=True, sort=False)
+        record["rows_out"] = len(combined)
     out.parent.mkdir(parents=True, exist_ok=True)
-    _write_output(combined, out)
+    with stage("write", rows_in=len(combined)):
+        _write_output(combined, out, decimal_cols=DECIMAL_COLUMNS if two_decimals else ())
 
     print(f"\n✅ Saved cleaned data to {out}")
     print(f"   Files processed: {len(frames)}")
@@ -197,6 +197,28 @@ Examples:
         default="B2B",
         help="Sheet name to read (default: B2B)",
     )
+    parser.add_argument(
+        "--two-decimals",
+        action="store_true",
+        help="Write amount columns with exactly 2 decimal places in CSV output",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="JSON",
+        help="Write per-stage timings and memory use to this JSON file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run; writes <output>.prof and a hot-function summary",
+    )
+    parser.add_argument(
+        "--progress-json",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Emit JSON-lines progress events on stdout (or append them to PATH)",
+    )
 
     return parser
 
@@ -204,6 +226,9 @@ Examples:
 def main():
     parser = build_parser()
     args = parser.parse_args()
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, args.output)
+    set_progress(args.progress_json)
 
     # Interactive prompts when paths are missing
     if not args.input:
@@ -229,11 +254,18 @@ def main():
 
     _print_header("GST FILE PROCESSOR")
     try:
-        process_input(str(input_path), str(output_path), sheet_name=args.sheet)
+        process_input(
+            str(input_path),
+            str(output_path),
+            sheet_name=args.sheet,
+            two_decimals=args.two_decimals,
+        )
     except Exception:
         print("❌ Error during processing:")
         print(traceback.format_exc())
+        write_metrics("error")
         sys.exit(1)
+    write_metrics()
 
 
 if __name__ == "__main__":
@@ -4,12 +4,162 @@ Uses pandas-based processing. All file paths are plain strings; no GUI/tooling.
 """
 
 import argparse
-import calendar
 import glob
 import os
+import re
+import shutil
 import sys
+import tempfile
 import traceback
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from finance_io import (
+    PROGRESS_ENV,
+    RETAIL_LAYOUTS,
+    SNIFF_ROWS,
+    CsvSchema,
+    HeaderCheck,
+    SalesStore,
+    add_worker_stats,
+    begin_stage,
+    classify_marketplace,
+    emit,
+    end_stage,
+    filter_periods,
+    format_period,
+    lazy_import,
+    month_end_period,
+    preflight_report,
+    preview_path,
+    preview_report,
+    preview_rows,
+    profiled_call,
+    read_csv_typed,
+    read_sniffed_excel,
+    run_preflight,
+    sales_store_path,
+    set_metrics_path,
+    set_preview_rows,
+    set_progress,
+    start_profile,
+    worker_profiling,
+    write_metrics,
+)
+
+pd = lazy_import("pandas")
+
+# Columns each channel export must have (checked on the header before loading):
+# only those the processors fail without. Every other column is optional and
+# defaults through numeric_col/str_col, as it always has.
+AMAZON_MTR_REQUIRED_COLUMNS = ["Ship To State"]
+AMAZON_B2C_REQUIRED_COLUMNS = ["Ship To State"]
+AMAZON_STOCK_REQUIRED_COLUMNS = ["Invoice Number", "Transaction Type", "Gstin Of Supplier", "Gstin Of Receiver"]
+RETAIL_INVOICE_REQUIRED_COLUMNS = ["Invoice Number"]
+RETAIL_CREDIT_REQUIRED_COLUMNS = ["Credit Note Number"]
+JIO_REQUIRED_COLUMNS = ["Buyer Invoice ID"]
+
+# Every column a processor reads (required or optional); the rest of the
+# export is never parsed
+AMAZON_RATE_COLUMNS = ["Cgst Rate", "Sgst Rate", "Igst Rate", "Utgst Rate"]
+AMAZON_MTR_COLUMNS = AMAZON_MTR_REQUIRED_COLUMNS + AMAZON_RATE_COLUMNS + [
+    "Invoice Number",
+    "Invoice Date",
+    "Transaction Type",
+    "Principal Amount Basis",
+    "Credit Note Date",
+    "Credit Note No",
+    "Seller Gstin",
+    "Customer Bill To Gstid",
+    "Buyer Name",
+    "Order Id",
+    "Sku",
+    "Item Description",
+    "Quantity",
+    "Hsn/sac",
+    "Tcs Igst Amount",
+    "Tcs Cgst Amount",
+    "Tcs Sgst Amount",
+    "Irn Filing Status",
+    "Irn Number",
+]
+AMAZON_B2C_COLUMNS = AMAZON_B2C_REQUIRED_COLUMNS + AMAZON_RATE_COLUMNS + [
+    "Invoice Number",
+    "Invoice Date",
+    "Transaction Type",
+    "Principal Amount Basis",
+    "Credit Note Date",
+    "Credit Note No",
+    "Seller Gstin",
+    "Order Id",
+    "Sku",
+    "Item Description",
+    "Quantity",
+    "Hsn/sac",
+    "Tcs Igst Amount",
+    "Tcs Cgst Amount",
+    "Tcs Sgst Amount",
+]
+AMAZON_STOCK_COLUMNS = AMAZON_STOCK_REQUIRED_COLUMNS + AMAZON_RATE_COLUMNS + [
+    "Invoice Date",
+    "Taxable Value",
+    "Ship To State",
+    "Transaction Id",
+    "Sku",
+    "Quantity",
+    "Hsn Code",
+    "Irn Filing Status",
+    "Irn Number",
+]
+JIO_COLUMNS = JIO_REQUIRED_COLUMNS + [
+    "Buyer Invoice Date",
+    "Taxable Value (Final Invoice Amount -Taxes)",
+    "Type",
+    "Customer's Delivery State",
+    "CGST Rate",
+    "SGST Rate (or UTGST as applicable)",
+    "IGST Rate",
+    "Seller GSTIN",
+    "Order ID",
+    "SKU",
+    "Product Title/Description",
+    "Item Quantity",
+    "HSN Code",
+    "TCS IGST Amount",
+    "TCS CGST Amount",
+    "TCS SGST Amount",
+    "TDS 194O Amount",
+]
+
+# How each CSV export is read: identifiers stay text, amounts and the
+# invoice date are converted once at load time
+AMAZON_MTR_SCHEMA = CsvSchema(
+    columns=AMAZON_MTR_COLUMNS,
+    text=["Seller Gstin", "Customer Bill To Gstid", "Invoice Number", "Credit Note No", "Order Id", "Sku", "Hsn/sac", "Irn Number"],
+    numbers=["Principal Amount Basis"] + AMAZON_RATE_COLUMNS,
+    dates=["Invoice Date"],
+)
+AMAZON_B2C_SCHEMA = CsvSchema(
+    columns=AMAZON_B2C_COLUMNS,
+    text=["Seller Gstin", "Invoice Number", "Credit Note No", "Order Id", "Sku", "Hsn/sac"],
+    numbers=["Principal Amount Basis"] + AMAZON_RATE_COLUMNS,
+    dates=["Invoice Date"],
+)
+AMAZON_STOCK_SCHEMA = CsvSchema(
+    columns=AMAZON_STOCK_COLUMNS,
+    text=["Gstin Of Supplier", "Gstin Of Receiver", "Invoice Number", "Transaction Id", "Sku", "Hsn Code", "Irn Number"],
+    numbers=["Taxable Value"] + AMAZON_RATE_COLUMNS,
+    dates=["Invoice Date"],
+)
+JIO_SCHEMA = CsvSchema(
+    columns=JIO_COLUMNS,
+    text=["Buyer Invoice ID", "Order ID", "SKU", "Seller GSTIN", "HSN Code"],
+    numbers=["Taxable Value (Final Invoice Amount -Taxes)"],
+    dates=["Buyer Invoice Date"],
+)
+# Processor outputs being merged
+MERGE_SCHEMA = CsvSchema(
+    text=["Supplier GSTID", "Buyer GST", "Order ID", "SKU", "Invoice Number/CN", "HSN", "Period"],
+)
 
 
 def numeric_col(df, col, default=0):
@@ -26,6 +176,12 @@ def str_col(df, col, default=""):
     return pd.Series([default] * len(df))
 
 
+def preflight(*checks):
+    """Header-only check of a processor's inputs; returns an error message or None."""
+    problems = run_preflight(checks)
+    return preflight_report(problems.values()) if problems else None
+
+
 # ------------------------------
 # Helper functions (same mapping/logic)
 # ------------------------------
@@ -86,8 +242,19 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
     and save a combined CSV at save_path.
     """
     try:
+        problem = preflight(
+            HeaderCheck("Amazon MTR", mtr_path, AMAZON_MTR_REQUIRED_COLUMNS),
+            HeaderCheck("Amazon B2C", b2c_path, AMAZON_B2C_REQUIRED_COLUMNS),
+            HeaderCheck("Amazon Stock Transfer", stock_path, AMAZON_STOCK_REQUIRED_COLUMNS),
+        )
+        if problem:
+            return False, problem
+
         # ---------- MTR (B2B) ----------
-        mtr = pd.read_csv(mtr_path, low_memory=False)
+        begin_stage("load", "Amazon MTR")
+        mtr = read_csv_typed(mtr_path, AMAZON_MTR_SCHEMA)
+        end_stage(rows_out=len(mtr))
+        begin_stage("map", "Amazon MTR", rows_in=len(mtr))
 
         if "Transaction Type" in mtr.columns:
             mtr = mtr[mtr["Transaction Type"].astype(str).str.lower() != "cancel"]
@@ -111,7 +278,7 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
         )
         mtr["Date"] = pd.to_datetime(mtr["Date_tmp"], errors="coerce")
 
-        rates = ["Cgst Rate", "Sgst Rate", "Igst Rate", "Utgst Rate"]
+        rates = AMAZON_RATE_COLUMNS
         for r in rates:
             mtr[r] = numeric_col(mtr, r, 0)
         mtr["GST Rate"] = (mtr[rates].sum(axis=1) * 100).round(2)
@@ -133,11 +300,7 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
         mtr["SGST"] = mtr.apply(lambda x: x["Tax"] / 2 if x["Inter/Intra"] == "Intra" else 0, axis=1).round(2)
 
         mtr["Invoice Date_dt"] = pd.to_datetime(mtr.get("Invoice Date"), errors="coerce")
-        mtr["Period"] = mtr["Invoice Date_dt"].apply(
-            lambda d: f"{calendar.monthrange(d.year, d.month)[1]:02d}-{d.strftime('%b-%Y')}"
-            if pd.notnull(d)
-            else ""
-        )
+        mtr["Period"] = month_end_period(mtr["Invoice Date_dt"])
 
         mtr["Invoice Number/CN"] = mtr.apply(
             lambda x: x.get("Credit Note No")
@@ -193,8 +356,13 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
             }
         )
 
+        end_stage(rows_out=len(mtr_final))
+
         # ---------- B2C ----------
-        b2c = pd.read_csv(b2c_path, low_memory=False)
+        begin_stage("load", "Amazon B2C")
+        b2c = read_csv_typed(b2c_path, AMAZON_B2C_SCHEMA)
+        end_stage(rows_out=len(b2c))
+        begin_stage("map", "Amazon B2C", rows_in=len(b2c))
 
         if "Transaction Type" in b2c.columns:
             b2c = b2c[b2c["Transaction Type"].astype(str).str.lower() != "cancel"]
@@ -222,7 +390,7 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
         )
         b2c["Date"] = pd.to_datetime(b2c["Date_tmp"], errors="coerce")
 
-        rates = ["Cgst Rate", "Sgst Rate", "Igst Rate", "Utgst Rate"]
+        rates = AMAZON_RATE_COLUMNS
         for r in rates:
             b2c[r] = numeric_col(b2c, r, 0)
         b2c["GST Rate"] = (b2c[rates].sum(axis=1) * 100).round(2)
@@ -244,11 +412,7 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
         b2c["SGST"] = b2c.apply(lambda x: x["Tax"] / 2 if x["Inter/Intra"] == "Intra" else 0, axis=1).round(2)
 
         b2c["Invoice Date_dt"] = pd.to_datetime(b2c.get("Invoice Date"), errors="coerce")
-        b2c["Period"] = b2c["Invoice Date_dt"].apply(
-            lambda d: f"{calendar.monthrange(d.year, d.month)[1]:02d}-{d.strftime('%b-%Y')}"
-            if pd.notnull(d)
-            else ""
-        )
+        b2c["Period"] = month_end_period(b2c["Invoice Date_dt"])
 
         b2c["Invoice Number/CN"] = b2c.apply(
             lambda x: x.get("Credit Note No")
@@ -302,8 +466,13 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
             }
         )
 
+        end_stage(rows_out=len(b2c_df))
+
         # ---------- STOCK TRANSFER ----------
-        stock = pd.read_csv(stock_path, low_memory=False)
+        begin_stage("load", "Amazon Stock Transfer")
+        stock = read_csv_typed(stock_path, AMAZON_STOCK_SCHEMA)
+        end_stage(rows_out=len(stock))
+        begin_stage("map", "Amazon Stock Transfer", rows_in=len(stock))
 
         stock = stock[
             stock.get("Gstin Of Supplier", "").astype(str).str[:2]
@@ -327,11 +496,7 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
         stock["Invoice Value"] = stock["Taxable Value"] + stock["Tax"]
 
         stock["Invoice Date_dt"] = pd.to_datetime(stock.get("Invoice Date"), errors="coerce")
-        stock["Period"] = stock["Invoice Date_dt"].apply(
-            lambda d: f"{calendar.monthrange(d.year, d.month)[1]:02d}-{d.strftime('%b-%Y')}"
-            if pd.notnull(d)
-            else ""
-        )
+        stock["Period"] = month_end_period(stock["Invoice Date_dt"])
 
         stock["Inter/Intra"] = stock.apply(
             lambda x: "Intra"
@@ -390,8 +555,14 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
             }
         )
 
+        end_stage(rows_out=len(stock_df))
+
+        begin_stage("merge", "Amazon", rows_in=len(mtr_final) + len(b2c_df) + len(stock_df))
         combined = pd.concat([mtr_final, b2c_df, stock_df], ignore_index=True, sort=False)
+        end_stage(rows_out=len(combined))
+        begin_stage("write", "Amazon", rows_in=len(combined))
         combined.to_csv(save_path, index=False)
+        end_stage()
         return True, f"Saved Amazon combined output to {save_path}. Rows: {combined.shape[0]}"
 
     except Exception:
@@ -402,36 +573,6 @@ def process_amazon_files(mtr_path, b2c_path, stock_path, save_path):
 # Retail & Export processing
 # ------------------------------
 
-def _get_marketplace(customer: str) -> str:
-    customer = str(customer).upper()
-    if "KIRANAKART TECHNOLOGIES PVT LTD" in customer:
-        return "Zepto"
-    elif "BLINKIT" in customer:
-        return "BLINKIT"
-    elif "ECOSOUL HOME INC" in customer:
-        return "Export"
-    elif "GAUTAM BUDDHA NAGAR(ECOSOUL HOME PRIVATE LIMITED)" in customer:
-        return "Branch Transfer"
-    elif "AMAZON SELLER SERVICES PVT LTD" in customer:
-        return "EHPL Amazon Inventory Transfer"
-    elif any(
-        name in customer
-        for name in [
-            "BIRLANU LIMITED",
-            "MITSUBISHI ELECTRIC AUTOMOTIVE INDIA PRIVATE LIMITED",
-            "SKC GYANYOG EVENTS ASSOCIATION",
-            "NILANJAN PAUL",
-            "NATIONAL ENGINEERING INDUSTRIES LIMITED",
-            "SHYAMLESH KAR",
-        ]
-    ):
-        return "Website/Shopify"
-    elif "BIG BASKET" in customer:
-        return "BIG BASKET"
-    else:
-        return "Retail Sale"
-
-
 def _get_b2b_jio(row):
     if str(row.get("Customer Name", "")).strip().upper() == "ECOSOUL HOME INC":
         return "Export"
@@ -441,18 +582,42 @@ def _get_b2b_jio(row):
     return "B2B"
 
 
+def _retail_layout_error(expected, kind):
+    if kind is None:
+        return (
+            f"Invalid {expected} structure (no '{RETAIL_LAYOUTS[expected.lower()]}' header "
+            f"in the first {SNIFF_ROWS} rows)."
+        )
+    return f"Invalid {expected} structure (this looks like the {kind} file)."
+
+
 def process_retail_export(invoice_path, credit_path, save_path):
     """
     Process Retail/Export Invoice and Credit Excel files and save merged output as CSV.
     """
     try:
-        # Invoice
-        temp_invoice = pd.read_excel(invoice_path, nrows=3, header=None)
-        third_row = temp_invoice.iloc[2].astype(str).str.lower().tolist()
-        if not any("invoice" in x for x in third_row):
-            return False, "Invalid Invoice structure (data must start from 3rd row)."
+        # Header rows are sniffed from the first rows and each workbook is
+        # opened once; the pre-flight checks the headers those reads found
+        begin_stage("load", "Retail Invoice")
+        kind, _, invoice = read_sniffed_excel(invoice_path, expected="invoice")
+        end_stage(rows_out=len(invoice))
+        if kind != "invoice":
+            return False, _retail_layout_error("Invoice", kind)
+        begin_stage("load", "Retail Credit")
+        kind, _, credit = read_sniffed_excel(credit_path, expected="credit")
+        end_stage(rows_out=len(credit))
+        if kind != "credit":
+            return False, _retail_layout_error("Credit", kind)
+
+        problem = preflight(
+            HeaderCheck("Invoice", invoice_path, RETAIL_INVOICE_REQUIRED_COLUMNS, columns=invoice.columns),
+            HeaderCheck("Credit", credit_path, RETAIL_CREDIT_REQUIRED_COLUMNS, columns=credit.columns),
+        )
+        if problem:
+            return False, problem
 
-        invoice = pd.read_excel(invoice_path, header=2)
+        # Invoice
+        begin_stage("map", "Retail Invoice", rows_in=len(invoice))
         invoice = invoice.dropna(how="all").reset_index(drop=True)
 
         invoice["Customer Name"] = str_col(invoice, "Customer Name", "").str.strip()
@@ -463,7 +628,7 @@ def process_retail_export(invoice_path, credit_path, save_path):
             invoice, "Place of Supply(With State Code)", ""
         ).str.strip()
 
-        invoice["marketplace"] = invoice["Customer Name"].apply(_get_marketplace)
+        invoice["marketplace"] = classify_marketplace(invoice["Customer Name"])
         invoice["type"] = "Order"
 
         invoice["CGST Rate %"] = numeric_col(invoice, "CGST Rate %", 0)
@@ -508,11 +673,7 @@ def process_retail_export(invoice_path, credit_path, save_path):
 
         invoice["B2B/B2C"] = invoice.apply(_get_b2b_jio, axis=1)
         invoice["Invoice Date"] = pd.to_datetime(invoice.get("Invoice Date"), errors="coerce")
-        invoice["Period"] = invoice["Invoice Date"].apply(
-            lambda d: f"{calendar.monthrange(d.year, d.month)[1]:02d}-{d.strftime('%b-%Y')}"
-            if pd.notnull(d)
-            else ""
-        )
+        invoice["Period"] = month_end_period(invoice["Invoice Date"])
 
         invoice_final = pd.DataFrame(
             {
@@ -563,14 +724,10 @@ def process_retail_export(invoice_path, credit_path, save_path):
             }
         )
 
-        # Credit
-        temp_credit = pd.read_excel(credit_path, nrows=1)
-        if not any(
-            "credit" in str(x).lower() or "note" in str(x).lower() for x in temp_credit.columns
-        ):
-            return False, "Invalid Credit structure (must include 'Credit Note Number')."
+        end_stage(rows_out=len(invoice_final))
 
-        credit = pd.read_excel(credit_path)
+        # Credit
+        begin_stage("map", "Retail Credit", rows_in=len(credit))
 
         credit["Customer Name"] = str_col(credit, "Customer Name", "").str.strip()
         credit["GST Identification Number (GSTIN)"] = str_col(
@@ -579,7 +736,7 @@ def process_retail_export(invoice_path, credit_path, save_path):
         credit["Place of Supply(With State Code)"] = str_col(
             credit, "Place of Supply(With State Code)", ""
         ).str.strip()
-        credit["marketplace"] = credit["Customer Name"].apply(_get_marketplace)
+        credit["marketplace"] = classify_marketplace(credit["Customer Name"])
         credit["type"] = "Refund"
 
         credit["CGST Rate %"] = numeric_col(credit, "CGST Rate %", 0)
@@ -627,11 +784,7 @@ def process_retail_export(invoice_path, credit_path, save_path):
         credit["B2B/B2C"] = credit.apply(_get_b2b_jio, axis=1)
 
         credit["Invoice Date"] = pd.to_datetime(credit.get("Credit Note Date"), errors="coerce")
-        credit["Period"] = credit["Invoice Date"].apply(
-            lambda d: f"{calendar.monthrange(d.year, d.month)[1]:02d}-{d.strftime('%b-%Y')}"
-            if pd.notnull(d)
-            else ""
-        )
+        credit["Period"] = month_end_period(credit["Invoice Date"])
 
         credit_final = pd.DataFrame(
             {
@@ -684,8 +837,14 @@ def process_retail_export(invoice_path, credit_path, save_path):
             }
         )
 
+        end_stage(rows_out=len(credit_final))
+
+        begin_stage("merge", "Retail", rows_in=len(invoice_final) + len(credit_final))
         combined = pd.concat([invoice_final, credit_final], ignore_index=True, sort=False)
+        end_stage(rows_out=len(combined))
+        begin_stage("write", "Retail", rows_in=len(combined))
         combined.to_csv(save_path, index=False)
+        end_stage()
         return True, f"Saved Retail/Export combined output to {save_path}. Rows: {combined.shape[0]}"
 
     except Exception:
@@ -701,10 +860,18 @@ def process_jio_file(jio_path, save_path):
     Process a Jio CSV file and save to save_path.
     """
     try:
-        jio = pd.read_csv(jio_path, low_memory=False)
+        problem = preflight(HeaderCheck("Jio", jio_path, JIO_REQUIRED_COLUMNS))
+        if problem:
+            return False, problem
+
+        begin_stage("load", "Jio")
+        jio = read_csv_typed(jio_path, JIO_SCHEMA)
+        end_stage(rows_out=len(jio))
         if jio.shape[0] == 0:
             return False, "Empty Jio file."
 
+        begin_stage("map", "Jio", rows_in=len(jio))
+
         if "Type" in jio.columns:
             jio["Type"] = (
                 jio["Type"]
@@ -735,11 +902,7 @@ def process_jio_file(jio_path, save_path):
         jio["Invoice Value"] = jio[base_col] + jio["Tax"]
 
         jio["Invoice Date"] = pd.to_datetime(jio.get("Buyer Invoice Date"), errors="coerce")
-        jio["Period"] = jio["Invoice Date"].apply(
-            lambda d: f"{calendar.monthrange(d.year, d.month)[1]:02d}-{d.strftime('%b-%Y')}"
-            if pd.notnull(d)
-            else ""
-        )
+        jio["Period"] = month_end_period(jio["Invoice Date"])
 
         jio["Inter/Intra"] = jio.apply(
             lambda x: "Intra"
@@ -796,7 +959,11 @@ def process_jio_file(jio_path, save_path):
             }
         )
 
+        end_stage(rows_out=len(jio_df))
+
+        begin_stage("write", "Jio", rows_in=len(jio_df))
         jio_df.to_csv(save_path, index=False)
+        end_stage()
         return True, f"Saved Jio output to {save_path}. Rows: {jio_df.shape[0]}"
 
     except Exception:
@@ -807,45 +974,210 @@ def process_jio_file(jio_path, save_path):
 # Generic merge
 # ------------------------------
 
-def merge_files(filepaths, save_path):
+def merge_files(filepaths, save_path, periods=None):
     """
     Merge (append) any number of files (csv or excel) and save as CSV.
+    With periods (e.g. ["31-Jan-2025"]), only rows for those Period values are kept.
     """
     try:
         frames = []
         for p in filepaths:
+            begin_stage("load", os.path.basename(p))
             ext = os.path.splitext(p)[1].lower()
             if ext == ".csv":
-                df = pd.read_csv(p, low_memory=False)
+                df = read_csv_typed(p, MERGE_SCHEMA)
             elif ext in [".xls", ".xlsx"]:
-                df = pd.read_excel(p, sheet_name=0)
+                df = pd.read_excel(p, sheet_name=0, nrows=preview_rows())
             else:
-                df = pd.read_csv(p, low_memory=False)
-            frames.append(df)
+                df = read_csv_typed(p, MERGE_SCHEMA)
+            frames.append(filter_periods(df, periods))
+            end_stage(rows_out=len(frames[-1]))
 
         if not frames:
             return False, "No files provided to merge."
 
+        begin_stage("merge", rows_in=sum(len(f) for f in frames))
         merged = pd.concat(frames, ignore_index=True, sort=False)
+        end_stage(rows_out=len(merged))
+        begin_stage("write", rows_in=len(merged))
         merged.to_csv(save_path, index=False)
+        end_stage()
         return True, f"Merged {len(frames)} files and saved to {save_path}. Rows: {merged.shape[0]}"
 
     except Exception:
         return False, f"Error merging files:\n{traceback.format_exc()}"
 
 
+# ------------------------------
+# Amazon batch (many months)
+# ------------------------------
+
+# File name prefix -> process_amazon_files argument (same patterns as the CLI defaults)
+AMAZON_BATCH_KINDS = {"MTR_B2B-": "mtr", "MTR_B2C-": "b2c", "MTR_STOCK_TRANSFER-": "stock"}
+_MONTH_IN_NAME = re.compile(
+    r"(?<![A-Za-z])(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[A-Z]*[-_ ]?((?:19|20)\d{2})", re.IGNORECASE
+)
+
+
+def _expand_inputs(patterns):
+    """CSV paths named by globs, folders (their *.csv) or plain paths; sorted, without repeats."""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, "*.csv")))
+        else:
+            paths.update(glob.glob(pattern))
+    return sorted(paths)
+
+
+def _file_month(path):
+    """Month an Amazon export covers: from its name (e.g. ...-JANUARY-2025-...), else its first Invoice Date."""
+    match = _MONTH_IN_NAME.search(os.path.basename(path))
+    if match:
+        return pd.Period(f"{match.group(1)}-{match.group(2)}", freq="M")
+    first = read_csv_typed(path, CsvSchema(columns=["Invoice Date"], dates=["Invoice Date"]), nrows=1)
+    if first.empty or "Invoice Date" not in first.columns or pd.isna(first["Invoice Date"].iloc[0]):
+        return None
+    return first["Invoice Date"].iloc[0].to_period("M")
+
+
+def collect_amazon_months(patterns):
+    """
+    Group Amazon MTR B2B / B2C / stock transfer CSVs (globs or folders) by
+    month. Returns ({month: {"mtr": path, "b2c": path, "stock": path}},
+    problems); a month with a missing or repeated kind of file is listed in
+    problems and left out.
+    """
+    months, problems = {}, []
+    for path in _expand_inputs(patterns):
+        name = os.path.basename(path).upper()
+        kind = next((k for prefix, k in AMAZON_BATCH_KINDS.items() if name.startswith(prefix)), None)
+        if kind is None:
+            problems.append(f"{path}: not an MTR_B2B-, MTR_B2C- or MTR_STOCK_TRANSFER- file; ignored")
+            continue
+        month = _file_month(path)
+        if month is None:
+            problems.append(f"{path}: no month in the file name or first Invoice Date; ignored")
+            continue
+        months.setdefault(month, {}).setdefault(kind, []).append(path)
+
+    complete = {}
+    for month in sorted(months):
+        files = months[month]
+        missing = [k for k in AMAZON_BATCH_KINDS.values() if k not in files]
+        repeated = [k for k, paths in files.items() if len(paths) > 1]
+        if missing or repeated:
+            detail = "; ".join(
+                [f"no {k} file" for k in missing] + [f"{len(files[k])} {k} files" for k in repeated]
+            )
+            problems.append(f"{format_period(month)}: {detail}; month skipped")
+            continue
+        complete[month] = {k: paths[0] for k, paths in files.items()}
+    return complete, problems
+
+
+def _quiet_worker():
+    """Pool initializer: stage events from parallel workers would interleave, so only the parent reports."""
+    os.environ.pop(PROGRESS_ENV, None)
+
+
+def _amazon_month_job(label, files, save_path):
+    ok, msg = process_amazon_files(files["mtr"], files["b2c"], files["stock"], save_path)
+    return label, ok, msg
+
+
+def process_amazon_batch(patterns, save_path, workers=None, consolidate=False):
+    """
+    Process many months of Amazon exports in one run, one month per worker
+    process (at most workers, default one per CPU). Without consolidate,
+    save_path is a folder that gets amazon_<Period>.csv per month; with it,
+    save_path is one CSV holding the months in calendar order. Rows keep the
+    Period of their own date. Returns (ok, msg, output paths).
+    """
+    try:
+        months, problems = collect_amazon_months(patterns)
+        if not months:
+            return False, "\n".join(problems + ["No complete month of Amazon files found."]), []
+
+        if consolidate:
+            # Month files go to a scratch folder next to save_path, removed once joined
+            parent, name = os.path.split(os.path.abspath(save_path))
+            out_dir = tempfile.mkdtemp(prefix=f"{name}.", suffix=".months", dir=parent)
+        else:
+            out_dir = save_path
+            os.makedirs(out_dir, exist_ok=True)
+        jobs = [
+            (format_period(month), files, os.path.join(out_dir, f"amazon_{format_period(month)}.csv"))
+            for month, files in months.items()
+        ]
+        workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+
+        results = {}
+        if workers == 1:
+            # In process, so each month's own stages are recorded
+            for done, job in enumerate(jobs, 1):
+                results[job[0]] = _amazon_month_job(*job)
+                emit("progress", label="amazon-batch", done=done, total=len(jobs), item=job[0])
+        else:
+            begin_stage("batch", f"Amazon, {len(jobs)} month(s) x {workers} workers")
+            profile = worker_profiling()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as pool:
+                futures = [pool.submit(profiled_call, profile, _amazon_month_job, *job) for job in jobs]
+                for done, future in enumerate(as_completed(futures), 1):
+                    (label, ok, msg), stats = future.result()
+                    add_worker_stats(stats)
+                    results[label] = (label, ok, msg)
+                    emit("progress", label="amazon-batch", done=done, total=len(jobs), item=label)
+            end_stage()
+
+        lines = problems + [f"{label}: {results[label][2]}" for label, _, _ in jobs]
+        failed = [label for label, _, _ in jobs if not results[label][1]]
+        outputs = [path for label, _, path in jobs if results[label][1]]
+
+        if consolidate:
+            if not failed:
+                # Month files share the processor's column order: copy the
+                # first header, then every file's body in month order
+                begin_stage("write", "Amazon batch")
+                with open(save_path, "wb") as out:
+                    for i, path in enumerate(outputs):
+                        with open(path, "rb") as src:
+                            header = src.readline()
+                            if i == 0:
+                                out.write(header)
+                            shutil.copyfileobj(src, out)
+                end_stage()
+                lines.append(f"Consolidated {len(outputs)} month(s) into {save_path}")
+                outputs = [save_path]
+            else:
+                outputs = []
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+        if failed:
+            lines.append(f"{len(failed)} of {len(jobs)} month(s) failed: {', '.join(failed)}")
+        return not failed, "\n".join(lines), outputs
+
+    except Exception:
+        return False, f"Error processing Amazon batch:\n{traceback.format_exc()}", []
+
+
 # ------------------------------
 # CLI wrapper
 # ------------------------------
 
 def _default_glob_first(pattern):
     matches = sorted(glob.glob(pattern))
+    if len(matches) > 1:
+        print(
+            f"{len(matches)} files match {os.path.basename(pattern)}; using {os.path.basename(matches[0])} "
+            "(--mode amazon-batch processes every month)"
+        )
     return matches[0] if matches else None
 
 
 def main():
     parser = argparse.ArgumentParser(description="GST Reconcile processor")
-    parser.add_argument("--mode", choices=["amazon", "retail", "jio", "merge"], required=True, help="Processing mode")
+    parser.add_argument("--mode", choices=["amazon", "amazon-batch", "retail", "jio", "merge"], required=True, help="Processing mode")
     parser.add_argument("--mtr", help="Path to Amazon MTR B2B CSV")
     parser.add_argument("--b2c", help="Path to Amazon B2C CSV")
     parser.add_argument("--stock", help="Path to Amazon stock transfer CSV")
@@ -853,10 +1185,45 @@ def main():
     parser.add_argument("--credit", help="Path to Retail/Export credit Excel")
     parser.add_argument("--jio", help="Path to Jio CSV")
     parser.add_argument("--files", nargs="+", help="Files to merge (CSV/Excel)")
-    parser.add_argument("--output", required=True, help="Output CSV path")
+    parser.add_argument("--period", action="append", help="Keep only this Period when merging, e.g. 31-Jan-2025 (repeatable)")
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="GLOB_OR_DIR",
+        help="Amazon MTR_B2B-/MTR_B2C-/MTR_STOCK_TRANSFER- CSVs for amazon-batch, grouped by month (default: current folder)",
+    )
+    parser.add_argument("--workers", type=int, help="Months processed in parallel in amazon-batch (default: one per CPU)")
+    parser.add_argument(
+        "--consolidate",
+        action="store_true",
+        help="amazon-batch: write one CSV at --output with the months in order, instead of a folder of amazon_<Period>.csv",
+    )
+    parser.add_argument("--output", required=True, help="Output CSV path (amazon-batch: output folder unless --consolidate)")
+    parser.add_argument(
+        "--preview",
+        type=int,
+        metavar="N",
+        help="Dry run: process only the first N rows of each input and estimate the full output size",
+    )
+    parser.add_argument("--metrics", metavar="JSON", help="Write per-stage timings and memory to this JSON file")
+    parser.add_argument("--profile", action="store_true", help="Profile the run; writes <output>.prof and a hot-function summary")
+    parser.add_argument("--progress-json", nargs="?", const="-", metavar="PATH", help="Emit JSON-lines progress events on stdout (or append them to PATH)")
+    parser.add_argument(
+        "--store",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="Also load the output into the local sales store (default path: HRMS_SALES_STORE or the cache directory)",
+    )
 
     args = parser.parse_args()
     mode = args.mode.lower()
+    set_preview_rows(args.preview)
+    # preview runs never overwrite the real output (batch: the output folder)
+    args.output = preview_path(args.output)
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, args.output)
+    set_progress(args.progress_json)
 
     if mode == "amazon":
         mtr_path = args.mtr or _default_glob_first(os.path.join(os.getcwd(), "MTR_B2B-*.csv"))
@@ -867,8 +1234,15 @@ def main():
             print("Missing one of: MTR, B2C, Stock files.")
             return 1
 
+        inputs = [mtr_path, b2c_path, stock_path]
         ok, msg = process_amazon_files(mtr_path, b2c_path, stock_path, args.output)
 
+    elif mode == "amazon-batch":
+        inputs = _expand_inputs(args.batch or [os.getcwd()])
+        ok, msg, outputs = process_amazon_batch(
+            args.batch or [os.getcwd()], args.output, workers=args.workers, consolidate=args.consolidate
+        )
+
     elif mode == "retail":
         invoice_path = args.invoice or _default_glob_first(os.path.join(os.getcwd(), "Retail_invoice_input*.xlsx"))
         credit_path = args.credit or _default_glob_first(os.path.join(os.getcwd(), "Retail_credit_input*.xlsx"))
@@ -877,6 +1251,7 @@ def main():
             print("Missing Invoice or Credit file.")
             return 1
 
+        inputs = [invoice_path, credit_path]
         ok, msg = process_retail_export(invoice_path, credit_path, args.output)
 
     elif mode == "jio":
@@ -884,15 +1259,29 @@ def main():
         if not jio_path:
             print("Missing Jio file.")
             return 1
+        inputs = [jio_path]
         ok, msg = process_jio_file(jio_path, args.output)
 
     else:  # merge
         if not args.files:
             print("No files provided to merge.")
             return 1
-        ok, msg = merge_files(args.files, args.output)
+        inputs = args.files
+        ok, msg = merge_files(args.files, args.output, periods=args.period)
 
+    if mode != "amazon-batch":
+        outputs = [args.output]
     print(msg)
+    if ok:
+        preview_report(inputs, outputs)
+    store_path = sales_store_path(args.store)
+    if ok and store_path and not args.preview:
+        begin_stage("store")
+        with SalesStore(store_path) as store:
+            rows = sum(store.load_csv(path) for path in outputs)
+        end_stage(rows_out=rows)
+        print(f"Loaded {rows} row(s) into the sales store at {store_path}")
+    write_metrics("ok" if ok else "error")
     return 0 if ok else 1
 
 
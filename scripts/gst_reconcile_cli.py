@@ -11,6 +11,7 @@ from pathlib import Path
 import argparse
 import sys
 
+from finance_io import set_metrics_path, set_progress, start_profile, track, write_metrics
 from gst_reconcile import (
     process_amazon_files,
     process_retail_export,
@@ -107,7 +108,7 @@ def handle_merge(args) -> int:
         return 1
 
     out = _ensure_path(args.out) or Path.cwd() / "merged_all.csv"
-    ok, msg = merge_files([str(p) for p in inputs], str(out))
+    ok, msg = merge_files([str(p) for p in inputs], str(out), periods=getattr(args, "period", None))
     print(msg)
     return 0 if ok else 1
 
@@ -121,7 +122,7 @@ def handle_run_all(args) -> int:
     ]
 
     outputs = []
-    for name, fn, fn_args in steps:
+    for name, fn, fn_args in track(steps, "run-all", item_name=lambda step: step[0]):
         ret = fn(fn_args)
         if ret != 0:
             print(f"Stopping run-all: {name} step failed.")
@@ -133,7 +134,7 @@ def handle_run_all(args) -> int:
         elif name == "jio":
             outputs.append(_ensure_path(fn_args.out) or Path.cwd() / "jio_processed.csv")
 
-    merge_args = argparse.Namespace(inputs=[str(p) for p in outputs], out=args.merge_out)
+    merge_args = argparse.Namespace(inputs=[str(p) for p in outputs], out=args.merge_out, period=args.period)
     return handle_merge(merge_args)
 
 
@@ -146,6 +147,25 @@ def build_parser() -> argparse.ArgumentParser:
         description="GST reconciliation processor (Amazon, Retail/Export, Jio, Merge).",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        metavar="JSON",
+        help="Write per-stage timings and memory use to this JSON file",
+        default=None,
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run; writes <output>.prof and a hot-function summary",
+    )
+    parser.add_argument(
+        "--progress-json",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Emit JSON-lines progress events on stdout (or append them to PATH)",
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
     # Amazon
@@ -178,6 +198,11 @@ def build_parser() -> argparse.ArgumentParser:
         help="List of CSV files to merge (default: discovered processed outputs)",
     )
     p_merge.add_argument("--out", type=str, help="Merged CSV path", default=None)
+    p_merge.add_argument(
+        "--period",
+        action="append",
+        help="Keep only this Period, e.g. 31-Jan-2025 (repeatable; default: all)",
+    )
     p_merge.set_defaults(func=handle_merge)
 
     # Run-all
@@ -190,6 +215,7 @@ def build_parser() -> argparse.ArgumentParser:
     p_run_all.add_argument("--jio", type=str, help="Jio CSV path")
     p_run_all.add_argument("--out", type=str, help="Default output for each step", default=None)
     p_run_all.add_argument("--merge-out", type=str, help="Merged CSV path", default=None)
+    p_run_all.add_argument("--period", action="append", help="Keep only this Period in the merged output (repeatable)")
     p_run_all.set_defaults(func=handle_run_all)
 
     return parser
@@ -202,12 +228,16 @@ def build_parser() -> argparse.ArgumentParser:
 def main():
     parser = build_parser()
     args = parser.parse_args()
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, getattr(args, "out", None) or getattr(args, "merge_out", None))
+    set_progress(args.progress_json)
 
     # For run-all, reuse a single output argument for individual steps if provided
     if args.command == "run-all" and getattr(args, "out", None):
         args.out = args.out  # explicit paths already respected by handlers
 
     exit_code = args.func(args)
+    write_metrics("ok" if exit_code == 0 else "error")
     sys.exit(exit_code)
 
 
@@ -0,0 +1,169 @@
+"""
+Query CLI for the local GST sales store (finance_io.sales_store).
+
+Subcommands:
+- load: add unified CSVs (processor or merge outputs) to the store
+- periods: list the stored marketplaces and months
+- query: filter by SKU, marketplace, invoice, type and month range, optionally grouped
+- sql: run a read-only SQL statement against the ``sales`` table
+
+Examples:
+  python gst_sales_store.py load amazon_combined.csv jio_processed.csv
+  python gst_sales_store.py query --sku ABC-123 --type Refund --fy 2025
+  python gst_sales_store.py query --fy 2025 --group-by marketplace Period
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from finance_io import SalesStore, lazy_import, sales_store_path
+
+pd = lazy_import("pandas")
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _fiscal_year(fy: int):
+    """First and last month of an Indian fiscal year: FY2025 is Apr-2024 to Mar-2025."""
+    return f"{fy - 1}-04", f"{fy}-03"
+
+
+def _show(df, started: float, out: Optional[str] = None):
+    """Print df (or write it to out as CSV) with the row count and query time."""
+    elapsed = time.perf_counter() - started
+    if out:
+        df.to_csv(out, index=False)
+        print(f"Wrote {len(df)} row(s) to {out} in {elapsed:.3f}s")
+        return
+    if len(df):
+        with pd.option_context("display.max_columns", None, "display.width", 200):
+            print(df.to_string(index=False))
+    print(f"\n{len(df)} row(s) in {elapsed:.3f}s")
+
+
+# ---------------------------------------------------------------------------
+# Command handlers
+# ---------------------------------------------------------------------------
+
+def handle_load(store: SalesStore, args) -> int:
+    for path in args.files:
+        if not Path(path).exists():
+            print(f"File not found: {path}")
+            return 1
+        started = time.perf_counter()
+        rows = store.load_csv(path, run=args.run)
+        print(f"Loaded {rows} row(s) from {path} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+def handle_periods(store: SalesStore, args) -> int:
+    started = time.perf_counter()
+    _show(store.periods(), started)
+    return 0
+
+
+def handle_query(store: SalesStore, args) -> int:
+    start, end = args.start, args.end
+    if args.fy:
+        start, end = _fiscal_year(args.fy)
+    started = time.perf_counter()
+    try:
+        df = store.query(
+            sku=args.sku,
+            marketplace=args.marketplace,
+            invoice=args.invoice,
+            type=args.type,
+            periods=args.period,
+            start=start,
+            end=end,
+            group_by=args.group_by,
+            limit=args.limit,
+        )
+    except ValueError as exc:
+        print(exc)
+        return 1
+    _show(df, started, args.out)
+    return 0
+
+
+def handle_sql(store: SalesStore, args) -> int:
+    started = time.perf_counter()
+    try:
+        df = store.sql(args.statement)
+    except Exception as exc:
+        print(exc)
+        return 1
+    _show(df, started, args.out)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Load and query unified GST sales rows across months and channels.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Examples:", 1)[1],
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        metavar="PATH",
+        default="",
+        help="SQLite store (default: HRMS_SALES_STORE, else gst_sales.sqlite in the cache directory)",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_load = sub.add_parser("load", help="Add unified CSV outputs to the store")
+    p_load.add_argument("files", nargs="+", help="Processor or merge output CSVs")
+    p_load.add_argument("--run", type=str, help="Run label stored with the rows (default: file name)")
+    p_load.set_defaults(func=handle_load)
+
+    p_periods = sub.add_parser("periods", help="List stored marketplaces and months")
+    p_periods.set_defaults(func=handle_periods)
+
+    p_query = sub.add_parser("query", help="Filter stored rows")
+    p_query.add_argument("--sku", type=str, help="Exact SKU")
+    p_query.add_argument("--marketplace", type=str, help="Exact marketplace, e.g. 'Amazon B2C' or JioMart")
+    p_query.add_argument("--invoice", type=str, help="Exact Invoice Number/CN")
+    p_query.add_argument("--type", type=str, help="Transaction type, e.g. Order or Refund")
+    p_query.add_argument("--period", action="append", help="Month, e.g. 31-Jan-2025 or 2025-01 (repeatable)")
+    p_query.add_argument("--from", dest="start", type=str, metavar="MONTH", help="First month, e.g. 2024-04")
+    p_query.add_argument("--to", dest="end", type=str, metavar="MONTH", help="Last month, e.g. 2025-03")
+    p_query.add_argument("--fy", type=int, metavar="YEAR", help="Fiscal year ending March of YEAR (overrides --from/--to)")
+    p_query.add_argument("--group-by", nargs="+", metavar="COLUMN", help="Count rows and sum amounts per these columns")
+    p_query.add_argument("--limit", type=int, help="Return at most this many rows")
+    p_query.add_argument("--out", type=str, help="Write the result to this CSV instead of printing it")
+    p_query.set_defaults(func=handle_query)
+
+    p_sql = sub.add_parser("sql", help="Run a read-only SQL statement against the sales table")
+    p_sql.add_argument("statement", help='e.g. "SELECT SKU, SUM(Qty) FROM sales GROUP BY SKU"')
+    p_sql.add_argument("--out", type=str, help="Write the result to this CSV instead of printing it")
+    p_sql.set_defaults(func=handle_sql)
+
+    return parser
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+def main():
+    args = build_parser().parse_args()
+    path = sales_store_path(args.store)
+    if args.command != "load" and not path.exists():
+        print(f"No sales store at {path}. Load outputs first with the 'load' command.")
+        sys.exit(1)
+    with SalesStore(path) as store:
+        sys.exit(args.func(store, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Invoice-level GST vs Books Matching
+===================================
+Matches individual GSTR-2B invoices against Zoho Books bills, as a second
+reconciliation level below the (year_month, GSTIN) aggregates produced by
+`combined_gst_book_reconcile.py`.
+
+Matching runs in two stages, both as hash joins (no pairwise comparison):
+  1. Exact: same GSTIN and same normalized invoice number (upper-case,
+     separators removed).
+  2. Fuzzy: for invoices still unmatched, same GSTIN and same numeric core
+     (financial-year tokens, alpha prefixes/suffixes and leading zeros
+     stripped), then filtered by invoice date +/- N days and amount tolerance.
+     A pair with a missing date on either side is never a fuzzy match. Keys
+     shared by too many invoices are skipped, so candidate generation stays
+     bounded.
+
+Invoices and bills without a number cannot be matched; each is listed on
+its own as Only in GST / Only in Books.
+
+Used from `combined_gst_book_reconcile.py --invoice-level`.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+from finance_io import coerce_dates, lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+GST_TAX_COLUMNS = ["integrated_tax", "central_tax", "state_tax", "cess"]
+
+# Financial-year tokens such as 24-25, 2024-25, 2024/2025
+_FY_TOKEN = r"(?<!\d)(?:20)?\d{2}\s*[-/]\s*(?:20)?\d{2}(?!\d)"
+
+MATCH_EXACT = "Exact"
+MATCH_EXACT_VALUE_MISMATCH = "Exact - Value Mismatch"
+MATCH_FUZZY = "Fuzzy"
+ONLY_IN_GST = "Only in GST"
+ONLY_IN_BOOKS = "Only in Books"
+
+OUTPUT_COLUMNS = [
+    "GSTIN_of_supplier",
+    "Match_Status",
+    "gst_invoice_number",
+    "gst_invoice_date",
+    "gst_year_month",
+    "gst_invoice_value",
+    "gst_value",
+    "books_bill_number",
+    "books_bill_date",
+    "books_year_month",
+    "books_value",
+    "books_line_items",
+    "value_difference",
+    "date_difference_days",
+]
+
+
+# =============================================================================
+# NORMALIZATION
+# =============================================================================
+
+def normalize_invoice_numbers(numbers: pd.Series) -> pd.Series:
+    """Upper-case and drop everything except letters and digits."""
+    return (
+        numbers.astype(str)
+        .str.upper()
+        .str.replace(r"[^A-Z0-9]", "", regex=True)
+    )
+
+
+def invoice_core_keys(numbers: pd.Series) -> pd.Series:
+    """
+    Numeric core of each invoice number, used by the fuzzy stage.
+
+    Financial-year tokens are removed, the last run of digits is kept and its
+    leading zeros stripped, so "INV/2024-25/00123", "123" and "A-123-X" share
+    the core "123". Numbers without digits get an empty core.
+    """
+    core = (
+        numbers.astype(str)
+        .str.upper()
+        .str.replace(_FY_TOKEN, " ", regex=True)
+        .str.extract(r"(\d+)\D*$", expand=False)
+        .fillna("")
+        .str.lstrip("0")
+    )
+    return core
+
+
+def _normalize_gstin(gstins: pd.Series) -> pd.Series:
+    return gstins.astype(str).str.strip().str.upper()
+
+
+def _document_numbers(numbers: pd.Series) -> pd.Series:
+    """Stripped invoice / bill numbers as text; missing or blank numbers stay NaN."""
+    text = numbers.astype(object).where(numbers.notna()).astype(str).str.strip()
+    return text.where(numbers.notna() & (text != ""))
+
+
+def _group_documents(rows: pd.DataFrame, number_col: str, aggregations: dict) -> pd.DataFrame:
+    """
+    Aggregate rows per (GSTIN, number); rows without a number are kept one
+    per document instead of being dropped by the groupby.
+    """
+    keys = ["GSTIN_of_supplier", number_col]
+    numbered = rows[rows[number_col].notna()]
+    grouped = numbered.groupby(keys, sort=False).agg(**aggregations).reset_index()
+    unnumbered = rows[rows[number_col].isna()]
+    if unnumbered.empty:
+        return grouped
+    single = pd.DataFrame({col: unnumbered[col] for col in keys})
+    for name, (source, how) in aggregations.items():
+        single[name] = 1 if how == "size" else unnumbered[source]
+    return pd.concat([grouped, single.reset_index(drop=True)], ignore_index=True)
+
+
+# =============================================================================
+# PREPARATION
+# =============================================================================
+
+def _amount(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+
+
+def prepare_gst_invoices(gst_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (GSTIN, invoice number) from cleaned GST B2B rows.
+
+    GSTR-2B repeats an invoice once per tax rate, so the comparable value is
+    taxable value + taxes summed over those rows; the reported invoice value
+    is kept as gst_invoice_value for reference.
+    """
+    value = _amount(gst_df, "taxable_value")
+    for col in GST_TAX_COLUMNS:
+        value = value + _amount(gst_df, col)
+
+    rows = pd.DataFrame(
+        {
+            "GSTIN_of_supplier": _normalize_gstin(gst_df["GSTIN_of_supplier"]),
+            "gst_invoice_number": _document_numbers(gst_df["invoice_number"]),
+            "gst_invoice_date": coerce_dates(gst_df["invoice_date"]),
+            "gst_invoice_value": _amount(gst_df, "invoice_value"),
+            "gst_value": value,
+        }
+    )
+    invoices = _group_documents(
+        rows,
+        "gst_invoice_number",
+        {
+            "gst_invoice_date": ("gst_invoice_date", "min"),
+            "gst_invoice_value": ("gst_invoice_value", "max"),
+            "gst_value": ("gst_value", "sum"),
+        },
+    )
+    invoices["gst_year_month"] = invoices["gst_invoice_date"].dt.strftime("%Y-%m")
+    invoices["gst_value"] = invoices["gst_value"].round(2)
+    return invoices
+
+
+def prepare_book_bills(books_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (GSTIN, bill number) from cleaned Zoho Books line items.
+    Bill value is item total + taxes summed over the bill's lines.
+    """
+    value = _amount(books_df, "item_total")
+    for col in GST_TAX_COLUMNS:
+        value = value + _amount(books_df, col)
+
+    rows = pd.DataFrame(
+        {
+            "GSTIN_of_supplier": _normalize_gstin(books_df["GSTIN_of_supplier"]),
+            "books_bill_number": _document_numbers(books_df["bill_number"]),
+            "books_bill_date": coerce_dates(books_df["bill_date"]),
+            "books_value": value,
+        }
+    )
+    bills = _group_documents(
+        rows,
+        "books_bill_number",
+        {
+            "books_bill_date": ("books_bill_date", "min"),
+            "books_value": ("books_value", "sum"),
+            "books_line_items": ("books_value", "size"),
+        },
+    )
+    bills["books_year_month"] = bills["books_bill_date"].dt.strftime("%Y-%m")
+    bills["books_value"] = bills["books_value"].round(2)
+    return bills
+
+
+# =============================================================================
+# MATCHING
+# =============================================================================
+
+def _add_differences(pairs: pd.DataFrame) -> pd.DataFrame:
+    pairs["value_difference"] = (pairs["gst_value"] - pairs["books_value"]).round(2)
+    pairs["date_difference_days"] = (
+        pairs["gst_invoice_date"] - pairs["books_bill_date"]
+    ).dt.days
+    return pairs
+
+
+def _exact_matches(gst: pd.DataFrame, books: pd.DataFrame) -> pd.DataFrame:
+    """
+    Hash join on (GSTIN, normalized number). Numbers that normalize to the same
+    key within one GSTIN are paired in order of appearance, so the join stays
+    one-to-one.
+    """
+    keys = ["GSTIN_of_supplier", "_norm"]
+    gst = gst.assign(_rank=gst.groupby(keys, sort=False).cumcount())
+    books = books.assign(_rank=books.groupby(keys, sort=False).cumcount())
+    pairs = gst.merge(books, on=keys + ["_rank"], how="inner", suffixes=("", "_books"))
+    return _add_differences(pairs)
+
+
+def _fuzzy_matches(
+    gst: pd.DataFrame,
+    books: pd.DataFrame,
+    amount_tolerance: float,
+    date_window_days: int,
+    max_bucket: int,
+) -> pd.DataFrame:
+    """
+    Hash join on (GSTIN, numeric core), then keep candidates within the date
+    window and amount tolerance and pick one-to-one pairs, best first.
+    """
+    keys = ["GSTIN_of_supplier", "_core"]
+    gst = gst[gst["_core"] != ""]
+    books = books[books["_core"] != ""]
+
+    # Skip keys whose candidate set would explode (e.g. core "1" for a busy supplier)
+    gst_sizes = gst.groupby(keys, sort=False).size().rename("_gst_n")
+    books_sizes = books.groupby(keys, sort=False).size().rename("_books_n")
+    sizes = pd.concat([gst_sizes, books_sizes], axis=1, join="inner")
+    allowed = sizes[sizes["_gst_n"] * sizes["_books_n"] <= max_bucket].index
+    if len(allowed) == 0:
+        return pd.DataFrame()
+    gst = gst.set_index(keys).loc[lambda d: d.index.isin(allowed)].reset_index()
+    books = books.set_index(keys).loc[lambda d: d.index.isin(allowed)].reset_index()
+
+    candidates = _add_differences(gst.merge(books, on=keys, how="inner"))
+    within_amount = candidates["value_difference"].abs() <= amount_tolerance
+    date_gap = candidates["date_difference_days"].abs()
+    # A missing date is unknown, not close: such pairs are never fuzzy matches
+    within_dates = date_gap.notna() & (date_gap <= date_window_days)
+    candidates = candidates[within_amount & within_dates]
+    if candidates.empty:
+        return candidates
+
+    candidates = candidates.assign(
+        _value_gap=candidates["value_difference"].abs(),
+        _date_gap=date_gap[candidates.index],
+    ).sort_values(["_value_gap", "_date_gap"], kind="stable")
+
+    # Greedy one-to-one assignment: each round accepts pairs that are the best
+    # remaining option for both their GST invoice and their bill.
+    accepted = []
+    while not candidates.empty:
+        best = candidates.drop_duplicates("_gst_id").drop_duplicates("_books_id")
+        accepted.append(best)
+        candidates = candidates[
+            ~candidates["_gst_id"].isin(best["_gst_id"])
+            & ~candidates["_books_id"].isin(best["_books_id"])
+        ]
+    return pd.concat(accepted, ignore_index=True)
+
+
+def match_invoices(
+    gst_df: pd.DataFrame,
+    books_df: pd.DataFrame,
+    amount_tolerance: float = 1.0,
+    date_window_days: int = 5,
+    max_bucket: int = 50,
+) -> pd.DataFrame:
+    """
+    Match GSTR-2B invoices to Zoho Books bills.
+
+    Args:
+        gst_df: Cleaned GST B2B rows (GSTIN_of_supplier, invoice_number,
+            invoice_date, invoice_value, taxable_value, taxes).
+        books_df: Cleaned bookkeeping rows (GSTIN_of_supplier, bill_number,
+            bill_date, item_total, taxes).
+        amount_tolerance: Max |GST value - books value| in rupees for a fuzzy
+            match, and for an exact match to count as value-matched.
+        date_window_days: Max days between invoice and bill date for a fuzzy match.
+        max_bucket: Fuzzy keys with more GST x books candidates than this are skipped.
+
+    Returns one row per matched pair and per unmatched invoice/bill, with
+    Match_Status in Exact / Exact - Value Mismatch / Fuzzy / Only in GST /
+    Only in Books.
+    """
+    gst = prepare_gst_invoices(gst_df)
+    books = prepare_book_bills(books_df)
+
+    gst["_gst_id"] = np.arange(len(gst))
+    books["_books_id"] = np.arange(len(books))
+
+    # Documents without a number cannot be joined on it
+    unnumbered_gst = gst[gst["gst_invoice_number"].isna()].assign(Match_Status=ONLY_IN_GST)
+    unnumbered_books = books[books["books_bill_number"].isna()].assign(Match_Status=ONLY_IN_BOOKS)
+    gst = gst[gst["gst_invoice_number"].notna()].copy()
+    books = books[books["books_bill_number"].notna()].copy()
+    gst["_norm"] = normalize_invoice_numbers(gst["gst_invoice_number"])
+    books["_norm"] = normalize_invoice_numbers(books["books_bill_number"])
+
+    exact = _exact_matches(gst, books)
+    exact["Match_Status"] = np.where(
+        exact["value_difference"].abs() <= amount_tolerance,
+        MATCH_EXACT,
+        MATCH_EXACT_VALUE_MISMATCH,
+    )
+
+    rest_gst = gst[~gst["_gst_id"].isin(exact["_gst_id"])].copy()
+    rest_books = books[~books["_books_id"].isin(exact["_books_id"])].copy()
+    rest_gst["_core"] = invoice_core_keys(rest_gst["gst_invoice_number"])
+    rest_books["_core"] = invoice_core_keys(rest_books["books_bill_number"])
+
+    fuzzy = _fuzzy_matches(rest_gst, rest_books, amount_tolerance, date_window_days, max_bucket)
+    if not fuzzy.empty:
+        fuzzy["Match_Status"] = MATCH_FUZZY
+        matched_gst = fuzzy["_gst_id"]
+        matched_books = fuzzy["_books_id"]
+    else:
+        matched_gst = matched_books = pd.Series(dtype="int64")
+
+    only_gst = rest_gst[~rest_gst["_gst_id"].isin(matched_gst)].assign(Match_Status=ONLY_IN_GST)
+    only_books = rest_books[~rest_books["_books_id"].isin(matched_books)].assign(
+        Match_Status=ONLY_IN_BOOKS
+    )
+
+    frames = [
+        f for f in (exact, fuzzy, only_gst, only_books, unnumbered_gst, unnumbered_books) if not f.empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    result = pd.concat(frames, ignore_index=True, sort=False)
+    result = result.reindex(columns=OUTPUT_COLUMNS)
+    result = result.astype({"books_line_items": "Int64", "date_difference_days": "Int64"})
+    return result.sort_values(
+        ["GSTIN_of_supplier", "Match_Status"], kind="stable", ignore_index=True
+    )
+
+
+def summarize_matches(result: pd.DataFrame) -> Tuple[int, int, dict]:
+    """Return (gst_invoices, books_bills, counts per Match_Status)."""
+    counts = result["Match_Status"].value_counts().to_dict()
+    # Counted by value, which every GST invoice / books bill row has even without a number
+    gst_invoices = int(result["gst_value"].notna().sum())
+    books_bills = int(result["books_value"].notna().sum())
+    return gst_invoices, books_bills, counts
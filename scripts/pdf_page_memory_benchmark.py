@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for page-at-a-time PDF table extraction.
+
+Writes a synthetic credit-note-like PDF (a ruled 7-column table on every
+page, no "Total:" row, so every page is parsed) and walks it the way
+`extract_first_table` does: extract_tables() on each page. The walk runs
+twice in fresh processes: once releasing each page's caches
+(finance_io.iter_pages) and once keeping them, as plain ``pdf.pages``
+does. For each mode it prints the RSS after every --step pages and the
+process' peak RSS. ``--engine template`` reads the tables with the
+fixed-layout TableReader instead of pdfplumber's generic finder, so the
+two engines can be timed on the same file.
+
+Usage:
+    python scripts/pdf_page_memory_benchmark.py --pages 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from finance_io import (
+    CREDIT_NOTE_TEMPLATE,
+    TABLE_ENGINES,
+    TableReader,
+    current_rss_mb,
+    iter_pages,
+    open_pdf,
+    peak_rss_mb,
+)
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+COLUMN_WIDTHS = [30, 90, 70, 60, 170, 50, 80]
+ROW_HEIGHT = 18
+
+
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _page_stream(page_no: int, rows: int) -> bytes:
+    """Content stream of one synthetic page: a title, then a ruled table."""
+    ops: List[str] = [
+        "BT /F1 10 Tf 40 800 Td " + _pdf_string(f"Credit Note Number: CN-{page_no:05d}") + " Tj ET",
+        "BT /F1 10 Tf 40 786 Td " + _pdf_string("Credit Note Date: 01/04/2025") + " Tj ET",
+        "0.5 w",
+    ]
+    top = 760
+    header = ["SI No", "Orig Invoice No", "Orig Date", "Category", "Description", "Rate", "Amount"]
+    for r in range(rows + 1):
+        y = top - r * ROW_HEIGHT
+        x = 30
+        cells = header if r == 0 else [
+            str(r),
+            f"DL-2526-{page_no * 100 + r}",
+            "01/03/2025",
+            "998599",
+            f"Fulfilment fee for shipment {page_no}-{r}",
+            "18%",
+            f"INR {r * 12.5 + page_no:,.2f}",
+        ]
+        for width, text in zip(COLUMN_WIDTHS, cells):
+            ops.append(f"{x} {y - ROW_HEIGHT} {width} {ROW_HEIGHT} re S")
+            ops.append(f"BT /F1 7 Tf {x + 2} {y - 12} Td " + _pdf_string(text) + " Tj ET")
+            x += width
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_synthetic_pdf(path: Path, pages: int, rows: int) -> Path:
+    """Write a pages-long PDF with a rows-row ruled table on every page."""
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page_no in range(1, pages + 1):
+        stream = _page_stream(page_no, rows)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, content_id)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+    return Path(path)
+
+
+def walk_pages(path: str, release: bool, step: int, engine: str = "generic") -> Dict:
+    """Run extract_tables() over every page; RSS samples every step pages."""
+    reader = TableReader(CREDIT_NOTE_TEMPLATE if engine == "template" else None)
+    started = time.perf_counter()
+    samples = []
+    tables = 0
+    with open_pdf(path) as pdf:
+        pages = iter_pages(pdf) if release else pdf.pages
+        for number, page in enumerate(pages, 1):
+            tables += len(reader.extract_tables(page))
+            if number % step == 0:
+                samples.append((number, current_rss_mb()))
+    return {
+        "release": release,
+        "tables": tables,
+        "samples": samples,
+        "peak_rss_mb": peak_rss_mb(),
+        "seconds": round(time.perf_counter() - started, 2),
+        "template_pages": reader.pages_by_template,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Peak memory of page-at-a-time PDF table extraction")
+    parser.add_argument("--pages", type=int, default=200, help="Pages in the synthetic PDF (default: 200)")
+    parser.add_argument("--rows", type=int, default=30, help="Table rows per page (default: 30)")
+    parser.add_argument("--step", type=int, default=25, help="Sample RSS every N pages (default: 25)")
+    parser.add_argument("--pdf", type=str, help="Benchmark this PDF instead of a synthetic one")
+    parser.add_argument(
+        "--engine",
+        choices=TABLE_ENGINES,
+        default="generic",
+        help="Table reader to walk the pages with (default: generic)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.pdf:
+            path = Path(args.pdf)
+        else:
+            path = write_synthetic_pdf(Path(tmp) / "synthetic.pdf", args.pages, args.rows)
+            print(f"Synthetic PDF: {args.pages} pages x {args.rows} rows ({path.stat().st_size / 1024:.0f} KB)")
+
+        # Fresh interpreter per mode so the peaks do not mix
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(1, maxtasksperchild=1) as pool:
+            results = [
+                pool.apply(walk_pages, (str(path), release, args.step, args.engine)) for release in (True, False)
+            ]
+
+    for result in results:
+        mode = "iter_pages (release)" if result["release"] else "pdf.pages (keep)"
+        print(f"\n{mode}, {args.engine} tables: {result['tables']} tables in {result['seconds']}s, "
+              f"peak RSS {result['peak_rss_mb']} MB")
+        if args.engine == "template":
+            print(f"   {result['template_pages']} page(s) read by template")
+        for number, rss in result["samples"]:
+            print(f"   after {number:>5} pages  RSS {rss} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,8 +13,6 @@ Usage:
     python process_gst_files.py -i "path/to/file_or_folder" -o "output.xlsx"
 """
 
-import pandas as pd
-import numpy as np
 import re
 import argparse
 import sys
@@ -22,6 +20,35 @@ from pathlib import Path
 from datetime import datetime
 import os
 
+from finance_io import (
+    HeaderCheck,
+    begin_stage,
+    collect_files,
+    end_stage,
+    lazy_import,
+    preview_path,
+    preview_report,
+    preview_rows,
+    run_preflight,
+    set_metrics_path,
+    set_preview_rows,
+    set_progress,
+    start_profile,
+    track,
+    write_metrics,
+)
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+# Worksheet configurations: (sheet_name, header_row_1, header_row_2)
+WORKSHEETS_CONFIG = [
+    ('B2B', 4, 5),           # rows 5 and 6 (0-indexed: 4 and 5)
+    ('B2BA', 5, 6),          # rows 6 and 7 (0-indexed: 5 and 6)
+    ('B2B-CDNR', 4, 5),      # rows 5 and 6 (0-indexed: 4 and 5)
+    ('IMPG', 4, 5),          # rows 5 and 6 (0-indexed: 4 and 5)
+    ('B2B-CDNRA', 5, 6),     # rows 6 and 7 (0-indexed: 5 and 6)
+]
 
 
 def get_file_path(prompt, file_type="file_or_folder"):
@@ -175,10 +202,12 @@ def read_worksheet(file_path, sheet_name, header_row_1, header_row_2):
     """Read worksheet with specified header rows and handle merged cells properly"""
     try:
         # Read raw data without headers to manually process merged cells
+        # (in preview mode only the header rows are needed here)
         raw_data = pd.read_excel(
             file_path, 
             sheet_name=sheet_name, 
-            header=None
+            header=None,
+            nrows=max(header_row_1, header_row_2) + 1 if preview_rows() else None
         )
         
         # Get header rows
@@ -240,7 +269,8 @@ def read_worksheet(file_path, sheet_name, header_row_1, header_row_2):
             file_path, 
             sheet_name=sheet_name, 
             header=None,
-            skiprows=data_start_row
+            skiprows=data_start_row,
+            nrows=preview_rows()
         )
         
         # Set column names
@@ -308,21 +338,14 @@ def process_single_file(file_path):
     
     print(f"✅ Extracted info_data: {info_data.get('GSTIN', 'N/A')} - {info_data.get('Tax Period', 'N/A')}")
     
-    # Define worksheet configurations: (sheet_name, header_row_1, header_row_2)
-    worksheets_config = [
-        ('B2B', 4, 5),           # rows 5 and 6 (0-indexed: 4 and 5)
-        ('B2BA', 5, 6),          # rows 6 and 7 (0-indexed: 5 and 6)
-        ('B2B-CDNR', 4, 5),      # rows 5 and 6 (0-indexed: 4 and 5)
-        ('IMPG', 4, 5),          # rows 5 and 6 (0-indexed: 4 and 5)
-        ('B2B-CDNRA', 5, 6),     # rows 6 and 7 (0-indexed: 5 and 6)
-    ]
-    
     # Dictionary to store combined dataframes for this file
     file_dataframes = {}
     
     # Read each worksheet and combine with info_data
-    for sheet_name, header_row_1, header_row_2 in worksheets_config:
+    for sheet_name, header_row_1, header_row_2 in WORKSHEETS_CONFIG:
+        begin_stage("load", f"{Path(file_path).name} / {sheet_name}")
         df = read_worksheet(file_path, sheet_name, header_row_1, header_row_2)
+        end_stage(rows_out=0 if df is None else len(df))
         
         if df is not None and len(df) > 0:
             # Store original columns (before adding info_data)
@@ -400,17 +423,8 @@ def get_excel_files(input_path, recursive=True):
                 print(f"❌ Error: {input_path} is not an Excel file. Only .xlsx and .xls files are supported.")
             return []
     elif input_path.is_dir():
-        excel_files = []
-        if recursive:
-            # Search recursively in all subdirectories
-            for ext in ['*.xlsx', '*.xls']:
-                excel_files.extend(input_path.rglob(ext))  # rglob for recursive search
-        else:
-            # Search only in the immediate directory
-            for ext in ['*.xlsx', '*.xls']:
-                excel_files.extend(input_path.glob(ext))
-        
-        excel_files = sorted([str(f) for f in excel_files])
+        # Single walk of the folder (and subdirectories when recursive)
+        excel_files = [str(f) for f in collect_files(input_path, ['.xlsx', '.xls'], recursive=recursive)]
         
         if excel_files:
             print(f"\n📂 Searching in folder: {input_path}")
@@ -520,6 +534,13 @@ def process_files(input_path, output_path=None):
     
     print(f"\n📁 Total: {len(excel_files)} Excel file(s) to process")
     
+    # Every file needs its 'Read me' sheet (info_data); drop the ones without it up front
+    problems = run_preflight([HeaderCheck('GSTR-2B', str(f), sheet_name='Read me') for f in excel_files])
+    valid_files = [f for f in excel_files if str(f) not in problems]
+    if not valid_files:
+        print("❌ No valid GST files found. Exiting.")
+        return None
+    
     # Dictionary to store all dataframes by worksheet type
     # Structure: {worksheet_name: [list of dataframes from all files]}
     all_worksheets_data = {
@@ -532,7 +553,7 @@ def process_files(input_path, output_path=None):
     
     # Process each file
     processed_count = 0
-    for file_path in excel_files:
+    for file_path in track(valid_files, 'GST files', item_name=lambda f: Path(f).name):
         file_dataframes = process_single_file(file_path)
         
         if file_dataframes:
@@ -555,11 +576,13 @@ def process_files(input_path, output_path=None):
     
     for sheet_name, df_list in all_worksheets_data.items():
         if df_list:
+            begin_stage("merge", sheet_name, rows_in=sum(len(df) for df in df_list))
             # Align columns across all dataframes
             aligned_dfs = align_columns(df_list)
             
             # Concatenate all dataframes
             combined_df = pd.concat(aligned_dfs, ignore_index=True)
+            end_stage(rows_out=len(combined_df))
             combined_dataframes[sheet_name] = combined_df
             print(f"✅ Combined '{sheet_name}': {len(combined_df)} total rows from {len(df_list)} file(s)")
         else:
@@ -592,6 +615,8 @@ def process_files(input_path, output_path=None):
             if output_path.suffix.lower() != '.xlsx':
                 output_path = output_path.with_suffix('.xlsx')
     
+    output_path = preview_path(output_path)
+    
     # Create output directory if it doesn't exist
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
@@ -601,12 +626,14 @@ def process_files(input_path, output_path=None):
     print(f"{'='*60}")
     
     try:
+        begin_stage("write", rows_in=sum(len(df) for df in combined_dataframes.values()))
         with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
             for sheet_name, df in combined_dataframes.items():
                 # Excel sheet names have a 31 character limit
                 excel_sheet_name = sheet_name[:31] if len(sheet_name) > 31 else sheet_name
                 df.to_excel(writer, sheet_name=excel_sheet_name, index=False)
                 print(f"✅ Exported '{sheet_name}' → {len(df)} rows")
+        end_stage()
         
         print(f"\n{'='*60}")
         print(f"✅ Output file created successfully!")
@@ -619,6 +646,7 @@ def process_files(input_path, output_path=None):
         for sheet_name, df in combined_dataframes.items():
             print(f"  - {sheet_name}: {len(df)} rows")
         
+        preview_report([(f, [sheet for sheet, _, _ in WORKSHEETS_CONFIG]) for f in valid_files], [output_path])
         return str(output_path)
         
     except Exception as e:
@@ -643,8 +671,35 @@ def main():
         '-o', '--output',
         help='Output Excel file path (optional for interactive mode)'
     )
+    parser.add_argument(
+        '--preview',
+        type=int,
+        metavar='N',
+        help='Dry run: read only the first N data rows of each worksheet'
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='JSON',
+        help='Write per-stage timings and memory use to this JSON file'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the run; writes <output>.prof and a hot-function summary'
+    )
+    parser.add_argument(
+        '--progress-json',
+        nargs='?',
+        const='-',
+        metavar='PATH',
+        help='Emit JSON-lines progress events on stdout (or append them to PATH)'
+    )
     
     args = parser.parse_args()
+    set_preview_rows(args.preview)
+    set_metrics_path(args.metrics)
+    start_profile(args.profile, preview_path(args.output))
+    set_progress(args.progress_json)
     
     print("\n" + "="*60)
     print("  GST FILE PROCESSOR")
@@ -655,7 +710,8 @@ def main():
         if not Path(args.input).exists():
             print(f"❌ Error: Input path does not exist: {args.input}")
             sys.exit(1)
-        process_files(args.input, args.output)
+        output_file = process_files(args.input, args.output)
+        write_metrics("ok" if output_file else "error")
         return
     
     # Otherwise, use interactive mode
@@ -0,0 +1,50 @@
+"""
+Shared setup for the finance script tests.
+
+The scripts are run as ``python scripts/<name>.py`` and import finance_io
+from their own directory, so the tests put scripts/ on sys.path the same
+way. Every test gets its own HRMS_CACHE_DIR so nothing touches the user's
+cache (column mappings, invoice index, sales store).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from finance_io import (  # noqa: E402
+    INVOICE_INDEX_ENV,
+    METRICS_ENV,
+    PREVIEW_ENV,
+    PROFILE_ENV,
+    PROGRESS_ENV,
+    SALES_STORE_ENV,
+    STREAM_ENV,
+    TABLE_ENGINE_ENV,
+    WORKER_MAX_RSS_ENV,
+    WORKER_TIMEOUT_ENV,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("HRMS_CACHE_DIR", str(cache))
+    for name in (
+        INVOICE_INDEX_ENV,
+        METRICS_ENV,
+        PREVIEW_ENV,
+        PROFILE_ENV,
+        PROGRESS_ENV,
+        SALES_STORE_ENV,
+        STREAM_ENV,
+        TABLE_ENGINE_ENV,
+        WORKER_MAX_RSS_ENV,
+        WORKER_TIMEOUT_ENV,
+    ):
+        monkeypatch.delenv(name, raising=False)
+    return cache
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from combined_gst_book_reconcile import (
+    DIFFERENCE_COLUMNS,
+    prepare_bookkeeping_data,
+    prepare_gst_data,
+    reconcile_data,
+)
+
+MATCHED = "29AAAAA0000A1Z5"
+GST_ONLY = "27BBBBB1111B1Z6"
+
+
+def _gst():
+    return pd.DataFrame(
+        {
+            "year_month": ["2024-04", "2024-04", "2024-04"],
+            "GSTIN_of_supplier": [MATCHED, MATCHED, GST_ONLY],
+            "invoice_value": ["1,180.00", "590.50", "100"],
+            "taxable_value": [1000.0, 500.0, 100.0],
+            "integrated_tax": [180.0, 90.5, 0.0],
+            "central_tax": [0.0, 0.0, 0.0],
+            "state_tax": [0.0, 0.0, 0.0],
+            "cess": [0.0, 0.0, 0.0],
+        }
+    )
+
+
+def _books():
+    return pd.DataFrame(
+        {
+            "year_month": ["2024-04"],
+            "GSTIN_of_supplier": [MATCHED],
+            "item_total": ["1,500.00"],
+            "integrated_tax": [265.0],
+            "central_tax": [0.0],
+            "state_tax": [0.0],
+            "cess": [0.0],
+        }
+    )
+
+
+def _reconcile(tolerance=None):
+    return reconcile_data(prepare_gst_data(_gst()), prepare_bookkeeping_data(_books()), tolerance=tolerance)
+
+
+def test_amounts_and_differences_stay_numeric():
+    result = _reconcile()
+
+    for name, gst_col, books_col in DIFFERENCE_COLUMNS:
+        for col in (name, gst_col, books_col):
+            assert pd.api.types.is_float_dtype(result[col]), col
+
+    matched = result[result["Match_Flag"] == "GST Match"].iloc[0]
+    assert matched["gst_invoice_value"] == pytest.approx(1770.5)
+    assert matched["books_invoice_value"] == pytest.approx(1765.0)
+    assert matched["invoice_value_difference"] == pytest.approx(5.5)
+    assert matched["integrated_tax_difference"] == pytest.approx(5.5)
+
+
+def test_unmatched_gstin_has_zero_differences_and_na_keys():
+    result = _reconcile()
+
+    unmatched = result[result["Match_Flag"] == "No GST Match"].iloc[0]
+    assert unmatched["books_GSTIN_of_supplier"] == "NA"
+    assert unmatched["books_invoice_value"] == 0.0
+    assert all(unmatched[name] == 0.0 for name, _, _ in DIFFERENCE_COLUMNS)
+
+
+def test_tolerance_flag():
+    assert "Tolerance_Flag" not in _reconcile().columns
+
+    loose = _reconcile(tolerance=10).set_index("gst_GSTIN_of_supplier")["Tolerance_Flag"]
+    assert loose.to_dict() == {MATCHED: "Within Tolerance", GST_ONLY: "No GST Match"}
+
+    strict = _reconcile(tolerance=1).set_index("gst_GSTIN_of_supplier")["Tolerance_Flag"]
+    assert strict[MATCHED] == "Above Tolerance"
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+from finance_io import (
+    CREDIT_NOTE,
+    OTHER,
+    TAX_INVOICE,
+    DocumentTypeMismatch,
+    classify_pdf,
+    classify_text,
+    expect_document,
+    open_pdf,
+)
+
+INVOICE_TEXT = "Tax Invoice Invoice Number: IN-0001 Invoice Date: 01/04/2025"
+CREDIT_NOTE_TEXT = "Credit Note Number: CN-0001 Credit Note Date: 01/04/2025 Invoice Number: IN-0001"
+ADVICE_TEXT = "Payment Advice Invoice Number IN-0001 Invoice Date 01/04/2025"
+# Labels drawn out of reading order: nothing matches in content-stream order
+SCRAMBLED_TEXT = "Number: IN-0001 Invoice Date: 01/04/2025 Invoice"
+
+
+def _page(text):
+    return SimpleNamespace(chars=[{"text": c} for c in text])
+
+
+def _pdf(path, runs):
+    """One-page PDF drawing each (x, y, text) run in the order given."""
+    stream = "\n".join(f"BT /F1 10 Tf {x} {y} Td ({text}) Tj ET" for x, y, text in runs).encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+        b"/Contents 5 0 R >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def test_classify_text():
+    assert classify_text(INVOICE_TEXT) == TAX_INVOICE
+    assert classify_text(CREDIT_NOTE_TEXT) == CREDIT_NOTE
+    assert classify_text(ADVICE_TEXT) == OTHER
+    assert classify_text(SCRAMBLED_TEXT) == OTHER
+
+
+def test_expect_document_rejects_a_positive_match_of_another_kind():
+    with pytest.raises(DocumentTypeMismatch, match="credit note"):
+        expect_document(_page(CREDIT_NOTE_TEXT), TAX_INVOICE)
+    with pytest.raises(DocumentTypeMismatch, match="other document"):
+        expect_document(_page(ADVICE_TEXT), TAX_INVOICE)
+    with pytest.raises(DocumentTypeMismatch, match="other document"):
+        expect_document(_page(ADVICE_TEXT), CREDIT_NOTE)
+
+
+def test_expect_document_lets_unrecognised_pages_through():
+    expect_document(_page(INVOICE_TEXT), TAX_INVOICE)
+    expect_document(_page(CREDIT_NOTE_TEXT), CREDIT_NOTE)
+    expect_document(_page(SCRAMBLED_TEXT), TAX_INVOICE)
+    expect_document(_page(SCRAMBLED_TEXT), CREDIT_NOTE)
+    # an invoice signature can be a credit note whose own labels were scrambled
+    expect_document(_page(INVOICE_TEXT), CREDIT_NOTE)
+
+
+def test_invoice_pdf_drawn_out_of_reading_order_is_accepted(tmp_path):
+    pytest.importorskip("pdfplumber")
+    # Reads "Invoice Number: ... Invoice Date: ..." top to bottom, but the
+    # label words are drawn in another order
+    path = _pdf(
+        tmp_path / "invoice.pdf",
+        [
+            (90, 800, "Number: IN-0001"),
+            (40, 786, "Invoice Date: 01/04/2025"),
+            (40, 800, "Invoice"),
+        ],
+    )
+
+    assert classify_pdf(path) == OTHER
+    with open_pdf(path) as pdf:
+        expect_document(pdf.pages[0], TAX_INVOICE)
+        assert "Invoice Number: IN-0001" in pdf.pages[0].extract_text()
+
+
+def test_credit_note_pdf_is_rejected_by_the_invoice_extractor(tmp_path):
+    pytest.importorskip("pdfplumber")
+    path = _pdf(
+        tmp_path / "credit_note.pdf",
+        [(40, 800, "Credit Note Number: CN-0001"), (40, 786, "Credit Note Date: 01/04/2025")],
+    )
+
+    assert classify_pdf(path) == CREDIT_NOTE
+    with open_pdf(path) as pdf:
+        with pytest.raises(DocumentTypeMismatch):
+            expect_document(pdf.pages[0], TAX_INVOICE)
@@ -0,0 +1,269 @@
+import os
+
+import pandas as pd
+import pytest
+
+import gst_reconcile
+from finance_io import CSV_ENGINE_ENV, RETAIL_LAYOUTS, HeaderCheck, check_header, sniff_header
+from gst_reconcile import (
+    collect_amazon_months,
+    process_amazon_batch,
+    process_amazon_files,
+    process_jio_file,
+    process_retail_export,
+)
+
+
+def amazon_frame(kind, month=1, rows=4):
+    """Minimal MTR B2B ("mtr"), B2C ("b2c") or Stock Transfer ("stock") export for one month."""
+    dates = [f"2025-{month:02d}-{day + 1:02d} 10:00:00" for day in range(rows)]
+    frame = pd.DataFrame(
+        {
+            "Invoice Number": [f"{kind.upper()}-{month}-{i}" for i in range(rows)],
+            "Invoice Date": dates,
+            "Transaction Type": ["Shipment"] * (rows - 1) + ["Refund"],
+            "Igst Rate": 0.18,
+            "Ship To State": "DELHI",
+            "Credit Note Date": dates,
+            "Credit Note No": [""] * (rows - 1) + [f"CN-{kind}-{month}"],
+            "Sku": "SKU-1",
+            "Quantity": 1,
+        }
+    )
+    if kind == "stock":
+        frame["Taxable Value"] = 100.0
+        frame["Gstin Of Supplier"] = "29AAAAA0000A1Z5"
+        frame["Gstin Of Receiver"] = "07AAAAA0000A1Z5"
+        frame["Hsn Code"] = "0012"
+    else:
+        frame["Principal Amount Basis"] = 100.0
+        frame["Seller Gstin"] = "29AAAAA0000A1Z5"
+        frame["Hsn/sac"] = "0012"
+    return frame
+
+
+def write_amazon(folder, month=1, drop=None, names=None):
+    """Write the three Amazon exports for month; returns their paths (mtr, b2c, stock)."""
+    names = names or {"mtr": "MTR_B2B-{}.csv", "b2c": "MTR_B2C-{}.csv", "stock": "MTR_STOCK_TRANSFER-{}.csv"}
+    paths = []
+    for kind in ("mtr", "b2c", "stock"):
+        frame = amazon_frame(kind, month)
+        if drop and kind in drop:
+            frame = frame.drop(columns=drop[kind])
+        path = folder / names[kind].format(month)
+        frame.to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_amazon_optional_columns_default_instead_of_failing_preflight(tmp_path):
+    mtr, b2c, stock = write_amazon(
+        tmp_path,
+        drop={
+            "mtr": ["Transaction Type", "Principal Amount Basis", "Invoice Date"],
+            "b2c": ["Transaction Type", "Principal Amount Basis"],
+            "stock": ["Taxable Value", "Invoice Date"],
+        },
+    )
+    out = tmp_path / "amazon.csv"
+
+    ok, msg = process_amazon_files(mtr, b2c, stock, str(out))
+
+    assert ok, msg
+    result = pd.read_csv(out)
+    b2b = result[result["marketplace"] == "Amazon B2B"]
+    assert len(b2b) == 4
+    assert (b2b["Taxable Value"] == 0).all()
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_amazon_output_keeps_zero_padded_hsn_on_either_engine(tmp_path, monkeypatch, engine):
+    monkeypatch.setenv(CSV_ENGINE_ENV, engine)
+    out = tmp_path / "amazon.csv"
+
+    ok, msg = process_amazon_files(*write_amazon(tmp_path), str(out))
+
+    assert ok, msg
+    assert set(pd.read_csv(out, dtype=str)["HSN"]) == {"0012"}
+
+
+def test_amazon_preflight_rejects_a_column_the_processor_needs(tmp_path):
+    mtr, b2c, stock = write_amazon(tmp_path, drop={"mtr": ["Ship To State"], "stock": ["Gstin Of Receiver"]})
+
+    ok, msg = process_amazon_files(mtr, b2c, stock, str(tmp_path / "amazon.csv"))
+
+    assert not ok
+    assert msg.startswith("Pre-flight check failed")
+    assert "'Ship To State'" in msg and "'Gstin Of Receiver'" in msg
+    assert not (tmp_path / "amazon.csv").exists()
+
+
+def test_jio_needs_only_the_invoice_id(tmp_path):
+    path = tmp_path / "jio.csv"
+    pd.DataFrame({"Buyer Invoice ID": ["J1", "J1", "J2"], "Customer's Delivery State": "GOA"}).to_csv(path, index=False)
+
+    ok, msg = process_jio_file(str(path), str(tmp_path / "jio_out.csv"))
+    assert ok, msg
+
+    pd.DataFrame({"Buyer Invoice Date": ["2025-01-03"]}).to_csv(path, index=False)
+    ok, msg = process_jio_file(str(path), str(tmp_path / "jio_out.csv"))
+    assert not ok
+    assert "'Buyer Invoice ID'" in msg
+
+
+def test_header_check_with_columns_does_not_open_the_file(tmp_path):
+    missing_file = tmp_path / "never_written.xlsx"
+
+    assert check_header(HeaderCheck("Invoice", str(missing_file), ["Invoice Number"], columns=["Invoice Number"])) is None
+    problem = check_header(HeaderCheck("Invoice", str(missing_file), ["Invoice Number"], columns=["Invoice No"]))
+    assert "missing 1 required column" in problem
+
+
+def _retail_workbook(path, key, rows, linked=None):
+    """Retail export with two title rows above the header, as Zoho writes it; linked columns come first."""
+    header = (linked or []) + [key, "Customer Name", "Item Price", "Quantity", "IGST Rate %"]
+    data = [["Sales export"] + [None] * (len(header) - 1), [None] * len(header), header] + rows
+    pd.DataFrame(data).to_excel(path, header=False, index=False)
+    return str(path)
+
+
+def test_retail_workbooks_are_opened_once(tmp_path, monkeypatch):
+    invoice = _retail_workbook(tmp_path / "invoice.xlsx", "Invoice Number", [["INV-1", "Shop", 100, 2, 18]])
+    credit = _retail_workbook(tmp_path / "credit.xlsx", "Credit Note Number", [["CN-1", "Shop", 50, 1, 18]])
+    opened = []
+    excel_file = pd.ExcelFile
+
+    def counting_excel_file(path, *args, **kwargs):
+        opened.append(str(path))
+        return excel_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "ExcelFile", counting_excel_file)
+    monkeypatch.setattr(pd, "read_excel", pytest.fail)
+
+    ok, msg = process_retail_export(invoice, credit, str(tmp_path / "retail.csv"))
+
+    assert ok, msg
+    assert sorted(opened) == sorted([invoice, credit])
+    result = pd.read_csv(tmp_path / "retail.csv")
+    assert result["Taxable Value"].tolist() == [200.0, -50.0]
+
+
+def test_credit_export_with_the_linked_invoice_number_first_is_accepted(tmp_path):
+    invoice = _retail_workbook(tmp_path / "invoice.xlsx", "Invoice Number", [["INV-1", "Shop", 100, 2, 18]])
+    credit = _retail_workbook(
+        tmp_path / "credit.xlsx", "Credit Note Number", [["INV-1", "CN-1", "Shop", 50, 1, 18]], linked=["Invoice Number"]
+    )
+
+    ok, msg = process_retail_export(invoice, credit, str(tmp_path / "retail.csv"))
+
+    assert ok, msg
+    assert pd.read_csv(tmp_path / "retail.csv")["Taxable Value"].tolist() == [200.0, -50.0]
+
+
+def test_retail_files_given_the_wrong_way_round_are_rejected(tmp_path):
+    invoice = _retail_workbook(tmp_path / "invoice.xlsx", "Invoice Number", [["INV-1", "Shop", 100, 2, 18]])
+    credit = _retail_workbook(tmp_path / "credit.xlsx", "Credit Note Number", [["CN-1", "Shop", 50, 1, 18]])
+
+    ok, msg = process_retail_export(invoice, invoice, str(tmp_path / "retail.csv"))
+    assert not ok
+    assert msg == "Invalid Credit structure (this looks like the invoice file)."
+
+    ok, msg = process_retail_export(credit, credit, str(tmp_path / "retail.csv"))
+    assert not ok
+    assert msg == "Invalid Invoice structure (this looks like the credit file)."
+
+
+def test_sniff_header_prefers_the_expected_layout():
+    preview = pd.DataFrame([["Credit notes", None], ["Invoice Number", " Credit Note Number "], ["INV-1", "CN-1"]])
+
+    assert sniff_header(preview, RETAIL_LAYOUTS) == ("invoice", 1)
+    assert sniff_header(preview, RETAIL_LAYOUTS, expected="credit") == ("credit", 1)
+    assert sniff_header(preview.iloc[:, :1], RETAIL_LAYOUTS, expected="credit") == ("invoice", 1)
+    assert sniff_header(preview.iloc[:1], RETAIL_LAYOUTS, expected="credit") == (None, None)
+
+
+def test_required_column_lists_match_what_the_processors_need():
+    assert gst_reconcile.AMAZON_MTR_REQUIRED_COLUMNS == ["Ship To State"]
+    for columns, required in (
+        (gst_reconcile.AMAZON_MTR_COLUMNS, gst_reconcile.AMAZON_MTR_REQUIRED_COLUMNS),
+        (gst_reconcile.AMAZON_B2C_COLUMNS, gst_reconcile.AMAZON_B2C_REQUIRED_COLUMNS),
+        (gst_reconcile.AMAZON_STOCK_COLUMNS, gst_reconcile.AMAZON_STOCK_REQUIRED_COLUMNS),
+        (gst_reconcile.JIO_COLUMNS, gst_reconcile.JIO_REQUIRED_COLUMNS),
+    ):
+        assert set(required) <= set(columns)
+        assert len(columns) == len(set(columns))
+    # still read, now optional
+    assert {"Transaction Type", "Principal Amount Basis", "Invoice Date"} <= set(gst_reconcile.AMAZON_MTR_COLUMNS)
+
+
+def test_collect_amazon_months_groups_files_and_skips_incomplete_months(tmp_path):
+    # month from the first Invoice Date; the name carries none
+    january = write_amazon(tmp_path, month=1)
+    # the month in the file name wins over the dates inside
+    names = {"mtr": "MTR_B2B-MARCH-2025.csv", "b2c": "MTR_B2C-MAR_2025.csv", "stock": "MTR_STOCK_TRANSFER-Mar 2025.csv"}
+    march = write_amazon(tmp_path, month=2, names=names)
+    write_amazon(tmp_path, month=4)
+    (tmp_path / "MTR_STOCK_TRANSFER-4.csv").unlink()
+    amazon_frame("mtr", 5).to_csv(tmp_path / "MTR_B2B-5.csv", index=False)
+    amazon_frame("mtr", 5).to_csv(tmp_path / "MTR_B2B-5-copy.csv", index=False)
+    pd.DataFrame({"x": [1]}).to_csv(tmp_path / "notes.csv", index=False)
+
+    months, problems = collect_amazon_months([str(tmp_path)])
+
+    assert list(months) == [pd.Period("2025-01", "M"), pd.Period("2025-03", "M")]
+    assert months[pd.Period("2025-01", "M")] == dict(zip(("mtr", "b2c", "stock"), january))
+    assert months[pd.Period("2025-03", "M")] == dict(zip(("mtr", "b2c", "stock"), march))
+    assert problems[0].endswith("notes.csv: not an MTR_B2B-, MTR_B2C- or MTR_STOCK_TRANSFER- file; ignored")
+    assert problems[1:] == [
+        "30-Apr-2025: no stock file; month skipped",
+        "31-May-2025: no b2c file; no stock file; 2 mtr files; month skipped",
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_amazon_batch_writes_one_file_per_month(tmp_path, workers):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    for month in (2, 1):
+        write_amazon(exports, month)
+    out = tmp_path / "out"
+
+    ok, msg, outputs = process_amazon_batch([str(exports)], str(out), workers=workers)
+
+    assert ok, msg
+    assert outputs == [str(out / "amazon_31-Jan-2025.csv"), str(out / "amazon_28-Feb-2025.csv")]
+    for path, period in zip(outputs, ("31-Jan-2025", "28-Feb-2025")):
+        frame = pd.read_csv(path)
+        assert len(frame) == 12
+        assert set(frame["Period"]) == {period}
+
+
+def test_amazon_batch_consolidates_months_in_calendar_order(tmp_path):
+    for month in (3, 1, 2):
+        write_amazon(tmp_path, month)
+    save_path = tmp_path / "amazon_q4.csv"
+
+    ok, msg, outputs = process_amazon_batch([str(tmp_path / "MTR_*.csv")], str(save_path), workers=2, consolidate=True)
+
+    assert ok, msg
+    assert outputs == [str(save_path)]
+    frame = pd.read_csv(save_path)
+    assert len(frame) == 36
+    assert frame["Period"].drop_duplicates().tolist() == ["31-Jan-2025", "28-Feb-2025", "31-Mar-2025"]
+    # the per-month scratch folder is removed
+    assert sorted(os.listdir(tmp_path)) == sorted([save_path.name] + [p.name for p in tmp_path.glob("MTR_*.csv")])
+
+
+def test_amazon_batch_reports_a_failed_month_and_skips_consolidation(tmp_path):
+    write_amazon(tmp_path, month=1)
+    write_amazon(tmp_path, month=2, drop={"mtr": ["Ship To State"]})
+    save_path = tmp_path / "amazon.csv"
+
+    ok, msg, outputs = process_amazon_batch([str(tmp_path)], str(save_path), workers=1, consolidate=True)
+
+    assert not ok
+    assert outputs == []
+    assert not save_path.exists()
+    assert "28-Feb-2025: Pre-flight check failed" in msg
+    assert msg.endswith("1 of 2 month(s) failed: 28-Feb-2025")
+    assert not list(tmp_path.glob("*.months"))
@@ -0,0 +1,63 @@
+"""
+Import-time budget for the CLI entry points.
+
+Every script is spawned for --help, argument errors and each call from the
+Next.js routes, so importing it must stay cheap: pandas, numpy, pdfplumber
+and openpyxl are bound with lazy_import and load only when work starts.
+Each script is imported in a fresh ``python -X importtime`` process; the
+test fails when one of them executes a heavy library at import or its
+cumulative import time exceeds IMPORT_BUDGET_S.
+"""
+
+import re
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS_DIR
+
+# pandas alone takes ~0.5s; the scripts take ~0.05-0.08s without it
+IMPORT_BUDGET_S = 0.3
+HEAVY_MODULES = ("pandas", "numpy", "pdfplumber", "openpyxl")
+
+ENTRY_POINTS = sorted(
+    path.stem for path in SCRIPTS_DIR.glob("*.py") if re.search(r"^if __name__ == .__main__.:", path.read_text(), re.M)
+)
+_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$")
+
+
+def _import_times(module):
+    """Cumulative import time in microseconds of each module loaded by `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            times.setdefault(match.group(2), int(match.group(1)))
+    return times
+
+
+def test_entry_points_are_found():
+    assert {"gst_reconcile", "amazon_tax_invoice_extractor", "gst_sales_store"} <= set(ENTRY_POINTS)
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_import_stays_within_budget(module):
+    times = _import_times(module)
+
+    assert not [name for name in HEAVY_MODULES if name in times], f"{module} imports a heavy library eagerly"
+    # best of three, so a busy machine does not fail the budget on one slow spawn
+    best = times[module]
+    for _ in range(2):
+        if best <= IMPORT_BUDGET_S * 1e6:
+            break
+        best = min(best, _import_times(module)[module])
+    best /= 1e6
+    assert best <= IMPORT_BUDGET_S, f"importing {module} took {best:.3f}s (budget {IMPORT_BUDGET_S}s)"
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from finance_io import CSV_ENGINE_ENV, CsvSchema, read_csv_typed, read_table
+from finance_io.loaders import BOOKS_DTYPES
+
+pytest.importorskip("pyarrow")
+
+ENGINES = ["c", "pyarrow"]
+
+
+@pytest.fixture
+def zero_padded(tmp_path):
+    path = tmp_path / "ids.csv"
+    path.write_text(
+        "Invoice Number,Hsn Code,Taxable Value,Irn Number,Bill Number\n"
+        "000123,0012,10,,0042\n"
+        "000124,,5,,0043\n"
+    )
+    return path
+
+
+def test_zero_padded_ids_read_the_same_on_both_engines(zero_padded):
+    schema = CsvSchema(text=["Invoice Number", "Hsn Code"], numbers=["Taxable Value"])
+
+    c, arrow = (read_csv_typed(zero_padded, schema, engine=engine) for engine in ENGINES)
+
+    assert c["Invoice Number"].tolist() == ["000123", "000124"]
+    assert c["Hsn Code"].iloc[0] == "0012" and pd.isna(c["Hsn Code"].iloc[1])
+    pd.testing.assert_frame_equal(arrow, c)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_dtype_columns_keep_leading_zeros(zero_padded, monkeypatch, engine):
+    monkeypatch.setenv(CSV_ENGINE_ENV, engine)
+
+    books = read_table(zero_padded, usecols=["Bill Number", "Invoice Number"], dtype=BOOKS_DTYPES)
+
+    assert list(books.columns) == ["Invoice Number", "Bill Number"]
+    assert books["Bill Number"].tolist() == ["0042", "0043"]
+    assert books["Invoice Number"].tolist() == [123, 124]
+
+
+def test_options_the_pyarrow_reader_lacks_fall_back_to_the_c_parser(zero_padded):
+    schema = CsvSchema(text=["Invoice Number"])
+
+    df = read_csv_typed(zero_padded, schema, engine="pyarrow", na_values={"Bill Number": ["0042"]})
+
+    assert df["Invoice Number"].tolist() == ["000123", "000124"]
+    assert df["Bill Number"].isna().tolist() == [True, False]
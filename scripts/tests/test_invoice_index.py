@@ -0,0 +1,107 @@
+from finance_io import InvoiceIndex, invoice_index_path
+
+
+def _pdf(folder, name, content):
+    path = folder / name
+    path.write_bytes(content)
+    return path
+
+
+def _run(db, batch, documents):
+    """One extractor run: check then add every (number, pdf), commit; returns the duplicate rows and writes."""
+    with InvoiceIndex(db, "Tax Invoice", batch=batch) as index:
+        duplicates = []
+        for number, pdf in documents:
+            duplicate = index.check(number, pdf)
+            if duplicate:
+                duplicates.append(duplicate)
+            index.add(number, pdf, line_items=1, total=100.0)
+        return duplicates, index.commit()
+
+
+def test_re_extracting_the_same_folder_is_not_a_duplicate(tmp_path):
+    db = tmp_path / "index.sqlite"
+    first = _pdf(tmp_path, "a.pdf", b"invoice A")
+    second = _pdf(tmp_path, "b.pdf", b"invoice B")
+
+    assert _run(db, "run1.xlsx", [("INV-1", first), ("INV-2", second)]) == ([], 2)
+    assert _run(db, "run2.xlsx", [("INV-1", first), ("INV-2", second)]) == ([], 0)
+
+    with InvoiceIndex(db, "Tax Invoice") as index:
+        assert len(index.search("INV-")) == 2
+
+
+def test_a_different_pdf_with_the_same_number_is_flagged(tmp_path):
+    db = tmp_path / "index.sqlite"
+    original = _pdf(tmp_path, "a.pdf", b"invoice A")
+    _run(db, "run1.xlsx", [("INV-1", original)])
+
+    clash = _pdf(tmp_path, "a_copy_edited.pdf", b"invoice A, edited")
+    duplicates, written = _run(db, "run2.xlsx", [("INV-1", clash)])
+
+    assert written == 1
+    assert len(duplicates) == 1
+    assert duplicates[0]["Source File"] == "a_copy_edited.pdf"
+    assert duplicates[0]["Duplicate Of"] == "a.pdf"
+    assert duplicates[0]["Previous Batch"] == "run1.xlsx"
+    assert duplicates[0]["Same Content"] == "No"
+
+
+def test_a_copy_under_another_name_is_flagged_in_the_same_batch(tmp_path):
+    db = tmp_path / "index.sqlite"
+    original = _pdf(tmp_path, "a.pdf", b"invoice A")
+    copy = _pdf(tmp_path, "a (1).pdf", b"invoice A")
+
+    duplicates, written = _run(db, "run1.xlsx", [("INV-1", original), ("INV-1", copy)])
+
+    assert [(d["Source File"], d["Duplicate Of"], d["Same Content"]) for d in duplicates] == [
+        ("a (1).pdf", "a.pdf", "Yes")
+    ]
+    assert written == 2
+
+
+def test_a_copy_re_uploaded_in_a_later_batch_is_flagged(tmp_path):
+    db = tmp_path / "index.sqlite"
+    _run(db, "run1.xlsx", [("INV-1", _pdf(tmp_path, "a.pdf", b"invoice A"))])
+
+    reupload = _pdf(tmp_path, "re-upload.pdf", b"invoice A")
+    duplicates, _ = _run(db, "run2.xlsx", [("INV-1", reupload)])
+
+    assert len(duplicates) == 1
+    assert duplicates[0]["Duplicate Of"] == "a.pdf"
+    assert duplicates[0]["Previous Batch"] == "run1.xlsx"
+    assert duplicates[0]["Same Content"] == "Yes"
+    # re-running that batch reports the copy again, but does not index it twice
+    duplicates, written = _run(db, "run3.xlsx", [("INV-1", reupload)])
+    assert [d["Duplicate Of"] for d in duplicates] == ["a.pdf"]
+    assert written == 0
+
+
+def test_duplicates_within_one_run(tmp_path):
+    db = tmp_path / "index.sqlite"
+    first = _pdf(tmp_path, "a.pdf", b"invoice A")
+    other = _pdf(tmp_path, "b.pdf", b"invoice B")
+
+    duplicates, written = _run(db, "run1.xlsx", [("INV-1", first), ("INV-1", first), ("INV-1", other)])
+
+    assert [d["Source File"] for d in duplicates] == ["b.pdf"]
+    assert duplicates[0]["Previous Batch"] == "run1.xlsx"
+    assert written == 2
+
+
+def test_nothing_is_written_without_commit(tmp_path):
+    db = tmp_path / "index.sqlite"
+    pdf = _pdf(tmp_path, "a.pdf", b"invoice A")
+
+    with InvoiceIndex(db, "Tax Invoice") as index:
+        index.add("INV-1", pdf)
+
+    with InvoiceIndex(db, "Tax Invoice") as index:
+        assert index.lookup("INV-1") is None
+
+
+def test_invoice_index_path(monkeypatch, isolated_cache):
+    assert invoice_index_path() == isolated_cache / "invoice_index.sqlite"
+    assert invoice_index_path("off") is None
+    monkeypatch.setenv("HRMS_INVOICE_INDEX", "no")
+    assert invoice_index_path() is None
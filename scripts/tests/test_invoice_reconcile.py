@@ -0,0 +1,119 @@
+import pandas as pd
+
+from finance_io import coerce_dates, load_cleaned_books
+from invoice_reconcile import (
+    MATCH_EXACT,
+    MATCH_FUZZY,
+    ONLY_IN_BOOKS,
+    ONLY_IN_GST,
+    match_invoices,
+    summarize_matches,
+)
+
+GSTIN = "29AAAAA0000A1Z5"
+
+
+def _gst(rows):
+    return pd.DataFrame(
+        [
+            {
+                "GSTIN_of_supplier": GSTIN,
+                "invoice_number": number,
+                "invoice_date": date,
+                "invoice_value": value,
+                "taxable_value": value,
+                "integrated_tax": 0.0,
+                "central_tax": 0.0,
+                "state_tax": 0.0,
+                "cess": 0.0,
+            }
+            for number, date, value in rows
+        ]
+    )
+
+
+def _books(rows):
+    return pd.DataFrame(
+        [
+            {
+                "GSTIN_of_supplier": GSTIN,
+                "bill_number": number,
+                "bill_date": date,
+                "item_total": value,
+                "integrated_tax": 0.0,
+                "central_tax": 0.0,
+                "state_tax": 0.0,
+                "cess": 0.0,
+            }
+            for number, date, value in rows
+        ]
+    )
+
+
+def _status(result, number_col, number):
+    return result.loc[result[number_col] == number, "Match_Status"].tolist()
+
+
+def test_coerce_dates_reads_iso_and_day_first_text():
+    parsed = coerce_dates(pd.Series(["2024-04-03", "2024-04-26 00:00:00", "03/04/2024", "26/04/2024", "junk"]))
+
+    assert parsed.dt.strftime("%Y-%m-%d").tolist()[:4] == ["2024-04-03", "2024-04-26", "2024-04-03", "2024-04-26"]
+    assert pd.isna(parsed.iloc[4])
+
+
+def test_coerce_dates_leaves_datetime_columns_alone():
+    dates = pd.Series(pd.to_datetime(["2024-04-03", "2024-12-01"]))
+
+    assert coerce_dates(dates) is dates
+
+
+def test_cleaned_books_dates_are_parsed_even_with_year_month(tmp_path):
+    path = tmp_path / "books_clean.csv"
+    pd.DataFrame(
+        {
+            "bill_date": ["2024-04-03", "2024-04-26"],
+            "year_month": ["2024-04", "2024-04"],
+            "bill_number": ["B1", "B2"],
+            "GSTIN_of_supplier": [GSTIN, GSTIN],
+        }
+    ).to_csv(path, index=False)
+
+    books = load_cleaned_books(path)
+
+    assert books["bill_date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-04-03", "2024-04-26"]
+
+
+def test_iso_bill_dates_from_cleaned_books_still_fuzzy_match():
+    gst = _gst([("INV/24-25/0026", "26/04/2024", 500.0)])
+    books = _books([("26", "2024-04-26", 500.0)])
+
+    result = match_invoices(gst, books)
+
+    assert _status(result, "gst_invoice_number", "INV/24-25/0026") == [MATCH_FUZZY]
+    assert result["date_difference_days"].tolist() == [0]
+
+
+def test_missing_date_is_not_within_the_window():
+    gst = _gst([("INV-0042", "10/04/2024", 100.0)])
+    books = _books([("42", None, 100.0)])
+
+    result = match_invoices(gst, books)
+
+    assert _status(result, "gst_invoice_number", "INV-0042") == [ONLY_IN_GST]
+    assert _status(result, "books_bill_number", "42") == [ONLY_IN_BOOKS]
+
+
+def test_invoices_without_a_number_are_listed_unmatched():
+    gst = _gst([("A1", "01/04/2024", 100.0), (None, "02/04/2024", 50.0), (float("nan"), "03/04/2024", 70.0)])
+    books = _books([("A1", "2024-04-01", 100.0), (None, "2024-04-02", 50.0)])
+
+    result = match_invoices(gst, books)
+
+    assert _status(result, "gst_invoice_number", "A1") == [MATCH_EXACT]
+    unnumbered_gst = result[result["Match_Status"] == ONLY_IN_GST]
+    assert sorted(unnumbered_gst["gst_value"]) == [50.0, 70.0]
+    assert (result["Match_Status"] == ONLY_IN_BOOKS).sum() == 1
+
+    gst_invoices, books_bills, counts = summarize_matches(result)
+    assert (gst_invoices, books_bills) == (3, 2)
+    assert counts == {MATCH_EXACT: 1, ONLY_IN_GST: 2, ONLY_IN_BOOKS: 1}
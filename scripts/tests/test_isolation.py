@@ -0,0 +1,79 @@
+import os
+import time
+
+import pytest
+
+from finance_io import IsolatedWorker, WorkerLimitExceeded, worker_limits
+
+
+def slow(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def hog(mb):
+    block = bytearray(b"\1") * (mb * 1024 * 1024)
+    time.sleep(2)
+    return len(block)
+
+
+def boom(key):
+    raise KeyError(key)
+
+
+class Unpicklable(Exception):
+    def __init__(self, message, handle):
+        super().__init__(message)
+        self.handle = handle
+
+
+def unpicklable(_):
+    raise Unpicklable("bad page", lambda: None)
+
+
+def test_timeout_kills_the_worker_and_the_next_call_gets_a_new_one():
+    with IsolatedWorker(slow, timeout=1) as worker:
+        first = worker(0.05)
+        assert worker(0.05) == first  # one long-lived worker
+        assert first != os.getpid()
+
+        started = time.perf_counter()
+        with pytest.raises(WorkerLimitExceeded, match="Timed out after 1s"):
+            worker(10)
+        assert time.perf_counter() - started < 5
+
+        assert worker(0.05) not in (first, os.getpid())
+
+
+def test_memory_cap_stops_the_worker_and_the_batch_carries_on():
+    with IsolatedWorker(hog, max_rss_mb=300) as worker:
+        with pytest.raises(WorkerLimitExceeded, match="Exceeded memory limit of 300 MB"):
+            worker(600)
+        assert worker(10) == 10 * 1024 * 1024
+
+
+def test_exceptions_raised_by_the_function_are_re_raised():
+    with IsolatedWorker(boom, timeout=5) as worker:
+        with pytest.raises(KeyError, match="INV-1"):
+            worker("INV-1")
+        # the worker survives its function's exceptions
+        with pytest.raises(KeyError):
+            worker("INV-2")
+
+    with IsolatedWorker(unpicklable, timeout=5) as worker:
+        with pytest.raises(RuntimeError, match="Unpicklable: bad page"):
+            worker(1)
+
+
+def test_without_limits_calls_run_in_process():
+    worker = IsolatedWorker(slow)
+    assert not worker.isolated
+    assert worker(0) == os.getpid()
+
+
+def test_worker_limits_come_from_flags_then_environment(monkeypatch):
+    assert worker_limits() == (None, None)
+    monkeypatch.setenv("HRMS_WORKER_TIMEOUT", "30")
+    monkeypatch.setenv("HRMS_WORKER_MAX_RSS_MB", "junk")
+    assert worker_limits() == (30.0, None)
+    assert worker_limits(5, 1500) == (5, 1500)
@@ -0,0 +1,115 @@
+import pytest
+
+import amazon_tax_invoice_extractor as extractor
+from finance_io import RETRY_STATUS, BatchJournal, WorkerLimitExceeded
+
+COLUMNS = ["Source File", "Item"]
+
+
+def _pdfs(folder, count):
+    folder.mkdir()
+    paths = []
+    for i in range(count):
+        path = folder / f"{i}.pdf"
+        path.write_bytes(f"%PDF invoice {i}".encode())
+        paths.append(path)
+    return paths
+
+
+def _extract(journal, sink, pdf, items=2):
+    sink.append([{"Source File": pdf.name, "Item": n} for n in range(items)])
+    journal.commit(pdf, "processed", key=pdf.stem, items=items)
+
+
+def test_resume_after_a_crash_keeps_every_row_once(tmp_path):
+    pdfs = _pdfs(tmp_path / "pdfs", 5)
+    spool = tmp_path / "out.spool"
+
+    journal = BatchJournal(spool, batch_files=2)
+    sink = journal.spool("items.csv", COLUMNS)
+    for pdf in pdfs[:3]:
+        _extract(journal, sink, pdf)
+    # rows of a fourth file reach the disk, then the process dies: no close()
+    sink.append([{"Source File": pdfs[3].name, "Item": 0}])
+    sink.flush()
+
+    with BatchJournal(spool, resume=True, batch_files=2) as journal:
+        sink = journal.spool("items.csv", COLUMNS)
+        assert sink.rows == 4
+        redone = []
+        for pdf in pdfs:
+            if journal.done(pdf) is None:
+                redone.append(pdf.name)
+                _extract(journal, sink, pdf)
+        rows = journal.read(sink)
+
+    assert redone == ["2.pdf", "3.pdf", "4.pdf"]
+    assert rows["Source File"].tolist() == [pdf.name for pdf in pdfs for _ in range(2)]
+    assert rows["Item"].tolist() == ["0", "1"] * 5
+
+
+def test_resume_reads_back_only_files_of_this_run(tmp_path):
+    pdfs = _pdfs(tmp_path / "pdfs", 3)
+    spool = tmp_path / "out.spool"
+    with BatchJournal(spool) as journal:
+        sink = journal.spool("items.csv", COLUMNS)
+        for pdf in pdfs:
+            _extract(journal, sink, pdf)
+
+    pdfs[1].write_bytes(b"%PDF invoice 1, corrected")
+    pdfs[2].unlink()
+    with BatchJournal(spool, resume=True) as journal:
+        sink = journal.spool("items.csv", COLUMNS)
+        assert journal.done(pdfs[0]) is not None
+        assert journal.done(pdfs[1]) is None
+        _extract(journal, sink, pdfs[1], items=1)
+        rows = journal.read(sink)
+
+    assert rows["Source File"].tolist() == ["0.pdf", "0.pdf", "1.pdf"]
+
+
+def test_files_excluded_for_a_limit_are_retried(tmp_path):
+    pdfs = _pdfs(tmp_path / "pdfs", 2)
+    spool = tmp_path / "out.spool"
+    with BatchJournal(spool) as journal:
+        journal.spool("items.csv", COLUMNS)
+        journal.commit(pdfs[0], "excluded", reason="Missing Invoice Number")
+        journal.commit(pdfs[1], RETRY_STATUS, reason="Timed out after 30s")
+
+    with BatchJournal(spool, resume=True) as journal:
+        assert journal.done(pdfs[0])["reason"] == "Missing Invoice Number"
+        assert journal.done(pdfs[1]) is None
+
+
+def test_interrupted_extraction_resumes_without_losing_or_repeating_rows(tmp_path, monkeypatch):
+    folder = tmp_path / "pdfs"
+    _pdfs(folder, 6)
+    spool = tmp_path / "out.spool"
+    calls = []
+
+    def fake_pdf(pdf_path, classify, engine, fail=True):
+        name = pdf_path.rsplit("/", 1)[-1]
+        calls.append(name)
+        if fail and len(calls) == 1:
+            raise WorkerLimitExceeded("Timed out after 30s")
+        if fail and len(calls) == 5:
+            raise KeyboardInterrupt
+        header = {"Source File": name, "Invoice Number": f"INV-{name[0]}", "Invoice Date": "01.01.2025"}
+        return header, [{"Description of Service": "Fee", "Amount": "10.00"} for _ in range(2)]
+
+    monkeypatch.setattr(extractor, "process_single_pdf", fake_pdf)
+    with pytest.raises(KeyboardInterrupt):
+        extractor.process_all_pdfs(folder, spool=spool)
+    timed_out, interrupted = calls[0], calls[4]
+    untouched = {f"{i}.pdf" for i in range(6)} - set(calls)
+
+    calls.clear()
+    monkeypatch.setattr(extractor, "process_single_pdf", lambda *args: fake_pdf(*args, fail=False))
+    headers, items, processed, excluded, _ = extractor.process_all_pdfs(folder, spool=spool, resume=True)
+
+    # the timed-out file and the interrupted one are tried again, the committed ones are not
+    assert sorted(calls) == sorted({timed_out, interrupted} | untouched)
+    assert excluded == []
+    assert sorted(headers["Invoice Number"]) == [f"INV-{i}" for i in range(6)]
+    assert len(items) == 12
+    assert sorted(name for name, _, _ in processed) == [f"{i}.pdf" for i in range(6)]
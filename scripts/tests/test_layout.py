@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("pdfplumber")
+
+from finance_io import CREDIT_NOTE_TEMPLATE, TableReader, iter_pages, open_pdf, table_engine  # noqa: E402
+from pdf_page_memory_benchmark import write_synthetic_pdf  # noqa: E402
+
+
+def _tables(path, reader):
+    with open_pdf(path) as pdf:
+        return [reader.extract_tables(page) for page in iter_pages(pdf)]
+
+
+def test_template_rows_match_the_generic_finder(tmp_path):
+    path = write_synthetic_pdf(tmp_path / "credit_notes.pdf", 3, 12)
+    template = TableReader(CREDIT_NOTE_TEMPLATE)
+
+    generic = _tables(path, TableReader())
+    fast = _tables(path, template)
+
+    assert fast == generic
+    assert template.pages_by_template == 3 and template.pages_generic == 0
+    header, first = generic[0][0][:2]
+    assert header[0] == "SI No" and len(header) == 7
+    assert first[:2] == ["1", "DL-2526-101"]
+
+
+def test_pages_the_template_does_not_fit_go_to_the_generic_finder(tmp_path):
+    path = write_synthetic_pdf(tmp_path / "credit_notes.pdf", 2, 4)
+    # the synthetic grid has 7 columns, more than this template allows
+    reader = TableReader(CREDIT_NOTE_TEMPLATE._replace(max_columns=5))
+
+    tables = _tables(path, reader)
+
+    assert reader.pages_by_template == 0 and reader.pages_generic == 2
+    assert tables == _tables(path, TableReader())
+
+
+def test_table_engine_comes_from_the_flag_then_environment(monkeypatch):
+    assert table_engine() == "generic"
+    monkeypatch.setenv("HRMS_TABLE_ENGINE", "Template")
+    assert table_engine() == "template"
+    assert table_engine("bogus") == "generic"
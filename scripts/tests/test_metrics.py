@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+import finance_io.metrics as metrics
+from finance_io import begin_stage, end_stage, set_metrics_path, stage, stage_metrics, write_metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_stages(monkeypatch):
+    monkeypatch.setattr(metrics, "_stages", [])
+    monkeypatch.setattr(metrics, "_open", None)
+
+
+def test_stage_records_rows_times_and_status():
+    with stage("load", "Amazon MTR", rows_in=3) as record:
+        record["rows_out"] = 2
+    with pytest.raises(ValueError):
+        with stage("merge"):
+            raise ValueError("bad column")
+
+    load, merge = stage_metrics()
+
+    assert (load["stage"], load["label"], load["rows_in"], load["rows_out"]) == ("load", "Amazon MTR", 3, 2)
+    assert load["status"] == "ok" and merge["status"] == "error"
+    assert load["wall_s"] >= 0 and load["cpu_s"] >= 0
+    assert load["peak_rss_mb"] > 0
+    assert "_t" not in load
+
+
+def test_begin_stage_closes_the_stage_still_open():
+    begin_stage("extract", "PDFs")
+    begin_stage("write", rows_in=10)
+
+    assert end_stage(rows_out=10)["stage"] == "write"
+    assert end_stage() is None
+    assert [s["stage"] for s in stage_metrics()] == ["extract", "write"]
+
+
+def test_write_metrics_saves_the_report_as_json(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "reports" / "metrics.json"
+    monkeypatch.setenv("HRMS_METRICS", "")  # set_metrics_path writes os.environ; undone after the test
+    set_metrics_path(str(path))
+    with stage("load", rows_in=5) as record:
+        record["rows_out"] = 5
+    begin_stage("write", rows_in=5)
+
+    assert write_metrics("error") == path
+
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["status"] == "error"
+    assert {"script", "argv", "started", "wall_s", "cpu_s", "peak_rss_mb"} <= report.keys()
+    assert [(s["stage"], s["status"]) for s in report["stages"]] == [("load", "ok"), ("write", "incomplete")]
+    assert report["stages"][0]["rows_out"] == 5
+    out = capsys.readouterr().out
+    assert "Stage timings" in out and "rows 5 → 5" in out
+
+
+def test_write_metrics_is_off_without_a_path():
+    with stage("load"):
+        pass
+
+    assert write_metrics() is None
+    assert stage_metrics()[0]["stage"] == "load"
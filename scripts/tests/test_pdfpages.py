@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("pdfplumber")
+
+from finance_io import iter_pages, open_pdf  # noqa: E402
+from pdf_page_memory_benchmark import write_synthetic_pdf  # noqa: E402
+
+
+def _parsed(page):
+    return "_objects" in vars(page)
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    with open_pdf(write_synthetic_pdf(tmp_path / "credit_notes.pdf", 4, 5)) as pdf:
+        yield pdf
+
+
+def test_each_page_is_released_when_the_next_is_requested(pdf):
+    seen = []
+    for page in iter_pages(pdf):
+        assert page.chars
+        assert _parsed(page) and pdf.doc._cached_objs
+        assert not any(_parsed(earlier) for earlier in seen)
+        seen.append(page)
+
+    assert [page.page_number for page in seen] == [1, 2, 3, 4]
+    assert not _parsed(seen[-1])
+    assert pdf.doc._cached_objs == {}
+
+
+def test_break_releases_the_page_at_hand(pdf):
+    for page in iter_pages(pdf):
+        page.extract_words()
+        if page.page_number == 2:
+            break
+
+    assert not _parsed(page)
+    assert pdf.doc._cached_objs == {}
+
+
+def test_max_pages_and_release_off(pdf):
+    pages = list(iter_pages(pdf, max_pages=2, release=False))
+    for page in pages:
+        page.chars
+
+    assert [page.page_number for page in pages] == [1, 2]
+    assert all(_parsed(page) for page in pages)
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from finance_io import PERIOD_COLUMN, filter_periods, format_period, month_end_period
+
+
+def test_format_period_uses_the_last_day_of_the_month():
+    assert format_period(pd.Period("2024-02", freq="M")) == "29-Feb-2024"
+    assert format_period(pd.Period("2025-02", freq="M")) == "28-Feb-2025"
+    assert format_period(pd.Period("2025-04", freq="M")) == "30-Apr-2025"
+
+
+def test_month_end_period_labels_each_date():
+    dates = pd.Series(pd.to_datetime(["2025-01-15", "2024-12-31", "2025-01-01", None]), index=[10, 11, 12, 13])
+
+    periods = month_end_period(dates)
+
+    assert periods.name == PERIOD_COLUMN
+    assert periods.index.tolist() == [10, 11, 12, 13]
+    assert periods.tolist() == ["31-Jan-2025", "31-Dec-2024", "31-Jan-2025", ""]
+    # categories are in calendar order, not label order
+    assert list(periods.cat.categories) == ["31-Dec-2024", "31-Jan-2025", ""]
+
+
+def test_month_end_period_parses_text_and_drops_the_timezone():
+    text = month_end_period(pd.Series(["2025-03-31 23:00:00", "not a date"]))
+    assert text.tolist() == ["31-Mar-2025", ""]
+
+    aware = month_end_period(pd.Series(pd.to_datetime(["2025-03-31 23:00:00"]).tz_localize("Asia/Kolkata")))
+    assert aware.tolist() == ["31-Mar-2025"]
+
+
+def test_filter_periods():
+    df = pd.DataFrame({PERIOD_COLUMN: ["31-Jan-2025", "28-Feb-2025", "31-Jan-2025"], "Qty": [1, 2, 3]})
+
+    assert filter_periods(df, ["31-Jan-2025"])["Qty"].tolist() == [1, 3]
+    assert filter_periods(df, None) is df
+    assert filter_periods(df, []) is df
+    assert filter_periods(df.drop(columns=PERIOD_COLUMN), ["31-Jan-2025"]).shape == (3, 1)
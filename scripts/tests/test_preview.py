@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pandas as pd
+
+from finance_io import count_rows, preview_path, preview_report, set_preview_rows
+from find_missing_shipments import load_country_data
+
+
+def test_preview_path_only_renames_in_preview_mode():
+    assert preview_path("out/amazon.csv") == "out/amazon.csv"
+
+    set_preview_rows(5)
+
+    assert preview_path("out/amazon.csv") == str(Path("out/amazon_preview.csv"))
+    assert preview_path(Path("out/report.xlsx")) == Path("out/report_preview.xlsx")
+    assert preview_path("out/months") == str(Path("out/months_preview"))
+    assert preview_path(preview_path("amazon.csv")) == "amazon_preview.csv"
+    assert preview_path(None) is None
+
+
+def _workbook(path, sheets):
+    with pd.ExcelWriter(path) as writer:
+        for name, rows in sheets.items():
+            pd.DataFrame({"Invoice": range(rows)}).to_excel(writer, sheet_name=name, index=False)
+    return path
+
+
+def test_preview_report_counts_only_the_sheets_read(tmp_path, capsys):
+    book = _workbook(tmp_path / "gstr2b.xlsx", {"Read me": 10, "B2B": 40, "B2BA": 6, "Unused": 500})
+    assert count_rows(book) == 556
+    assert count_rows(book, "B2B") == 40
+
+    set_preview_rows(8)
+    preview_report([(book, ["B2B", "B2BA", "IMPG"])], [])
+    assert "Input rows read : 14 of ~46" in capsys.readouterr().out
+
+    # a bare workbook path is read by pandas as its first sheet only
+    preview_report([book], [])
+    assert "Input rows read : 8 of ~10" in capsys.readouterr().out
+
+
+def test_country_data_is_read_in_full_in_preview_mode(tmp_path):
+    path = tmp_path / "country.xlsx"
+    pd.DataFrame({"Reference No.": [f"FBA{i}" for i in range(12)], "Status": "CLOSED"}).to_excel(
+        path, sheet_name="IN", index=False
+    )
+    set_preview_rows(3)
+
+    country_data, refs, ref_col, status_col = load_country_data(path, "IN")
+
+    assert len(country_data) == 12
+    assert refs == {f"FBA{i}" for i in range(12)}
+    assert (ref_col, status_col) == ("Reference No.", "Status")
@@ -0,0 +1,63 @@
+import os
+import pstats
+import subprocess
+import sys
+
+import finance_io.profiling as profiling
+from conftest import SCRIPTS_DIR
+from finance_io import profiled_call, worker_profiling
+
+JOB = """
+import sys
+
+sys.path.insert(0, {scripts!r})
+from finance_io import IsolatedWorker, start_profile
+
+
+def squares(n):
+    return sum(i * i for i in range(n))
+
+
+if __name__ == "__main__":
+    start_profile(True, sys.argv[1])
+    with IsolatedWorker(squares, timeout=60) as worker:
+        print(worker(1000), worker(2000))
+"""
+
+
+def test_isolated_worker_calls_are_in_the_profile(tmp_path):
+    job = tmp_path / "job.py"
+    job.write_text(JOB.format(scripts=str(SCRIPTS_DIR)))
+    output = tmp_path / "out.csv"
+
+    result = subprocess.run(
+        [sys.executable, str(job), str(output)], cwd=tmp_path, capture_output=True, text=True, check=True
+    )
+
+    assert "2 call(s) profiled in worker processes" in result.stdout
+    stats = pstats.Stats(str(tmp_path / "out.prof")).stats
+    calls = [counts[0] for (_, _, name), counts in stats.items() if name == "squares"]
+    assert calls == [2]
+
+
+def test_profiled_call_returns_stats_only_when_enabled():
+    assert profiled_call(False, divmod, 7, 2) == ((3, 1), None)
+
+    value, stats = profiled_call(True, sorted, [3, 1, 2])
+    assert value == [1, 2, 3]
+    assert any("sorted" in name for _, _, name in stats)
+
+
+def test_worker_profiling_is_off_unless_this_process_runs_cprofile(monkeypatch, capsys):
+    assert not worker_profiling()
+
+    monkeypatch.setattr(profiling, "_running", ("cprofile", None, os.getpid()))
+    assert worker_profiling()
+    monkeypatch.setattr(profiling, "_running", ("cprofile", None, os.getpid() + 1))
+    assert not worker_profiling()
+
+    monkeypatch.setattr(profiling, "_running", ("pyinstrument", None, os.getpid()))
+    monkeypatch.setattr(profiling, "_warned_pyinstrument", False)
+    assert not worker_profiling()
+    assert not worker_profiling()
+    assert capsys.readouterr().out.count("not included") == 1
@@ -0,0 +1,57 @@
+import json
+import time
+from pathlib import Path
+
+from finance_io import emit, progress_target, stage, track
+
+
+def _events(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_track_emits_one_event_per_item_with_rate_and_eta(tmp_path, monkeypatch):
+    events = tmp_path / "events.jsonl"
+    monkeypatch.setenv("HRMS_PROGRESS", str(events))
+    files = [Path("a.pdf"), Path("b.pdf"), Path("c.pdf")]
+
+    seen = []
+    for pdf in track(files, "PDFs"):
+        time.sleep(0.01)
+        if pdf.name == "b.pdf":
+            continue  # still counted
+        seen.append(pdf.name)
+
+    start, *done = _events(events)
+    assert seen == ["a.pdf", "c.pdf"]
+    assert start == {"event": "progress", "t": start["t"], "label": "PDFs", "done": 0, "total": 3}
+    assert [(e["done"], e["total"], e["item"]) for e in done] == [(1, 3, "a.pdf"), (2, 3, "b.pdf"), (3, 3, "c.pdf")]
+    for e in done:
+        assert e["elapsed_s"] > 0 and e["rate"] > 0
+        assert abs(e["eta_s"] - (3 - e["done"]) / e["rate"]) <= 0.1
+    assert done[-1]["eta_s"] == 0
+    assert [e["t"] for e in done] == sorted(e["t"] for e in done)
+
+
+def test_stages_are_progress_events_on_stdout(monkeypatch, capsys):
+    monkeypatch.setenv("HRMS_PROGRESS", "1")
+    assert progress_target() == "-"
+
+    with stage("load", "Amazon MTR", rows_in=4) as record:
+        print("Loading...")
+        record["rows_out"] = 3
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1] == "Loading..."
+    first, last = json.loads(lines[0]), json.loads(lines[2])
+    assert (first["event"], first["stage"], first["label"], first["rows_in"]) == ("stage_start", "load", "Amazon MTR", 4)
+    assert (last["event"], last["rows_out"], last["status"]) == ("stage_end", 3, "ok")
+    assert last["wall_s"] >= 0
+
+
+def test_progress_is_off_by_default(capsys):
+    assert progress_target() is None
+
+    emit("progress", done=1)
+    assert list(track(iter(["x", "y"]), "files")) == ["x", "y"]
+
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+import gst_sales_store
+from finance_io import SalesStore
+
+
+def unified(rows):
+    """Unified rows from (marketplace, Period, invoice, taxable value) tuples."""
+    return pd.DataFrame(rows, columns=["marketplace", "Period", "Invoice Number/CN", "Taxable Value"])
+
+
+def test_overlapping_months_from_different_runs_both_survive(tmp_path):
+    january = unified(
+        [("Amazon B2C", "31-Jan-2025", f"IN-{i}", 100.0) for i in range(5)]
+        + [("Amazon B2C", "31-Dec-2024", "CN-1", -40.0), ("Amazon B2C", "31-Dec-2024", "CN-2", -10.0)]
+    )
+    december = unified([("Amazon B2C", "31-Dec-2024", f"IN-D{i}", 100.0) for i in range(3)])
+
+    with SalesStore(tmp_path / "sales.sqlite") as store:
+        store.load(december, "amazon_2024-12.csv")
+        store.load(january, "amazon_2025-01.csv")
+
+        counts = store.query(group_by=["Period"]).set_index("Period")["rows"]
+        assert counts.to_dict() == {"31-Dec-2024": 5, "31-Jan-2025": 5}
+        periods = store.periods()
+        assert periods["Period"].tolist() == ["31-Dec-2024", "31-Jan-2025"]
+        assert periods["rows"].tolist() == [5, 5]
+        assert periods["runs"].iloc[0].split(", ") == ["amazon_2024-12.csv", "amazon_2025-01.csv"]
+
+
+def test_blank_periods_of_different_runs_do_not_replace_each_other(tmp_path):
+    with SalesStore(tmp_path / "sales.sqlite") as store:
+        for month in ("2025-01", "2025-02", "2025-03"):
+            rows = [("Amazon B2B", "", f"{month}-{i}", 100.0) for i in range(4)]
+            store.load(unified(rows), f"amazon_{month}.csv")
+
+        assert len(store.query()) == 12
+        assert store.periods()["rows"].tolist() == [12]
+
+
+def test_reloading_a_run_replaces_its_rows(tmp_path):
+    first = unified([("JioMart", "31-Jan-2025", f"J-{i}", 100.0) for i in range(4)])
+    rerun = unified([("JioMart", "31-Jan-2025", f"J-{i}", 120.0) for i in range(3)])
+
+    with SalesStore(tmp_path / "sales.sqlite") as store:
+        store.load(first, "jio.csv")
+        store.load(rerun, "jio.csv")
+
+        stored = store.query()
+        assert len(stored) == 3
+        assert (stored["Taxable Value"] == 120.0).all()
+        assert store.periods()[["rows", "runs"]].values.tolist() == [[3, "jio.csv"]]
+
+
+def test_load_csv_uses_the_file_name_as_run(tmp_path):
+    path = tmp_path / "amazon_2025-01.csv"
+    unified([("Amazon B2C", "31-Jan-2025", "IN-1", "-")]).to_csv(path, index=False)
+
+    with SalesStore(tmp_path / "sales.sqlite") as store:
+        assert store.load_csv(path) == 1
+        assert store.load_csv(path) == 1
+
+        stored = store.sql("SELECT run, \"Taxable Value\" FROM sales")
+        assert stored.values.tolist() == [["amazon_2025-01.csv", None]]
+
+
+def test_cli_writes_query_results(tmp_path, monkeypatch, capsys):
+    store_path = tmp_path / "sales.sqlite"
+    with SalesStore(store_path) as store:
+        store.load(unified([("JioMart", "31-Jan-2025", "J-1", 100.0)]), "jio.csv")
+    out = tmp_path / "result.csv"
+    monkeypatch.setattr("sys.argv", ["gst_sales_store.py", "--store", str(store_path), "query", "--out", str(out)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        gst_sales_store.main()
+
+    assert exit_info.value.code == 0
+    assert "Wrote 1 row(s)" in capsys.readouterr().out
+    assert pd.read_csv(out)["Invoice Number/CN"].tolist() == ["J-1"]
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from finance_io import RowBuffer, RowSpool, spool_dir, stream_enabled
+
+COLUMNS = ["Source File", "Invoice Number", "Qty"]
+
+
+def _rows(start, count):
+    return [{"Source File": f"{i}.pdf", "Invoice Number": f"{i:06d}", "Qty": i, "Page": 1} for i in range(start, count)]
+
+
+def _lines(path):
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def test_spool_spills_full_batches_and_keeps_only_the_rest_in_memory(tmp_path):
+    path = tmp_path / "out.spool" / "items.csv"
+
+    with RowSpool(path, COLUMNS, batch_rows=4) as spool:
+        spool.append(_rows(0, 3))
+        assert _lines(path) == ["Source File,Invoice Number,Qty"]
+        spool.append(_rows(3, 5))
+        assert len(_lines(path)) == 1 + 5
+        assert spool._buffer == []
+        spool.append(_rows(5, 7))
+        assert len(_lines(path)) == 1 + 5
+        assert len(spool._buffer) == 2
+        assert spool.rows == 7
+
+    # close flushes the last partial batch
+    assert len(_lines(path)) == 1 + 7
+
+
+def test_spool_reads_back_in_append_order_like_a_row_buffer(tmp_path):
+    rows = _rows(0, 11) + [{"Source File": "x.pdf", "Invoice Number": None, "Qty": None}]
+    spool = RowSpool(tmp_path / "items.csv", COLUMNS, batch_rows=3)
+    buffer = RowBuffer(COLUMNS)
+    for start in range(0, len(rows), 2):
+        spool.append(rows[start:start + 2])
+        buffer.append(rows[start:start + 2])
+
+    spilled = spool.read()
+    kept = buffer.read()
+
+    assert list(spilled.columns) == COLUMNS == list(kept.columns)
+    assert spilled["Source File"].tolist() == kept["Source File"].tolist()
+    # text as written: zero padding survives, blank cells are NaN
+    assert spilled["Invoice Number"].iloc[0] == "000000"
+    assert spilled.iloc[-1].isna().tolist() == [False, True, True]
+    assert spilled["Qty"].iloc[:-1].astype(int).tolist() == kept["Qty"].iloc[:-1].tolist()
+
+
+def test_spool_with_append_continues_an_existing_file(tmp_path):
+    path = tmp_path / "items.csv"
+    with RowSpool(path, COLUMNS) as spool:
+        spool.append(_rows(0, 3))
+
+    with RowSpool(path, COLUMNS, append=True) as spool:
+        assert spool.rows == 3
+        spool.append(_rows(3, 5))
+
+    assert pd.read_csv(path)["Qty"].tolist() == [0, 1, 2, 3, 4]
+    # without append the file starts over
+    with RowSpool(path, COLUMNS) as spool:
+        assert spool.rows == 0
+    assert _lines(path) == ["Source File,Invoice Number,Qty"]
+
+
+def test_stream_switch_and_spool_dir(monkeypatch, tmp_path):
+    assert not stream_enabled()
+    assert stream_enabled(True)
+    monkeypatch.setenv("HRMS_STREAM", "yes")
+    assert stream_enabled()
+    assert spool_dir(tmp_path / "invoices.xlsx") == tmp_path / "invoices.spool"
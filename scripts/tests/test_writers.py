@@ -0,0 +1,22 @@
+import pandas as pd
+
+from finance_io import write_table
+
+
+def test_write_table_formats_decimal_columns(tmp_path):
+    df = pd.DataFrame({"Invoice": ["A", "B"], "Amount": ["2345", None], "Rate": [0.125, 0.5]})
+    out = tmp_path / "out.csv"
+
+    write_table(df, out, decimal_cols=["Amount"])
+
+    assert out.read_text().splitlines() == ["Invoice,Amount,Rate", "A,2345.00,0.125", "B,0.00,0.5"]
+
+
+def test_write_table_leaves_the_callers_frame_alone(tmp_path):
+    df = pd.DataFrame({"Qty": [1, 2], "Amount": [10.5, None], "Other": [1.0, 2.0]})
+    before = df.copy()
+
+    write_table(df, tmp_path / "out.csv", decimal_cols=["Qty", "Amount"])
+
+    pd.testing.assert_frame_equal(df, before)
+    assert df["Qty"].dtype == "int64"